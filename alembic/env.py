@@ -21,7 +21,9 @@ from app.models.empresa import Empresa
 from app.models.book import Book, BookCopy
 from app.models.cargo import Cargo
 from app.models.emprestimo import Emprestimo
+from app.models.estatistica import EstatisticaCliente, EstatisticaLivro
 from app.models.pessoa import Pessoa, Cliente, Funcionario
+from app.models.versao import TableVersion
 # target_metadata = mymodel.Base.metadata
 from database import Base
 target_metadata = Base.metadata
@@ -0,0 +1,62 @@
+"""Indice de busca textual em livros
+
+Revision ID: ab933370f97d
+Revises: a0473746dbda
+Create Date: 2026-10-17 09:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ab933370f97d'
+down_revision: Union[str, None] = 'a0473746dbda'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS book_fts USING fts5("
+    "title, author, publisher, content='book', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS book_fts_ai AFTER INSERT ON book BEGIN "
+    "INSERT INTO book_fts(rowid, title, author, publisher) "
+    "VALUES (new.id, new.title, new.author, new.publisher); END",
+    "CREATE TRIGGER IF NOT EXISTS book_fts_ad AFTER DELETE ON book BEGIN "
+    "INSERT INTO book_fts(book_fts, rowid, title, author, publisher) "
+    "VALUES ('delete', old.id, old.title, old.author, old.publisher); END",
+    "CREATE TRIGGER IF NOT EXISTS book_fts_au AFTER UPDATE ON book BEGIN "
+    "INSERT INTO book_fts(book_fts, rowid, title, author, publisher) "
+    "VALUES ('delete', old.id, old.title, old.author, old.publisher); "
+    "INSERT INTO book_fts(rowid, title, author, publisher) "
+    "VALUES (new.id, new.title, new.author, new.publisher); END",
+    # indexa os livros que já existiam antes da migração
+    "INSERT INTO book_fts(book_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.create_index(
+            'ix_book_fulltext', 'book', ['title', 'author', 'publisher'],
+            unique=False, mysql_prefix='FULLTEXT'
+        )
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.drop_index('ix_book_fulltext', table_name='book')
+    elif dialect == 'sqlite':
+        for trigger in ('book_fts_ai', 'book_fts_ad', 'book_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS book_fts")
@@ -0,0 +1,34 @@
+from typing import Generic, List, Literal, TypeVar
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+# Máximo de itens aceitos por requisição de carga em lote
+LIMITE_LOTE = 5000
+
+# Máximo de itens por sessão de balcão (empréstimos/devoluções em lote)
+LIMITE_LOTE_BALCAO = 100
+
+# tudo_ou_nada: qualquer item inválido cancela o lote; melhor_esforco: processa os válidos
+ModoLote = Literal["tudo_ou_nada", "melhor_esforco"]
+
+
+class BulkError(BaseModel):
+    index: int
+    detail: str
+
+
+class BulkResult(BaseModel, Generic[T]):
+    created: List[T]
+    errors: List[BulkError]
+
+
+def rejeitar_lote_com_erros(modo: ModoLote, errors: List[BulkError]) -> None:
+    """No modo tudo_ou_nada, responde 400 com os erros de todos os itens antes de qualquer escrita."""
+    if modo == "tudo_ou_nada" and errors:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "Lote rejeitado: nenhum item foi processado", "errors": [e.model_dump() for e in errors]},
+        )
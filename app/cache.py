@@ -0,0 +1,222 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+import settings
+
+
+class CacheBackend(ABC):
+    """Interface dos backends de cache: valores são dicts serializáveis em JSON."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class LRUCache(CacheBackend):
+    """Cache em memória do processo, com TTL e descarte do item menos usado."""
+
+    def __init__(self, max_items: int = 10000):
+        super().__init__()
+        self.max_items = max_items
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expira_em, value = item
+            if expira_em < time.monotonic():
+                del self._items[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    async def set(self, key, value, ttl):
+        with self._lock:
+            self._items[key] = (time.monotonic() + ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    async def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._items.pop(key, None)
+
+    async def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        return {**super().stats(), "items": len(self._items), "max_items": self.max_items}
+
+
+class SemCache(CacheBackend):
+    """Cache desligado (CACHE_BACKEND=off): toda leitura vai ao banco."""
+
+    async def get(self, key):
+        self.misses += 1
+        return None
+
+    async def set(self, key, value, ttl):
+        pass
+
+    async def delete(self, *keys):
+        pass
+
+    async def clear(self):
+        pass
+
+
+class LocalRedisClient:
+    """Substituto local de um cliente redis.asyncio (GET, SET com EX, DEL, FLUSHDB).
+
+    Guarda bytes como o Redis guardaria; serve para testes e desenvolvimento
+    sem um servidor Redis.
+    """
+
+    def __init__(self):
+        self._data = {}
+
+    async def get(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expira_em, value = item
+        if expira_em is not None and expira_em < time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key, value, ex=None):
+        self._data[key] = (time.monotonic() + ex if ex else None, value if isinstance(value, bytes) else str(value).encode())
+        return True
+
+    async def delete(self, *keys):
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+    async def flushdb(self):
+        self._data.clear()
+        return True
+
+
+class RedisCache(CacheBackend):
+    """Backend compartilhado entre processos, sobre um cliente estilo redis.asyncio."""
+
+    def __init__(self, client, prefix: str = "biblioteca:"):
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key):
+        raw = await self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key, value, ttl):
+        await self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+    async def delete(self, *keys):
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+    async def clear(self):
+        await self.client.flushdb()
+
+
+class ReadThroughCache:
+    """Fachada usada pelas rotas; o backend pode ser trocado (ex.: em testes)."""
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.desatualizados = 0
+
+    async def get_or_load(
+        self, key: str, loader: Callable[[], Awaitable[Optional[Any]]], versao: Optional[str] = None
+    ) -> Optional[Any]:
+        """Valor de `key`, carregado por `loader` se não estiver no cache.
+
+        Com `versao` (a versão lida para o ETag, das tabelas ou da linha), o valor é
+        guardado junto dela e só é servido para a mesma versão: outra versão
+        conta como falta. Assim o corpo nunca é mais velho que o ETag, mesmo
+        que a invalidação não tenha chegado a este processo.
+        """
+        entrada = await self.backend.get(key)
+        if entrada is not None:
+            if versao is None:
+                return entrada
+            if entrada["versao"] == versao:
+                return entrada["valor"]
+            self.desatualizados += 1
+        value = await loader()
+        # "Não encontrado" não é guardado, para um create aparecer na hora
+        if value is not None:
+            await self.backend.set(key, value if versao is None else {"versao": versao, "valor": value}, self.ttl)
+        return value
+
+    async def invalidate(self, *keys: str) -> None:
+        await self.backend.delete(*keys)
+
+    def stats(self) -> dict:
+        return {**self.backend.stats(), "desatualizados": self.desatualizados, "ttl": self.ttl}
+
+
+def criar_backend(nome: str) -> CacheBackend:
+    if nome == "off":
+        return SemCache()
+    if nome == "memory":
+        return LRUCache(max_items=settings.CACHE_MAX_ITEMS)
+    if nome == "local-redis":
+        return RedisCache(LocalRedisClient())
+    if nome == "redis":
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis exige o pacote 'redis' instalado")
+        return RedisCache(redis.from_url(settings.REDIS_URL))
+    raise ValueError(f"CACHE_BACKEND desconhecido: {nome}")
+
+
+cache = ReadThroughCache(criar_backend(settings.CACHE_BACKEND), ttl=settings.CACHE_TTL)
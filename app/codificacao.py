@@ -0,0 +1,167 @@
+"""Negociação da representação das respostas: formato (Accept) e compressão (Accept-Encoding).
+
+Formato: as rotas do caminho rápido (RespostaJSON) respondem MessagePack a
+quem pedir application/msgpack com qualidade pelo menos igual à do JSON; o
+resto continua em JSON. Compressão: o middleware Compressao comprime com
+brotli ou gzip as respostas de tamanho conhecido acima de
+COMPRESSAO_MIN_BYTES. Streaming (exports) passa direto, sem ser acumulado.
+
+O ETag de condicional() inclui a representação negociada, e as respostas
+levam Vary: Accept, Accept-Encoding para caches intermediários.
+"""
+import gzip
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+
+import settings
+
+try:
+    import brotli
+except ImportError:  # sem brotli, só gzip
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:  # sem msgpack, sempre JSON
+    msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+_TIPOS_MSGPACK = (MSGPACK, "application/vnd.msgpack", "application/x-msgpack")
+_COMPRIMIVEIS = ("application/json", "application/msgpack", "application/x-ndjson", "text/")
+# Acima disso a compressão sai do event loop para uma thread
+_LIMITE_NO_LOOP = 256 * 1024
+
+# Formato negociado para a requisição atual, lido por RespostaJSON
+formato_da_requisicao: ContextVar[str] = ContextVar("formato_da_requisicao", default=JSON)
+
+
+def _qualidades(cabecalho: str) -> Dict[str, float]:
+    """{valor: q} de um cabeçalho como 'br;q=1.0, gzip;q=0.8, *;q=0'."""
+    qualidades = {}
+    for parte in cabecalho.split(","):
+        nome, *parametros = parte.split(";")
+        nome = nome.strip().lower()
+        if not nome:
+            continue
+        q = 1.0
+        for parametro in parametros:
+            chave, _, valor = parametro.strip().partition("=")
+            if chave == "q":
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        qualidades[nome] = q
+    return qualidades
+
+
+def negociar_formato(accept: str) -> str:
+    if msgpack is None or not accept:
+        return JSON
+    q = _qualidades(accept)
+    q_msgpack = max(q.get(tipo, 0.0) for tipo in _TIPOS_MSGPACK)
+    q_json = q.get(JSON, q.get("application/*", q.get("*/*", 0.0)))
+    return MSGPACK if q_msgpack > 0 and q_msgpack >= q_json else JSON
+
+
+def negociar_codificacao(accept_encoding: str) -> Optional[str]:
+    """'br', 'gzip' ou None (identity), pela qualidade; no empate, brotli."""
+    if not accept_encoding:
+        return None
+    q = _qualidades(accept_encoding)
+    padrao = q.get("*", 0.0)
+    q_br = q.get("br", padrao) if brotli is not None else 0.0
+    q_gzip = q.get("gzip", padrao)
+    if q_br > 0 and q_br >= q_gzip:
+        return "br"
+    if q_gzip > 0:
+        return "gzip"
+    return None
+
+
+def _serializar_extra(valor):
+    # date/datetime no MessagePack como no JSON: ISO 8601
+    if hasattr(valor, "isoformat"):
+        return valor.isoformat()
+    raise TypeError(f"{type(valor).__name__} não serializável em MessagePack")
+
+
+def empacotar(conteudo) -> bytes:
+    return msgpack.packb(conteudo, default=_serializar_extra)
+
+
+def comprimir(corpo: bytes, codificacao: str) -> bytes:
+    if codificacao == "br":
+        return brotli.compress(corpo, quality=settings.COMPRESSAO_BROTLI_QUALIDADE)
+    return gzip.compress(corpo, compresslevel=settings.COMPRESSAO_GZIP_NIVEL, mtime=0)
+
+
+def _comprimivel(headers: MutableHeaders) -> bool:
+    tipo = headers.get("content-type", "")
+    return "content-encoding" not in headers and tipo.startswith(_COMPRIMIVEIS)
+
+
+class Compressao:
+    """Middleware ASGI: fixa o formato negociado e comprime respostas grandes."""
+
+    def __init__(self, app, minimo: int = settings.COMPRESSAO_MIN_BYTES):
+        self.app = app
+        self.minimo = minimo
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        token = formato_da_requisicao.set(negociar_formato(headers.get("accept", "")))
+        try:
+            codificacao = negociar_codificacao(headers.get("accept-encoding", ""))
+            await self.app(scope, receive, self._enviar_comprimido(send, codificacao))
+        finally:
+            formato_da_requisicao.reset(token)
+
+    def _enviar_comprimido(self, send, codificacao: Optional[str]):
+        inicio = None
+        partes = []
+
+        async def enviar(message):
+            nonlocal inicio
+            if message["type"] == "http.response.start":
+                resposta = MutableHeaders(raw=message["headers"])
+                if not _comprimivel(resposta):
+                    await send(message)
+                    return
+                # Sem Content-Length é streaming: passa adiante sem acumular
+                if "content-length" not in resposta:
+                    await send(message)
+                    return
+                resposta.add_vary_header("Accept-Encoding")
+                if codificacao is None:
+                    await send(message)
+                    return
+                inicio = message
+                return
+            if inicio is None:
+                await send(message)
+                return
+
+            partes.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            corpo = b"".join(partes)
+            if len(corpo) >= self.minimo:
+                if len(corpo) > _LIMITE_NO_LOOP:
+                    corpo = await anyio.to_thread.run_sync(comprimir, corpo, codificacao)
+                else:
+                    corpo = comprimir(corpo, codificacao)
+                resposta = MutableHeaders(raw=inicio["headers"])
+                resposta["Content-Encoding"] = codificacao
+                resposta["Content-Length"] = str(len(corpo))
+            await send(inicio)
+            await send({"type": "http.response.body", "body": corpo})
+
+        return enviar
@@ -0,0 +1,60 @@
+from typing import Dict, Tuple
+
+from sqlalchemy import Integer, bindparam, cast, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.book import Book, BookCopy
+
+# UPDATE em massa pela tabela (Core): o update() ORM com lista de parâmetros
+# exigiria a chave primária com o nome da coluna em cada item
+_ajuste = (
+    update(Book.__table__)
+    .where(Book.__table__.c.id == bindparam("b_id"))
+    .values(
+        total_copies=Book.__table__.c.total_copies + bindparam("b_total"),
+        available_copies=Book.__table__.c.available_copies + bindparam("b_disponiveis"),
+    )
+)
+
+
+async def ajustar_contadores(db: AsyncSession, book_id: int, total: int = 0, disponiveis: int = 0) -> None:
+    """Soma `total`/`disponiveis` aos contadores do livro, na transação de `db`.
+
+    O incremento é feito pelo banco (col = col + n), então duas transações
+    concorrentes não perdem atualizações. Não faz commit.
+    """
+    await db.execute(_ajuste, {"b_id": book_id, "b_total": total, "b_disponiveis": disponiveis})
+
+
+async def ajustar_contadores_em_lote(db: AsyncSession, ajustes: Dict[int, Tuple[int, int]]) -> None:
+    """Como ajustar_contadores, para vários livros: {book_id: (total, disponiveis)}."""
+    if ajustes:
+        await db.execute(_ajuste, [
+            {"b_id": book_id, "b_total": total, "b_disponiveis": disponiveis}
+            for book_id, (total, disponiveis) in ajustes.items()
+        ])
+
+
+async def recalcular_contadores(db: AsyncSession) -> int:
+    """Recalcula total_copies/available_copies de todos os livros a partir das cópias.
+
+    Um único GROUP BY lê os contadores atuais e os valores reais; só os livros
+    divergentes são regravados. Devolve quantos livros foram corrigidos.
+    """
+    disponiveis = func.coalesce(func.sum(cast(BookCopy.is_available, Integer)), 0)
+    result = await db.execute(
+        select(Book.id, Book.total_copies, Book.available_copies, func.count(BookCopy.id), disponiveis)
+        .outerjoin(BookCopy, BookCopy.book_id == Book.id)
+        .group_by(Book.id, Book.total_copies, Book.available_copies)
+    )
+    # Grava a diferença, não o valor lido: um empréstimo concluído entre a
+    # leitura e a escrita continua contado
+    corrigidos = [
+        {"b_id": book_id, "b_total": total - total_atual, "b_disponiveis": livres - livres_atual}
+        for book_id, total_atual, livres_atual, total, livres in result
+        if (total_atual, livres_atual) != (total, livres)
+    ]
+    if corrigidos:
+        await db.execute(_ajuste, corrigidos)
+    await db.commit()
+    return len(corrigidos)
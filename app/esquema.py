@@ -0,0 +1,120 @@
+"""Verificação do schema na subida da API, no lugar do drop_all/create_all.
+
+A validação completa (revisão do Alembic + comparação dos modelos com o
+banco) roda uma vez; o resultado fica gravado em SCHEMA_CHECK_CACHE com uma
+assinatura da revisão do banco, dos modelos e das migrações existentes.
+Enquanto nada disso mudar, a subida só lê a revisão do banco.
+"""
+import hashlib
+import logging
+import os
+from pathlib import Path
+
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+import settings
+# Todos os modelos precisam estar registrados no metadata comparado
+from app.models.empresa import Empresa  # noqa: F401
+from app.models.book import Book, BookCopy  # noqa: F401
+from app.models.cargo import Cargo  # noqa: F401
+from app.models.emprestimo import Emprestimo  # noqa: F401
+from app.models.estatistica import EstatisticaCliente, EstatisticaLivro  # noqa: F401
+from app.models.pessoa import Pessoa, Cliente, Funcionario  # noqa: F401
+from app.models.versao import TableVersion  # noqa: F401
+from database import Base, engine
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_DIR = Path(__file__).resolve().parent.parent / "alembic"
+
+
+class EsquemaInvalido(RuntimeError):
+    pass
+
+
+def _script_directory() -> ScriptDirectory:
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    return ScriptDirectory.from_config(config)
+
+
+def _incluir(obj, name, type_, reflected, compare_to) -> bool:
+    # Índices de um só dialeto (FULLTEXT do MySQL) não existem nos outros
+    ddl_if = getattr(obj, "_ddl_if", None)
+    if ddl_if is not None and ddl_if.dialect and ddl_if.dialect != engine.dialect.name:
+        return False
+    # Tabela FTS5 da busca no SQLite e suas tabelas internas, criadas por DDL próprio
+    if type_ == "table" and name.startswith("book_fts"):
+        return False
+    return True
+
+
+def _assinatura(revisao) -> str:
+    partes = [engine.url.render_as_string(hide_password=True), str(revisao)]
+    for tabela in Base.metadata.sorted_tables:
+        partes.extend(f"{tabela.name}.{c.name}:{c.type}:{c.nullable}:{c.primary_key}" for c in tabela.columns)
+        partes.extend(sorted(f"{tabela.name}.{i.name}:{[c.name for c in i.columns]}:{i.unique}" for i in tabela.indexes))
+    partes.extend(sorted(p.name for p in (ALEMBIC_DIR / "versions").glob("*.py")))
+    return hashlib.sha256("\n".join(partes).encode()).hexdigest()
+
+
+def _ler_cache() -> str:
+    try:
+        return Path(settings.SCHEMA_CHECK_CACHE).read_text().strip()
+    except OSError:
+        return ""
+
+
+def _gravar_cache(assinatura: str) -> None:
+    try:
+        Path(settings.SCHEMA_CHECK_CACHE).write_text(assinatura)
+    except OSError as exc:
+        logger.warning("Não foi possível gravar %s: %s", settings.SCHEMA_CHECK_CACHE, exc)
+
+
+def validar_esquema() -> bool:
+    """Falha com EsquemaInvalido se o banco não estiver no head do Alembic e igual aos modelos.
+
+    Devolve True se a validação veio do cache.
+    """
+    with engine.connect() as conn:
+        contexto = MigrationContext.configure(conn, opts={"include_object": _incluir})
+        revisao = contexto.get_current_revision()
+        assinatura = _assinatura(revisao)
+        if assinatura == _ler_cache():
+            return True
+
+        head = _script_directory().get_current_head()
+        if revisao != head:
+            raise EsquemaInvalido(
+                f"Banco na revisão {revisao}, o código espera {head}: rode 'alembic upgrade head'"
+            )
+        diferencas = compare_metadata(contexto, Base.metadata)
+        if diferencas:
+            raise EsquemaInvalido(f"Schema do banco difere dos modelos na revisão {head}: {diferencas}")
+    _gravar_cache(assinatura)
+    return False
+
+
+def resetar_banco() -> None:
+    """Apaga e recria todas as tabelas e marca o banco no head. Só para desenvolvimento."""
+    logger.warning("DB_RESET_ON_STARTUP ativo: apagando e recriando o banco %s",
+                   engine.url.render_as_string(hide_password=True))
+    with engine.begin() as conn:
+        Base.metadata.drop_all(bind=conn)
+        conn.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
+        Base.metadata.create_all(bind=conn)
+        MigrationContext.configure(conn).stamp(_script_directory(), "head")
+    if os.path.exists(settings.SCHEMA_CHECK_CACHE):
+        os.remove(settings.SCHEMA_CHECK_CACHE)
+
+
+def preparar_esquema() -> None:
+    if settings.DB_RESET_ON_STARTUP:
+        resetar_banco()
+    elif settings.DB_SCHEMA_CHECK:
+        em_cache = validar_esquema()
+        logger.info("Schema validado%s", " (cache)" if em_cache else "")
@@ -0,0 +1,157 @@
+"""Estatísticas de empréstimos por cliente e por livro.
+
+Checkout, devolução e a varredura de atrasos somam deltas às linhas de
+estatistica_cliente/estatistica_livro na mesma transação do evento, com um
+upsert (col = col + delta) que cria a linha no primeiro empréstimo. As rotas
+de estatística leem uma linha pela chave primária.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import Float, Table, case, delete, func, insert, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+from app.models.book import BookCopy
+from app.models.emprestimo import Emprestimo
+from app.models.estatistica import EstatisticaCliente, EstatisticaLivro
+
+CAMPOS = ("emprestimos", "em_aberto", "atrasados", "devolvidos", "total_multas", "duracao_total_segundos")
+
+_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert, "mysql": mysql.insert}
+
+
+class segundos_entre(FunctionElement):
+    """Segundos de `inicio` até `fim`, calculado no banco."""
+    type = Float()
+    name = "segundos_entre"
+    inherit_cache = True
+
+
+@compiles(segundos_entre)
+def _segundos_entre_generico(element, compiler, **kw):
+    inicio, fim = (compiler.process(c, **kw) for c in element.clauses)
+    return f"EXTRACT(EPOCH FROM ({fim} - {inicio}))"
+
+
+@compiles(segundos_entre, "mysql")
+def _segundos_entre_mysql(element, compiler, **kw):
+    inicio, fim = (compiler.process(c, **kw) for c in element.clauses)
+    return f"TIMESTAMPDIFF(SECOND, {inicio}, {fim})"
+
+
+@compiles(segundos_entre, "sqlite")
+def _segundos_entre_sqlite(element, compiler, **kw):
+    inicio, fim = (compiler.process(c, **kw) for c in element.clauses)
+    return f"((julianday({fim}) - julianday({inicio})) * 86400.0)"
+
+
+def _upsert(dialeto: str, tabela: Table):
+    statement = _INSERTS[dialeto](tabela)
+    if dialeto == "mysql":
+        return statement.on_duplicate_key_update({c: tabela.c[c] + statement.inserted[c] for c in CAMPOS})
+    return statement.on_conflict_do_update(
+        index_elements=list(tabela.primary_key.columns),
+        set_={c: tabela.c[c] + statement.excluded[c] for c in CAMPOS},
+    )
+
+
+async def _somar(db: AsyncSession, tabela: Table, deltas: Dict[int, Dict[str, float]]) -> None:
+    if not deltas:
+        return
+    chave = tabela.primary_key.columns[0].name
+    await db.execute(_upsert(db.get_bind().dialect.name, tabela), [
+        {chave: id_, **{c: delta.get(c, 0) for c in CAMPOS}} for id_, delta in deltas.items()
+    ])
+
+
+async def ajustar_estatisticas_em_lote(db: AsyncSession, eventos: Iterable[Tuple[int, int, Dict[str, float]]]) -> None:
+    """Soma os deltas de cada (cliente_id, book_id, {campo: delta}) às duas tabelas.
+
+    Os eventos do mesmo cliente ou livro são agregados antes: um upsert por
+    tabela. Não faz commit.
+    """
+    por_cliente = defaultdict(lambda: defaultdict(float))
+    por_livro = defaultdict(lambda: defaultdict(float))
+    for cliente_id, book_id, deltas in eventos:
+        for campo, valor in deltas.items():
+            por_cliente[cliente_id][campo] += valor
+            por_livro[book_id][campo] += valor
+    await _somar(db, EstatisticaCliente.__table__, por_cliente)
+    await _somar(db, EstatisticaLivro.__table__, por_livro)
+
+
+async def ajustar_estatisticas(db: AsyncSession, cliente_id: int, book_id: int, **deltas: float) -> None:
+    """Soma `deltas` às estatísticas do cliente e do livro, na transação de `db`."""
+    await ajustar_estatisticas_em_lote(db, [(cliente_id, book_id, deltas)])
+
+
+def deltas_da_devolucao(data_retirada: datetime, data_devolucao: datetime, multa: float,
+                        estava_atrasado: bool) -> Dict[str, float]:
+    """Deltas de um empréstimo em aberto devolvido em `data_devolucao` com `multa`."""
+    return {
+        "em_aberto": -1,
+        "atrasados": -1 if estava_atrasado else 0,
+        "devolvidos": 1,
+        "total_multas": multa,
+        "duracao_total_segundos": (data_devolucao - data_retirada).total_seconds(),
+    }
+
+
+async def registrar_atrasos(db: AsyncSession, agora: datetime) -> None:
+    """Conta os empréstimos 'ativo' vencidos em `agora`, que a varredura vai marcar como atrasados.
+
+    As linhas contadas ficam travadas (FOR UPDATE) até o commit da varredura:
+    uma devolução concorrente espera, e o UPDATE seguinte marca exatamente os
+    empréstimos contados. Um GROUP BY sem trava contava uma foto que podia
+    mudar antes do UPDATE.
+    """
+    result = await db.execute(
+        select(Emprestimo.cliente_id, BookCopy.book_id)
+        .join(BookCopy, BookCopy.id == Emprestimo.livro_copia_id)
+        .where(Emprestimo.status == 'ativo', Emprestimo.data_devolucao_prevista < agora)
+        .with_for_update(of=Emprestimo)
+    )
+    await ajustar_estatisticas_em_lote(db, [
+        (cliente_id, book_id, {"atrasados": 1}) for cliente_id, book_id in result
+    ])
+
+
+def _agregado(chave):
+    devolvido = Emprestimo.data_devolucao_real.isnot(None)
+    return (
+        select(
+            chave,
+            func.count(),
+            func.coalesce(func.sum(case((devolvido, 0), else_=1)), 0),
+            func.coalesce(func.sum(case((Emprestimo.status == 'atrasado', 1), else_=0)), 0),
+            func.coalesce(func.sum(case((devolvido, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((devolvido, Emprestimo.valor_multa), else_=0)), 0),
+            func.coalesce(func.sum(case(
+                (devolvido, segundos_entre(Emprestimo.data_retirada, Emprestimo.data_devolucao_real)), else_=0
+            )), 0),
+        )
+        .select_from(Emprestimo)
+        .join(BookCopy, BookCopy.id == Emprestimo.livro_copia_id)
+        .group_by(chave)
+    )
+
+
+async def recalcular_estatisticas(db: AsyncSession) -> Tuple[int, int]:
+    """Refaz as duas tabelas a partir de "emprestimo", numa transação.
+
+    Devolve quantos clientes e quantos livros ficaram com estatísticas.
+    """
+    linhas = []
+    for modelo, chave in ((EstatisticaCliente, Emprestimo.cliente_id), (EstatisticaLivro, BookCopy.book_id)):
+        tabela = modelo.__table__
+        await db.execute(delete(tabela))
+        result = await db.execute(
+            insert(tabela).from_select([tabela.primary_key.columns[0].name, *CAMPOS], _agregado(chave))
+        )
+        linhas.append(result.rowcount)
+    await db.commit()
+    return linhas[0], linhas[1]
@@ -0,0 +1,96 @@
+import hashlib
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.codificacao import negociar_codificacao, negociar_formato
+from app.models.versao import TableVersion
+from database import get_db, get_read_db
+
+
+# ETag calculado para a requisição atual, para respostas montadas pela própria rota
+etag_da_requisicao: ContextVar[Optional[str]] = ContextVar("etag_da_requisicao", default=None)
+
+# Versões das tabelas que entraram no ETag, para as rotas com cache guardarem
+# o valor junto delas (cache.get_or_load(..., versao=...))
+versoes_da_requisicao: ContextVar[Optional[str]] = ContextVar("versoes_da_requisicao", default=None)
+
+
+class NaoModificado(Exception):
+    """Levantada pela dependência de ETag; main.py responde 304."""
+
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+def _etags(valor: str) -> set:
+    # If-None-Match usa comparação fraca: W/"x" casa com "x"
+    return {parte.strip().removeprefix("W/") for parte in valor.split(",")}
+
+
+def _validar(request: Request, response: Response, versao: str) -> None:
+    # ETag forte: cada representação (JSON, MessagePack, gzip, br) tem o seu
+    representacao = (negociar_formato(request.headers.get("accept", "")),
+                     negociar_codificacao(request.headers.get("accept-encoding", "")) or "identity")
+    chave = "|".join([request.url.path, request.url.query, *representacao, versao])
+    etag = f'"{hashlib.sha1(chave.encode()).hexdigest()[:20]}"'
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in _etags(if_none_match)):
+        raise NaoModificado(etag)
+    response.headers["ETag"] = etag
+    etag_da_requisicao.set(etag)
+    versoes_da_requisicao.set(versao)
+
+
+def condicional(*tabelas: str, replica: bool = True):
+    """Dependência de rota GET: ETag forte a partir das versões das `tabelas`.
+
+    O ETag combina caminho, query string, representação negociada (formato e
+    compressão) e versões, então muda sempre que uma das tabelas recebe um
+    commit. Se o cliente mandar o mesmo valor em If-None-Match, a rota nem
+    chega a rodar: a resposta é 304.
+
+    As versões são lidas do mesmo banco que a rota usa (e na mesma sessão):
+    `replica=False` para rotas em get_db.
+    """
+    async def dependencia(
+        request: Request, response: Response, db: AsyncSession = Depends(get_read_db if replica else get_db)
+    ):
+        result = await db.execute(
+            select(TableVersion.tabela, TableVersion.versao).where(TableVersion.tabela.in_(tabelas))
+        )
+        versoes = dict(result.all())
+        _validar(request, response, "|".join(f"{t}={versoes.get(t, 0)}" for t in tabelas))
+
+    return Depends(dependencia)
+
+
+def condicional_linha(entidade, parametro: str, coluna: str = "id"):
+    """Como condicional(), para rotas de um registro só: usa a versao_linha
+    da linha em que `coluna` é igual ao parâmetro de caminho `parametro`.
+
+    Uma escrita em outra linha da tabela (um empréstimo de outro livro, por
+    exemplo) não muda este ETag nem desatualiza o valor em cache desta. Lê do
+    primário, como as rotas com cache.
+    """
+    tabela = entidade.__table__
+
+    async def dependencia(request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+        try:
+            valor = tabela.c[coluna].type.python_type(request.path_params[parametro])
+        except ValueError:
+            return  # a validação da própria rota responde 422
+        linha = (await db.execute(
+            select(tabela.c.id, tabela.c.versao_linha).where(tabela.c[coluna] == valor)
+        )).first()
+        if linha is None:
+            # Sem ETag para o 404, e uma versão que não casa com nada em cache
+            versoes_da_requisicao.set(f"{tabela.name}:-")
+            return
+        _validar(request, response, f"{tabela.name}:{linha.id}={linha.versao_linha}")
+
+    return Depends(dependencia)
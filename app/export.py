@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+from typing import Literal
+
+from fastapi.responses import StreamingResponse
+
+from database import sessao_de_leitura
+
+ExportFormat = Literal["ndjson", "csv"]
+
+# Quantidade de linhas trazidas do cursor do servidor por vez
+LINHAS_POR_LOTE = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _json_default(value):
+    # datas no mesmo formato ISO usado pelas respostas JSON da API
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+async def _ler_lotes(statement):
+    # A sessão é aberta aqui e não via Depends(get_db): o FastAPI fecha as
+    # dependências antes do corpo de um StreamingResponse ser enviado.
+    # Exportações são só leitura: vão à réplica, se houver.
+    async with await sessao_de_leitura() as db:
+        result = await db.stream(statement, execution_options={"yield_per": LINHAS_POR_LOTE})
+        yield list(result.keys())
+        async for lote in result.mappings().partitions():
+            yield lote
+
+
+async def _ndjson(statement):
+    lotes = _ler_lotes(statement)
+    await anext(lotes)
+    async for lote in lotes:
+        yield "".join(json.dumps(dict(row), default=_json_default, ensure_ascii=False) + "\n" for row in lote)
+
+
+async def _csv(statement):
+    lotes = _ler_lotes(statement)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(await anext(lotes))
+    yield buffer.getvalue()
+    async for lote in lotes:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(row.values() for row in lote)
+        yield buffer.getvalue()
+
+
+def stream_export(statement, format: ExportFormat, filename: str) -> StreamingResponse:
+    """Exporta o resultado de `statement` em NDJSON ou CSV sem carregar tudo em memória."""
+    body = _ndjson(statement) if format == "ndjson" else _csv(statement)
+    extensao = "ndjson" if format == "ndjson" else "csv"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{extensao}"'},
+    )
@@ -0,0 +1,64 @@
+"""Rotinas periódicas de manutenção do banco.
+
+    python -m app.jobs atrasos
+    python -m app.jobs contadores
+    python -m app.jobs estatisticas
+"""
+import argparse
+import asyncio
+
+# Todos os modelos precisam estar registrados para o mapeamento das relações
+from app.models.empresa import Empresa  # noqa: F401
+from app.models.book import Book, BookCopy  # noqa: F401
+from app.models.cargo import Cargo  # noqa: F401
+from app.models.emprestimo import Emprestimo  # noqa: F401
+from app.models.estatistica import EstatisticaCliente, EstatisticaLivro  # noqa: F401
+from app.models.pessoa import Pessoa, Cliente, Funcionario  # noqa: F401
+from app.models.versao import TableVersion  # noqa: F401
+from app.disponibilidade import recalcular_contadores
+from app.estatisticas import recalcular_estatisticas
+from app.multas import processar_atrasos
+from database import AsyncSessionLocal, async_engine
+
+
+async def _atrasos():
+    async with AsyncSessionLocal() as db:
+        atualizados = await processar_atrasos(db)
+    print(f"{atualizados} empréstimos atrasados atualizados")
+
+
+async def _contadores():
+    async with AsyncSessionLocal() as db:
+        corrigidos = await recalcular_contadores(db)
+    print(f"{corrigidos} livros com contadores de cópias corrigidos")
+
+
+async def _estatisticas():
+    async with AsyncSessionLocal() as db:
+        clientes, livros = await recalcular_estatisticas(db)
+    print(f"Estatísticas de empréstimos recalculadas: {clientes} clientes, {livros} livros")
+
+
+JOBS = {
+    "atrasos": _atrasos,
+    "contadores": _contadores,
+    "estatisticas": _estatisticas,
+}
+
+
+async def _executar(nome: str):
+    try:
+        await JOBS[nome]()
+    finally:
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("job", choices=sorted(JOBS))
+    args = parser.parse_args()
+    asyncio.run(_executar(args.job))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean
+from sqlalchemy import BigInteger, Column, Integer, String, ForeignKey, Boolean, Index, DDL, event
 from sqlalchemy.orm import relationship
 from database import Base
+from app.models.versao import nova_versao_de_linha
 
 
 class Book(Base):
@@ -13,8 +14,41 @@ class Book(Base):
     publisher = Column(String(128), nullable=True)
     publication_year = Column(Integer, nullable=True)
     edition = Column(String(32), nullable=True)
+    # Mantidos pelas rotas de cópias e de empréstimos; python -m app.jobs contadores recalcula
+    total_copies = Column(Integer, nullable=False, default=0, server_default="0")
+    available_copies = Column(Integer, nullable=False, default=0, server_default="0")
+    # Trocada a cada escrita na linha (app.models.versao): ETag e cache de /{id}
+    versao_linha = Column(BigInteger, nullable=False, default=nova_versao_de_linha, server_default="0")
     copies = relationship("BookCopy", back_populates="book")
 
+    __table_args__ = (
+        # Índice da busca textual (/books/search); só existe no MySQL
+        Index("ix_book_fulltext", "title", "author", "publisher", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
+
+
+# No SQLite a busca usa uma tabela FTS5 mantida por triggers sobre "book"
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS book_fts USING fts5("
+    "title, author, publisher, content='book', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS book_fts_ai AFTER INSERT ON book BEGIN "
+    "INSERT INTO book_fts(rowid, title, author, publisher) "
+    "VALUES (new.id, new.title, new.author, new.publisher); END",
+    "CREATE TRIGGER IF NOT EXISTS book_fts_ad AFTER DELETE ON book BEGIN "
+    "INSERT INTO book_fts(book_fts, rowid, title, author, publisher) "
+    "VALUES ('delete', old.id, old.title, old.author, old.publisher); END",
+    "CREATE TRIGGER IF NOT EXISTS book_fts_au AFTER UPDATE ON book BEGIN "
+    "INSERT INTO book_fts(book_fts, rowid, title, author, publisher) "
+    "VALUES ('delete', old.id, old.title, old.author, old.publisher); "
+    "INSERT INTO book_fts(rowid, title, author, publisher) "
+    "VALUES (new.id, new.title, new.author, new.publisher); END",
+]
+
+for _statement in SQLITE_FTS_DDL:
+    event.listen(Book.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(Book.__table__, "before_drop", DDL("DROP TABLE IF EXISTS book_fts").execute_if(dialect="sqlite"))
+
 
 class BookCopy(Base):
     __tablename__ = "book_copy"
@@ -25,5 +59,17 @@ class BookCopy(Base):
     is_available = Column(Boolean, default=True)
     condition = Column(String(32), nullable=True)
     location = Column(String(64), nullable=True)
-    
-    book = relationship("Book", back_populates="copies") 
\ No newline at end of file
+
+    book = relationship("Book", back_populates="copies")
+
+    __table_args__ = (
+        # Também atende às buscas só por book_id (prefixo do índice)
+        Index("uq_book_copy_book_id_copy_number", "book_id", "copy_number", unique=True),
+        # Filtro + id: as listagens paginadas (ORDER BY id) saem na ordem do
+        # índice, sem ordenar as cópias encontradas a cada página
+        Index("ix_book_copy_disponivel", "is_available", "id"),
+        Index("ix_book_copy_livro", "book_id", "id"),
+        Index("ix_book_copy_condition", "condition"),
+        # Cópias por estante (prefixo da localização) em /copies/search
+        Index("ix_book_copy_location", "location", "is_available"),
+    )
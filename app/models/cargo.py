@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import BigInteger, Column, Integer, String, Float
 from sqlalchemy.orm import relationship
 from database import Base
+from app.models.versao import nova_versao_de_linha
 
 
 class Cargo(Base):
@@ -11,6 +12,8 @@ class Cargo(Base):
     descricao = Column(String(256), nullable=True)
     salario_base = Column(Float, nullable=False)
     nivel_hierarquico = Column(Integer, nullable=False)
+    # Trocada a cada escrita na linha (app.models.versao): ETag e cache de /{id}
+    versao_linha = Column(BigInteger, nullable=False, default=nova_versao_de_linha, server_default="0")
     
     # Relationship with Funcionario
     funcionarios = relationship("Funcionario", back_populates="cargo") 
\ No newline at end of file
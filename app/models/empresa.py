@@ -1,14 +1,17 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float
+from sqlalchemy import BigInteger, Column, Integer, String, Boolean, Float
 from database import Base
+from app.models.versao import nova_versao_de_linha
 
 
 class Empresa(Base):
     __tablename__ = "empresa"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    cnpj = Column(String(14), nullable=False)
+    cnpj = Column(String(14), nullable=False, index=True)
     razao_social = Column(String(128), nullable=False)
     nome_fantasia = Column(String(128), nullable=True)
     numero_contato = Column(String(16), nullable=True)
     website = Column(String(64), nullable=True)
     email_contato = Column(String(64), nullable=True)
+    # Trocada a cada escrita na linha (app.models.versao): ETag e cache de /{id}
+    versao_linha = Column(BigInteger, nullable=False, default=nova_versao_de_linha, server_default="0")
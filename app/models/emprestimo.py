@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Boolean, Index
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -8,8 +8,8 @@ class Emprestimo(Base):
     __tablename__ = "emprestimo"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    cliente_id = Column(Integer, ForeignKey("cliente.id"), nullable=False)
-    livro_copia_id = Column(Integer, ForeignKey("book_copy.id"), nullable=False)
+    cliente_id = Column(Integer, ForeignKey("cliente.id"), nullable=False, index=True)
+    livro_copia_id = Column(Integer, ForeignKey("book_copy.id"), nullable=False, index=True)
     data_retirada = Column(DateTime, nullable=False, default=datetime.now)
     data_devolucao_prevista = Column(DateTime, nullable=False)
     data_devolucao_real = Column(DateTime, nullable=True)
@@ -18,4 +18,9 @@ class Emprestimo(Base):
     
     # Relationships
     cliente = relationship("Cliente", backref="emprestimos")
-    livro_copia = relationship("BookCopy", backref="emprestimos") 
\ No newline at end of file
+    livro_copia = relationship("BookCopy", backref="emprestimos")
+
+    __table_args__ = (
+        # Varredura de atrasos: status em aberto e vencimento já passado
+        Index("ix_emprestimo_status_prevista", "status", "data_devolucao_prevista"),
+    ) 
\ No newline at end of file
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, ForeignKey, Float
+from database import Base
+
+
+class _Estatistica:
+    # Contagens mantidas pelo checkout, pela devolução e pela varredura de atrasos;
+    # python -m app.jobs estatisticas recalcula tudo a partir de "emprestimo"
+    emprestimos = Column(Integer, nullable=False, default=0, server_default="0")
+    em_aberto = Column(Integer, nullable=False, default=0, server_default="0")
+    atrasados = Column(Integer, nullable=False, default=0, server_default="0")
+    devolvidos = Column(Integer, nullable=False, default=0, server_default="0")
+    # Multas cobradas nas devoluções e soma das durações dos empréstimos devolvidos
+    total_multas = Column(Float, nullable=False, default=0.0, server_default="0")
+    duracao_total_segundos = Column(Float, nullable=False, default=0.0, server_default="0")
+
+
+class EstatisticaCliente(_Estatistica, Base):
+    __tablename__ = "estatistica_cliente"
+
+    cliente_id = Column(Integer, ForeignKey("cliente.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+
+
+class EstatisticaLivro(_Estatistica, Base):
+    __tablename__ = "estatistica_livro"
+
+    book_id = Column(Integer, ForeignKey("book.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey, Float
+from sqlalchemy import BigInteger, Column, Integer, String, Boolean, Date, ForeignKey, Float
 from sqlalchemy.orm import relationship
 from database import Base
+from app.models.versao import nova_versao_de_linha
 
 
 class Pessoa(Base):
@@ -13,6 +14,8 @@ class Pessoa(Base):
     email = Column(String(64), nullable=True)
     telefone = Column(String(16), nullable=True)
     endereco = Column(String(256), nullable=True)
+    # Trocada a cada escrita na linha (app.models.versao): ETag e cache de /{id}
+    versao_linha = Column(BigInteger, nullable=False, default=nova_versao_de_linha, server_default="0")
     
     # Discriminator column for inheritance
     tipo = Column(String(20), nullable=False)
@@ -28,7 +31,7 @@ class Cliente(Pessoa):
 
     id = Column(Integer, ForeignKey('pessoa.id'), primary_key=True)
     data_cadastro = Column(Date, nullable=False)
-    status = Column(String(20), nullable=False, default='ativo')
+    status = Column(String(20), nullable=False, default='ativo', index=True)
     
     __mapper_args__ = {
         'polymorphic_identity': 'cliente',
@@ -39,10 +42,10 @@ class Funcionario(Pessoa):
     __tablename__ = "funcionario"
 
     id = Column(Integer, ForeignKey('pessoa.id'), primary_key=True)
-    cargo_id = Column(Integer, ForeignKey('cargo.id'), nullable=False)
+    cargo_id = Column(Integer, ForeignKey('cargo.id'), nullable=False, index=True)
     data_contratacao = Column(Date, nullable=False)
     salario = Column(Float, nullable=False)
-    ativo = Column(Boolean, default=True)
+    ativo = Column(Boolean, default=True, index=True)
     
     # Relationship with Cargo
     cargo = relationship("Cargo", back_populates="funcionarios")
@@ -0,0 +1,92 @@
+import secrets
+
+from sqlalchemy import Column, Integer, String, event, insert, select, update
+from sqlalchemy.orm import Session
+from database import Base
+
+
+class TableVersion(Base):
+    """Versão de cada tabela, incrementada em todo commit que a altera (base dos ETags)."""
+    __tablename__ = "table_version"
+
+    tabela = Column(String(64), primary_key=True)
+    versao = Column(Integer, nullable=False, default=0)
+
+
+# Uma linha por tabela já na criação do schema (create_all)
+@event.listens_for(TableVersion.__table__, "after_create")
+def _criar_linhas(target, connection, **kw):
+    tabelas = [t.name for t in Base.metadata.sorted_tables if t is not target]
+    connection.execute(insert(target), [{"tabela": nome, "versao": 0} for nome in tabelas])
+
+
+def _anotar(session: Session, tabelas) -> None:
+    nomes = {t.name for t in tabelas} - {TableVersion.__tablename__}
+    if nomes:
+        session.info.setdefault("tabelas_alteradas", set()).update(nomes)
+
+
+@event.listens_for(Session, "after_flush")
+def _tabelas_do_flush(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        # Herança joined: um Cliente altera "pessoa" e "cliente"
+        _anotar(session, type(obj).__mapper__.tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _tabelas_do_comando(orm_execute_state):
+    # INSERT/UPDATE/DELETE em massa não passam pelo flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        tabelas = mapper.tables if mapper is not None else [orm_execute_state.statement.table]
+        _anotar(orm_execute_state.session, tabelas)
+    if orm_execute_state.is_update:
+        statement = orm_execute_state.statement
+        if "versao_linha" in statement.table.c:
+            orm_execute_state.statement = statement.values(versao_linha=nova_versao_de_linha())
+
+
+def nova_versao_de_linha() -> int:
+    # Aleatória, não sequencial: um id reaproveitado depois de um DELETE não
+    # repete a versão da linha antiga
+    return secrets.randbits(62)
+
+
+@event.listens_for(Base, "before_update", propagate=True)
+def _trocar_versao_de_linha(mapper, connection, target):
+    # UPDATE pelo flush do ORM; os em massa são tratados em _tabelas_do_comando
+    if "versao_linha" in mapper.columns:
+        target.versao_linha = nova_versao_de_linha()
+
+
+def _somar_versoes(conn, tabelas) -> None:
+    # Em ordem, para duas transações travarem as linhas na mesma sequência
+    tabelas = sorted(tabelas)
+    result = conn.execute(
+        update(TableVersion)
+        .where(TableVersion.tabela.in_(tabelas))
+        .values(versao=TableVersion.versao + 1)
+    )
+    if result.rowcount < len(tabelas):
+        # Tabela criada depois da migração que populou table_version
+        existentes = set(conn.scalars(select(TableVersion.tabela).where(TableVersion.tabela.in_(tabelas))))
+        conn.execute(insert(TableVersion), [{"tabela": nome, "versao": 1} for nome in tabelas if nome not in existentes])
+
+
+@event.listens_for(Session, "before_commit")
+def _incrementar_versoes(session):
+    # O flush do commit só acontece depois deste evento: antecipá-lo aqui
+    # garante que as tabelas dele entram no mesmo incremento
+    session.flush()
+    tabelas = session.info.pop("tabelas_alteradas", None)
+    if not tabelas:
+        return
+    # Último comando antes do COMMIT, na conexão da própria sessão: as linhas
+    # de table_version ficam travadas só entre este UPDATE e o COMMIT, e a
+    # versão nova é gravada junto com os dados (ou nenhum dos dois, se falhar)
+    _somar_versoes(session.connection(), tabelas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar(session):
+    session.info.pop("tabelas_alteradas", None)
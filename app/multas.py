@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Integer, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+import settings
+from app.estatisticas import registrar_atrasos
+from app.models.emprestimo import Emprestimo
+
+STATUS_EM_ABERTO = ('ativo', 'atrasado')
+
+
+class dias_de_atraso(FunctionElement):
+    """Dias inteiros de `inicio` até `fim`, como timedelta.days, calculado no banco."""
+    type = Integer()
+    name = "dias_de_atraso"
+    inherit_cache = True
+
+
+@compiles(dias_de_atraso)
+def _dias_de_atraso_generico(element, compiler, **kw):
+    inicio, fim = (compiler.process(c, **kw) for c in element.clauses)
+    # FLOOR, como timedelta.days: o CAST para inteiro do PostgreSQL arredonda (1,6 dia viraria 2)
+    return f"FLOOR(EXTRACT(EPOCH FROM ({fim} - {inicio})) / 86400)"
+
+
+@compiles(dias_de_atraso, "mysql")
+def _dias_de_atraso_mysql(element, compiler, **kw):
+    inicio, fim = (compiler.process(c, **kw) for c in element.clauses)
+    return f"TIMESTAMPDIFF(DAY, {inicio}, {fim})"
+
+
+@compiles(dias_de_atraso, "sqlite")
+def _dias_de_atraso_sqlite(element, compiler, **kw):
+    inicio, fim = (compiler.process(c, **kw) for c in element.clauses)
+    return f"CAST(julianday({fim}) - julianday({inicio}) AS INTEGER)"
+
+
+def calcular_multa(data_devolucao_prevista: datetime, data_atual: datetime) -> float:
+    if data_atual <= data_devolucao_prevista:
+        return 0.0
+    return (data_atual - data_devolucao_prevista).days * settings.MULTA_POR_DIA
+
+
+async def processar_atrasos(db: AsyncSession, agora: Optional[datetime] = None) -> int:
+    """Marca como 'atrasado' todo empréstimo em aberto vencido e atualiza a multa acumulada.
+
+    Um único UPDATE sobre o índice (status, data_devolucao_prevista); devolve
+    quantos empréstimos foram atualizados. Os que passam de 'ativo' para
+    'atrasado' entram nas estatísticas na mesma transação.
+    """
+    agora = agora or datetime.now()
+    await registrar_atrasos(db, agora)
+    result = await db.execute(
+        update(Emprestimo)
+        .where(
+            Emprestimo.status.in_(STATUS_EM_ABERTO),
+            Emprestimo.data_devolucao_prevista < agora,
+        )
+        .values(
+            status='atrasado',
+            valor_multa=dias_de_atraso(Emprestimo.data_devolucao_prevista, agora) * settings.MULTA_POR_DIA,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
@@ -0,0 +1,68 @@
+import base64
+import json
+from dataclasses import dataclass
+from typing import Generic, List, Optional, TypeVar
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+@dataclass
+class PageParams:
+    """Parâmetros de paginação por cursor (keyset sobre o id)."""
+    after: Optional[int]
+    limit: int
+
+
+async def page_params(
+    cursor: Optional[str] = Query(None, description="Cursor opaco retornado em next_cursor"),
+    limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+) -> PageParams:
+    return PageParams(after=decode_cursor(cursor) if cursor else None, limit=limit)
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return last_id
+
+
+async def paginate(db: AsyncSession, statement, column, params: PageParams, key=lambda row: row.id):
+    """Aplica a paginação keyset em `statement`, ordenando por `column`.
+
+    Busca uma linha a mais que o limite para saber se existe próxima página,
+    assim nenhuma contagem da tabela inteira é necessária. Devolve as linhas
+    (Row) do select, mesmo com uma coluna só, e `key` diz como obter o id de
+    cada uma.
+    """
+    if params.after is not None:
+        statement = statement.where(column > params.after)
+    result = await db.execute(statement.order_by(column).limit(params.limit + 1))
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        next_cursor = encode_cursor(key(rows[-1]))
+    return {"items": rows, "next_cursor": next_cursor}
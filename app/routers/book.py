@@ -1,10 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends
+from collections import Counter
+from fastapi import APIRouter, HTTPException, Depends, Query, Body
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.book import Book, BookCopy
-from database import get_db
+from app.cache import cache
+from app.disponibilidade import ajustar_contadores, ajustar_contadores_em_lote
+from app.bulk import LIMITE_LOTE, BulkError, BulkResult
+from app.etag import condicional, condicional_linha, versoes_da_requisicao
+from app.export import ExportFormat, stream_export
+from app.pagination import Page, PageParams, page_params
+from app.search import buscar_livros
+from app.serializacao import Campos, RespostaJSON, campos, colunas, linhas, paginar, projetar
+from database import get_db, get_read_db
 
 router = APIRouter(prefix="/books", tags= ["Book"])
 
@@ -22,10 +32,17 @@ class BookCreate(BookBase):
 
 class BookResponse(BookBase):
     id: int
+    total_copies: int = 0
+    available_copies: int = 0
 
     class Config:
         from_attributes = True
 
+class BookAvailability(BaseModel):
+    book_id: int
+    total_copies: int
+    available_copies: int
+
 class BookUpdate(BaseModel):
     title: Optional[str] = None
     author: Optional[str] = None
@@ -50,6 +67,9 @@ class BookCopyResponse(BookCopyBase):
     class Config:
         from_attributes = True
 
+class BookCopySearchResult(BookCopyResponse):
+    book_title: str
+
 class BookCopyUpdate(BaseModel):
     copy_number: Optional[int] = None
     condition: Optional[str] = None
@@ -58,98 +78,170 @@ class BookCopyUpdate(BaseModel):
 
 # Book Routes
 @router.post("/", response_model=BookResponse, status_code=201)
-def create_book(book: BookCreate, db: Session = Depends(get_db)):
+async def create_book(book: BookCreate, db: AsyncSession = Depends(get_db)):
     # Verificar se já existe um livro com o mesmo ISBN
-    book_existente = db.query(Book).filter(Book.isbn == book.isbn).first()
+    book_existente = await db.scalar(select(Book).where(Book.isbn == book.isbn))
     if book_existente:
         raise HTTPException(status_code=400, detail="Já existe um livro com este ISBN")
     
     db_book = Book(**book.model_dump())
     db.add(db_book)
-    db.commit()
-    db.refresh(db_book)
+    await db.commit()
+    await db.refresh(db_book)
     return db_book
 
-@router.get("/", response_model=List[BookResponse])
-def list_books(db: Session = Depends(get_db)):
-    books = db.query(Book).all()
-    return books
+@router.post("/bulk", response_model=BulkResult[BookResponse], status_code=201)
+async def create_books_bulk(
+    books: List[BookCreate] = Body(..., max_length=LIMITE_LOTE),
+    db: AsyncSession = Depends(get_db),
+):
+    # ISBNs já cadastrados, verificados para o lote inteiro em uma só consulta
+    isbns = {book.isbn for book in books}
+    existentes = set((await db.scalars(select(Book.isbn).where(Book.isbn.in_(isbns)))).all())
+    
+    errors = []
+    validos = {}
+    for index, book in enumerate(books):
+        if book.isbn in existentes:
+            errors.append(BulkError(index=index, detail="Já existe um livro com este ISBN"))
+        elif book.isbn in validos:
+            errors.append(BulkError(index=index, detail="ISBN repetido no lote"))
+        else:
+            validos[book.isbn] = book.model_dump()
+    
+    created = []
+    if validos:
+        # executemany em uma única transação
+        await db.execute(insert(Book), list(validos.values()))
+        created = (await db.scalars(select(Book).where(Book.isbn.in_(validos)).order_by(Book.id))).all()
+        await db.commit()
+    return {"created": created, "errors": errors}
+
+@router.get("/", response_model=Page[BookResponse], dependencies=[condicional("book")])
+async def list_books(
+    fields: Campos = campos(BookResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await paginar(db, select(*colunas(BookResponse, Book, fields)), Book.id, page)
 
-@router.get("/{book_id}", response_model=BookResponse)
-def get_book(book_id: int, db: Session = Depends(get_db)):
-    book = db.query(Book).filter(Book.id == book_id).first()
+@router.get("/export")
+async def export_books(format: ExportFormat = "ndjson"):
+    return stream_export(select(Book.__table__).order_by(Book.id), format, "books")
+
+@router.get("/search", response_model=List[BookResponse], dependencies=[condicional("book")])
+async def search_books(
+    q: str = Query(..., min_length=1, description="Termos buscados em título, autor e editora"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await buscar_livros(db, q, limit)
+
+# Rotas que preenchem o cache compartilhado leem do primário: com a réplica
+# atrasada, um valor velho ficaria no cache até o TTL depois da invalidação
+@router.get("/{book_id}", response_model=BookResponse, dependencies=[condicional_linha(Book, "book_id")])
+async def get_book(book_id: int, fields: Campos = campos(BookResponse), db: AsyncSession = Depends(get_db)):
+    # O cache guarda o livro inteiro; fields só recorta a resposta
+    async def carregar():
+        book = await db.get(Book, book_id)
+        return BookResponse.model_validate(book).model_dump(mode="json") if book else None
+    
+    book = await cache.get_or_load(f"book:{book_id}", carregar, versao=versoes_da_requisicao.get())
     if book is None:
         raise HTTPException(status_code=404, detail="Livro não encontrado")
+    if fields is not None:
+        return RespostaJSON(projetar(book, fields))
     return book
 
 @router.put("/{book_id}", response_model=BookResponse)
-def update_book(book_id: int, book: BookUpdate, db: Session = Depends(get_db)):
-    db_book = db.query(Book).filter(Book.id == book_id).first()
+async def update_book(book_id: int, book: BookUpdate, db: AsyncSession = Depends(get_db)):
+    db_book = await db.get(Book, book_id)
     if db_book is None:
         raise HTTPException(status_code=404, detail="Livro não encontrado")
     
     # Se estiver atualizando o ISBN, verificar se já existe outro livro com o mesmo ISBN
     if book.isbn and book.isbn != db_book.isbn:
-        book_existente = db.query(Book).filter(Book.isbn == book.isbn).first()
+        book_existente = await db.scalar(select(Book).where(Book.isbn == book.isbn))
         if book_existente:
             raise HTTPException(status_code=400, detail="Já existe um livro com este ISBN")
     
+    isbn_anterior = db_book.isbn
     update_data = book.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_book, key, value)
     
-    db.commit()
-    db.refresh(db_book)
+    await db.commit()
+    await cache.invalidate(f"book:{book_id}", f"book:isbn:{isbn_anterior}", f"book:isbn:{db_book.isbn}")
+    await db.refresh(db_book)
     return db_book
 
 @router.delete("/{book_id}")
-def delete_book(book_id: int, db: Session = Depends(get_db)):
-    book = db.query(Book).filter(Book.id == book_id).first()
+async def delete_book(book_id: int, db: AsyncSession = Depends(get_db)):
+    book = await db.get(Book, book_id)
     if book is None:
         raise HTTPException(status_code=404, detail="Livro não encontrado")
     
     # Verificar se existem cópias vinculadas a este livro
-    copies = db.query(BookCopy).filter(BookCopy.book_id == book_id).first()
+    copies = await db.scalar(select(BookCopy.id).where(BookCopy.book_id == book_id).limit(1))
     if copies:
         raise HTTPException(
             status_code=400, 
             detail="Não é possível deletar este livro pois existem cópias vinculadas a ele"
         )
     
-    db.delete(book)
-    db.commit()
+    await db.delete(book)
+    await db.commit()
+    await cache.invalidate(f"book:{book_id}", f"book:isbn:{book.isbn}")
     return {"message": "Livro deletado com sucesso"}
 
-@router.get("/isbn/{isbn}", response_model=BookResponse)
-def get_book_by_isbn(isbn: str, db: Session = Depends(get_db)):
-    book = db.query(Book).filter(Book.isbn == isbn).first()
-    if book is None:
+@router.get("/{book_id}/availability", response_model=BookAvailability, dependencies=[condicional_linha(Book, "book_id")])
+async def get_book_availability(book_id: int, db: AsyncSession = Depends(get_db)):
+    book = await get_book(book_id, None, db)
+    return {"book_id": book_id, "total_copies": book["total_copies"], "available_copies": book["available_copies"]}
+
+@router.get("/isbn/{isbn}", response_model=BookResponse, dependencies=[condicional_linha(Book, "isbn", coluna="isbn")])
+async def get_book_by_isbn(isbn: str, fields: Campos = campos(BookResponse), db: AsyncSession = Depends(get_db)):
+    # O ISBN guarda só o id; o livro vem da chave book:{id}, com a mesma
+    # versao_linha lida para o ETag
+    async def carregar():
+        return await db.scalar(select(Book.id).where(Book.isbn == isbn))
+    
+    book_id = await cache.get_or_load(f"book:isbn:{isbn}", carregar, versao=versoes_da_requisicao.get())
+    if book_id is None:
         raise HTTPException(status_code=404, detail="Livro não encontrado")
-    return book
+    return await get_book(book_id, fields, db)
 
-@router.get("/author/{author}", response_model=List[BookResponse])
-def get_books_by_author(author: str, db: Session = Depends(get_db)):
-    books = db.query(Book).filter(Book.author.ilike(f"%{author}%")).all()
-    return books
+@router.get("/author/{author}", response_model=Page[BookResponse], deprecated=True, dependencies=[condicional("book")])
+async def get_books_by_author(
+    author: str,
+    fields: Campos = campos(BookResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await paginar(db, select(*colunas(BookResponse, Book, fields)).where(Book.author.ilike(f"%{author}%")), Book.id, page)
 
-@router.get("/title/{title}", response_model=List[BookResponse])
-def get_books_by_title(title: str, db: Session = Depends(get_db)):
-    books = db.query(Book).filter(Book.title.ilike(f"%{title}%")).all()
-    return books
+@router.get("/title/{title}", response_model=Page[BookResponse], deprecated=True, dependencies=[condicional("book")])
+async def get_books_by_title(
+    title: str,
+    fields: Campos = campos(BookResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await paginar(db, select(*colunas(BookResponse, Book, fields)).where(Book.title.ilike(f"%{title}%")), Book.id, page)
 
 # Book Copy Routes
 @router.post("/copies/",tags=["Book Copies"], response_model=BookCopyResponse, status_code=201)
-def create_book_copy(copy: BookCopyCreate, db: Session = Depends(get_db)):
+async def create_book_copy(copy: BookCopyCreate, db: AsyncSession = Depends(get_db)):
     # Verificar se o livro existe
-    book = db.query(Book).filter(Book.id == copy.book_id).first()
+    book = await db.get(Book, copy.book_id)
     if book is None:
         raise HTTPException(status_code=404, detail="Livro não encontrado")
     
     # Verificar se já existe uma cópia com o mesmo número para este livro
-    copy_existente = db.query(BookCopy).filter(
+    copy_existente = await db.scalar(select(BookCopy).where(
         BookCopy.book_id == copy.book_id,
         BookCopy.copy_number == copy.copy_number
-    ).first()
+    ))
     if copy_existente:
         raise HTTPException(
             status_code=400, 
@@ -158,51 +250,158 @@ def create_book_copy(copy: BookCopyCreate, db: Session = Depends(get_db)):
     
     db_copy = BookCopy(**copy.model_dump(), is_available=True)
     db.add(db_copy)
-    db.commit()
-    db.refresh(db_copy)
+    await ajustar_contadores(db, copy.book_id, total=1, disponiveis=1)
+    await db.commit()
+    await cache.invalidate(f"book:{copy.book_id}")
+    await db.refresh(db_copy)
     return db_copy
 
-@router.get("/copies/",tags=["Book Copies"], response_model=List[BookCopyResponse])
-def list_book_copies(db: Session = Depends(get_db)):
-    copies = db.query(BookCopy).all()
-    return copies
+@router.post("/copies/bulk",tags=["Book Copies"], response_model=BulkResult[BookCopyResponse], status_code=201)
+async def create_book_copies_bulk(
+    copies: List[BookCopyCreate] = Body(..., max_length=LIMITE_LOTE),
+    db: AsyncSession = Depends(get_db),
+):
+    # Livros existentes e números de cópia já usados, uma consulta para cada
+    book_ids = {copy.book_id for copy in copies}
+    pares = {(copy.book_id, copy.copy_number) for copy in copies}
+    livros = set((await db.scalars(select(Book.id).where(Book.id.in_(book_ids)))).all())
+    result = await db.execute(
+        select(BookCopy.book_id, BookCopy.copy_number)
+        # O filtro por book_id deixa o SQLite usar o índice; o IN de tuplas sozinho varre o índice todo
+        .where(BookCopy.book_id.in_(book_ids), tuple_(BookCopy.book_id, BookCopy.copy_number).in_(pares))
+    )
+    existentes = {tuple(row) for row in result}
+    
+    errors = []
+    validos = {}
+    for index, copy in enumerate(copies):
+        par = (copy.book_id, copy.copy_number)
+        if copy.book_id not in livros:
+            errors.append(BulkError(index=index, detail="Livro não encontrado"))
+        elif par in existentes:
+            errors.append(BulkError(index=index, detail="Já existe uma cópia com este número para este livro"))
+        elif par in validos:
+            errors.append(BulkError(index=index, detail="Número de cópia repetido no lote"))
+        else:
+            validos[par] = {**copy.model_dump(), "is_available": True}
+    
+    created = []
+    if validos:
+        novas = Counter(book_id for book_id, _ in validos)
+        await db.execute(insert(BookCopy), list(validos.values()))
+        await ajustar_contadores_em_lote(db, {book_id: (n, n) for book_id, n in novas.items()})
+        created = (await db.scalars(
+            select(BookCopy)
+            .where(BookCopy.book_id.in_(book_ids), tuple_(BookCopy.book_id, BookCopy.copy_number).in_(validos))
+            .order_by(BookCopy.id)
+        )).all()
+        await db.commit()
+        await cache.invalidate(*(f"book:{book_id}" for book_id in novas))
+    return {"created": created, "errors": errors}
+
+@router.get("/copies/",tags=["Book Copies"], response_model=Page[BookCopyResponse], dependencies=[condicional("book_copy")])
+async def list_book_copies(
+    fields: Campos = campos(BookCopyResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await paginar(db, select(*colunas(BookCopyResponse, BookCopy, fields)), BookCopy.id, page)
 
-@router.get("/copies/{copy_id}",tags=["Book Copies"], response_model=BookCopyResponse)
-def get_book_copy(copy_id: int, db: Session = Depends(get_db)):
-    copy = db.query(BookCopy).filter(BookCopy.id == copy_id).first()
-    if copy is None:
+@router.get("/copies/export",tags=["Book Copies"])
+async def export_book_copies(format: ExportFormat = "ndjson"):
+    return stream_export(select(BookCopy.__table__).order_by(BookCopy.id), format, "book_copies")
+
+def _fim_do_prefixo(prefixo: str) -> str:
+    # Menor valor maior que todos os que começam com `prefixo`: "E1" -> "E2"
+    return prefixo[:-1] + chr(ord(prefixo[-1]) + 1)
+
+# Filtros combináveis numa só consulta. Índices: ix_book_copy_disponivel
+# (is_available, id) e ix_book_copy_livro (book_id, id), que já entregam as
+# páginas em ordem de id, ix_book_copy_location (location, is_available) para
+# a estante e ix_book_copy_condition. O prefixo
+# vira um intervalo (location >= 'E1' AND location < 'E2'), que usa o índice
+# em qualquer banco; LIKE 'E1%' não usa no SQLite, cujo LIKE ignora maiúsculas
+@router.get("/copies/search",tags=["Book Copies"], response_model=Page[BookCopySearchResult], dependencies=[condicional("book", "book_copy")])
+async def search_book_copies(
+    is_available: Optional[bool] = None,
+    condition: Optional[str] = None,
+    location_prefix: Optional[str] = Query(None, min_length=1, description="Início da localização, ex.: E1 (E1, E10, E1-A...)"),
+    book_id: Optional[int] = None,
+    fields: Campos = campos(BookCopySearchResult),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    statement = select(*colunas(BookCopySearchResult, BookCopy, fields, book_title=Book.title)).select_from(BookCopy)
+    if fields is None or "book_title" in fields:
+        statement = statement.join(Book, Book.id == BookCopy.book_id)
+    if is_available is not None:
+        statement = statement.where(BookCopy.is_available == is_available)
+    if condition is not None:
+        statement = statement.where(BookCopy.condition == condition)
+    if location_prefix is not None:
+        statement = statement.where(BookCopy.location >= location_prefix, BookCopy.location < _fim_do_prefixo(location_prefix))
+    if book_id is not None:
+        statement = statement.where(BookCopy.book_id == book_id)
+    return await paginar(db, statement, BookCopy.id, page)
+
+# Substituídas por /copies/search; declaradas antes de /copies/{copy_id}, que as capturava
+# e paginadas como ela
+@router.get("/copies/available",tags=["Book Copies"], response_model=Page[BookCopyResponse], deprecated=True, dependencies=[condicional("book_copy")])
+async def list_available_copies(
+    fields: Campos = campos(BookCopyResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await paginar(db, select(*colunas(BookCopyResponse, BookCopy, fields)).where(BookCopy.is_available == True), BookCopy.id, page)
+
+@router.get("/copies/unavailable",tags=["Book Copies"], response_model=Page[BookCopyResponse], deprecated=True, dependencies=[condicional("book_copy")])
+async def list_unavailable_copies(
+    fields: Campos = campos(BookCopyResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await paginar(db, select(*colunas(BookCopyResponse, BookCopy, fields)).where(BookCopy.is_available == False), BookCopy.id, page)
+
+@router.get("/copies/{copy_id}",tags=["Book Copies"], response_model=BookCopyResponse, dependencies=[condicional("book_copy")])
+async def get_book_copy(copy_id: int, fields: Campos = campos(BookCopyResponse), db: AsyncSession = Depends(get_read_db)):
+    rows = await linhas(db, select(*colunas(BookCopyResponse, BookCopy, fields)).where(BookCopy.id == copy_id))
+    if not rows:
         raise HTTPException(status_code=404, detail="Cópia do livro não encontrada")
-    return copy
+    return RespostaJSON(rows[0])
 
 @router.put("/copies/{copy_id}",tags=["Book Copies"], response_model=BookCopyResponse)
-def update_book_copy(copy_id: int, copy: BookCopyUpdate, db: Session = Depends(get_db)):
-    db_copy = db.query(BookCopy).filter(BookCopy.id == copy_id).first()
+async def update_book_copy(copy_id: int, copy: BookCopyUpdate, db: AsyncSession = Depends(get_db)):
+    db_copy = await db.get(BookCopy, copy_id)
     if db_copy is None:
         raise HTTPException(status_code=404, detail="Cópia do livro não encontrada")
     
     # Se estiver atualizando o número da cópia, verificar se já existe outra cópia com o mesmo número
     if copy.copy_number and copy.copy_number != db_copy.copy_number:
-        copy_existente = db.query(BookCopy).filter(
+        copy_existente = await db.scalar(select(BookCopy).where(
             BookCopy.book_id == db_copy.book_id,
             BookCopy.copy_number == copy.copy_number
-        ).first()
+        ))
         if copy_existente:
             raise HTTPException(
                 status_code=400, 
                 detail="Já existe uma cópia com este número para este livro"
             )
     
+    estava_disponivel = db_copy.is_available
     update_data = copy.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_copy, key, value)
     
-    db.commit()
-    db.refresh(db_copy)
+    if db_copy.is_available != estava_disponivel:
+        await ajustar_contadores(db, db_copy.book_id, disponiveis=1 if db_copy.is_available else -1)
+    await db.commit()
+    await cache.invalidate(f"book:{db_copy.book_id}")
+    await db.refresh(db_copy)
     return db_copy
 
 @router.delete("/copies/{copy_id}",tags=["Book Copies"])
-def delete_book_copy(copy_id: int, db: Session = Depends(get_db)):
-    copy = db.query(BookCopy).filter(BookCopy.id == copy_id).first()
+async def delete_book_copy(copy_id: int, db: AsyncSession = Depends(get_db)):
+    copy = await db.get(BookCopy, copy_id)
     if copy is None:
         raise HTTPException(status_code=404, detail="Cópia do livro não encontrada")
     
@@ -213,35 +412,45 @@ def delete_book_copy(copy_id: int, db: Session = Depends(get_db)):
             detail="Não é possível deletar uma cópia que está emprestada"
         )
     
-    db.delete(copy)
-    db.commit()
+    await db.delete(copy)
+    await ajustar_contadores(db, copy.book_id, total=-1, disponiveis=-1)
+    await db.commit()
+    await cache.invalidate(f"book:{copy.book_id}")
     return {"message": "Cópia do livro deletada com sucesso"}
 
-@router.get("/{book_id}/copies",tags=["Book Copies"], response_model=List[BookCopyResponse])
-def list_copies_by_book(book_id: int, db: Session = Depends(get_db)):
-    book = db.query(Book).filter(Book.id == book_id).first()
+@router.get("/{book_id}/copies",tags=["Book Copies"], response_model=Page[BookCopyResponse], dependencies=[condicional("book", "book_copy")])
+async def list_copies_by_book(
+    book_id: int,
+    fields: Campos = campos(BookCopyResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    book = await db.scalar(select(Book.id).where(Book.id == book_id))
     if book is None:
         raise HTTPException(status_code=404, detail="Livro não encontrado")
     
-    copies = db.query(BookCopy).filter(BookCopy.book_id == book_id).all()
-    return copies
-
-@router.get("/copies/available",tags=["Book Copies"], response_model=List[BookCopyResponse])
-def list_available_copies(db: Session = Depends(get_db)):
-    copies = db.query(BookCopy).filter(BookCopy.is_available == True).all()
-    return copies
-
-@router.get("/copies/unavailable",tags=["Book Copies"], response_model=List[BookCopyResponse])
-def list_unavailable_copies(db: Session = Depends(get_db)):
-    copies = db.query(BookCopy).filter(BookCopy.is_available == False).all()
-    return copies
+    statement = select(*colunas(BookCopyResponse, BookCopy, fields)).where(BookCopy.book_id == book_id)
+    return await paginar(db, statement, BookCopy.id, page)
 
-@router.get("/copies/condition/{condition}",tags=["Book Copies"], response_model=List[BookCopyResponse])
-def list_copies_by_condition(condition: str, db: Session = Depends(get_db)):
-    copies = db.query(BookCopy).filter(BookCopy.condition == condition).all()
-    return copies
+@router.get("/copies/condition/{condition}",tags=["Book Copies"], response_model=Page[BookCopyResponse], deprecated=True, dependencies=[condicional("book_copy")])
+async def list_copies_by_condition(
+    condition: str,
+    fields: Campos = campos(BookCopyResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await paginar(db, select(*colunas(BookCopyResponse, BookCopy, fields)).where(BookCopy.condition == condition), BookCopy.id, page)
 
-@router.get("/copies/location/{location}",tags=["Book Copies"], response_model=List[BookCopyResponse])
-def list_copies_by_location(location: str, db: Session = Depends(get_db)):
-    copies = db.query(BookCopy).filter(BookCopy.location.ilike(f"%{location}%")).all()
-    return copies 
+@router.get("/copies/location/{location}",tags=["Book Copies"], response_model=Page[BookCopyResponse], deprecated=True, dependencies=[condicional("book_copy")])
+async def list_copies_by_location(
+    location: str,
+    fields: Campos = campos(BookCopyResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    # Início da localização, como location_prefix de /copies/search: a faixa usa
+    # ix_book_copy_location, o ILIKE '%...%' varria a tabela inteira
+    statement = select(*colunas(BookCopyResponse, BookCopy, fields)).where(
+        BookCopy.location >= location, BookCopy.location < _fim_do_prefixo(location)
+    )
+    return await paginar(db, statement, BookCopy.id, page)
@@ -1,10 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from datetime import date
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.cargo import Cargo
 from app.models.pessoa import Funcionario
-from database import get_db
+from app.cache import cache
+from app.etag import condicional, condicional_linha, versoes_da_requisicao
+from app.serializacao import Campos, RespostaJSON, campos, colunas, paginar, projetar
+from app.pagination import Page, PageParams, page_params
+from database import get_db, get_read_db
 
 router = APIRouter(prefix="/cargos", tags=["Cargo"])
 
@@ -29,40 +35,62 @@ class CargoUpdate(BaseModel):
     salario_base: Optional[float] = None
     nivel_hierarquico: Optional[int] = None
 
+class FuncionarioDoCargo(BaseModel):
+    id: int
+    nome: str
+    cpf: str
+    email: Optional[str] = None
+    data_contratacao: date
+    salario: float
+    ativo: bool = True
+    cargo_nome: str
+
+    class Config:
+        from_attributes = True
+
 @router.post("/", response_model=CargoResponse, status_code=201)
-def criar_cargo(cargo: CargoCreate, db: Session = Depends(get_db)):
+async def criar_cargo(cargo: CargoCreate, db: AsyncSession = Depends(get_db)):
     # Verificar se já existe um cargo com o mesmo nome
-    cargo_existente = db.query(Cargo).filter(Cargo.nome == cargo.nome).first()
+    cargo_existente = await db.scalar(select(Cargo).where(Cargo.nome == cargo.nome))
     if cargo_existente:
         raise HTTPException(status_code=400, detail="Já existe um cargo com este nome")
     
     db_cargo = Cargo(**cargo.model_dump())
     db.add(db_cargo)
-    db.commit()
-    db.refresh(db_cargo)
+    await db.commit()
+    await db.refresh(db_cargo)
     return db_cargo
 
-@router.get("/", response_model=List[CargoResponse])
-def listar_cargos(db: Session = Depends(get_db)):
-    cargos = db.query(Cargo).all()
-    return cargos
+@router.get("/", response_model=Page[CargoResponse], dependencies=[condicional("cargo")])
+async def listar_cargos(
+    fields: Campos = campos(CargoResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await paginar(db, select(*colunas(CargoResponse, Cargo, fields)), Cargo.id, page)
 
-@router.get("/{cargo_id}", response_model=CargoResponse)
-def obter_cargo(cargo_id: int, db: Session = Depends(get_db)):
-    cargo = db.query(Cargo).filter(Cargo.id == cargo_id).first()
+@router.get("/{cargo_id}", response_model=CargoResponse, dependencies=[condicional_linha(Cargo, "cargo_id")])
+async def obter_cargo(cargo_id: int, fields: Campos = campos(CargoResponse), db: AsyncSession = Depends(get_db)):
+    async def carregar():
+        cargo = await db.get(Cargo, cargo_id)
+        return CargoResponse.model_validate(cargo).model_dump(mode="json") if cargo else None
+    
+    cargo = await cache.get_or_load(f"cargo:{cargo_id}", carregar, versao=versoes_da_requisicao.get())
     if not cargo:
         raise HTTPException(status_code=404, detail="Cargo não encontrado")
+    if fields is not None:
+        return RespostaJSON(projetar(cargo, fields))
     return cargo
 
 @router.put("/{cargo_id}", response_model=CargoResponse)
-def atualizar_cargo(cargo_id: int, cargo: CargoUpdate, db: Session = Depends(get_db)):
-    db_cargo = db.query(Cargo).filter(Cargo.id == cargo_id).first()
+async def atualizar_cargo(cargo_id: int, cargo: CargoUpdate, db: AsyncSession = Depends(get_db)):
+    db_cargo = await db.get(Cargo, cargo_id)
     if not db_cargo:
         raise HTTPException(status_code=404, detail="Cargo não encontrado")
     
     # Se estiver atualizando o nome, verificar se já existe outro cargo com o mesmo nome
     if cargo.nome and cargo.nome != db_cargo.nome:
-        cargo_existente = db.query(Cargo).filter(Cargo.nome == cargo.nome).first()
+        cargo_existente = await db.scalar(select(Cargo).where(Cargo.nome == cargo.nome))
         if cargo_existente:
             raise HTTPException(status_code=400, detail="Já existe um cargo com este nome")
     
@@ -70,44 +98,47 @@ def atualizar_cargo(cargo_id: int, cargo: CargoUpdate, db: Session = Depends(get
     for key, value in update_data.items():
         setattr(db_cargo, key, value)
     
-    db.commit()
-    db.refresh(db_cargo)
+    await db.commit()
+    await cache.invalidate(f"cargo:{cargo_id}")
+    await db.refresh(db_cargo)
     return db_cargo
 
 @router.delete("/{cargo_id}")
-def deletar_cargo(cargo_id: int, db: Session = Depends(get_db)):
-    cargo = db.query(Cargo).filter(Cargo.id == cargo_id).first()
+async def deletar_cargo(cargo_id: int, db: AsyncSession = Depends(get_db)):
+    cargo = await db.get(Cargo, cargo_id)
     if not cargo:
         raise HTTPException(status_code=404, detail="Cargo não encontrado")
     
     # Verificar se existem funcionários vinculados a este cargo
-    funcionarios = db.query(Funcionario).filter(Funcionario.cargo_id == cargo_id).first()
+    funcionarios = await db.scalar(select(Funcionario.id).where(Funcionario.cargo_id == cargo_id).limit(1))
     if funcionarios:
         raise HTTPException(
             status_code=400, 
             detail="Não é possível deletar este cargo pois existem funcionários vinculados a ele"
         )
     
-    db.delete(cargo)
-    db.commit()
+    await db.delete(cargo)
+    await db.commit()
+    await cache.invalidate(f"cargo:{cargo_id}")
     return {"message": "Cargo deletado com sucesso"}
 
-@router.get("/{cargo_id}/funcionarios", response_model=List[dict])
-def listar_funcionarios_cargo(cargo_id: int, db: Session = Depends(get_db)):
-    cargo = db.query(Cargo).filter(Cargo.id == cargo_id).first()
-    if not cargo:
+@router.get("/{cargo_id}/funcionarios", response_model=Page[FuncionarioDoCargo], dependencies=[condicional("cargo", "pessoa", "funcionario")])
+async def listar_funcionarios_cargo(
+    cargo_id: int,
+    fields: Campos = campos(FuncionarioDoCargo),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    cargo = await db.scalar(select(Cargo.id).where(Cargo.id == cargo_id))
+    if cargo is None:
         raise HTTPException(status_code=404, detail="Cargo não encontrado")
     
-    funcionarios = db.query(Funcionario).filter(Funcionario.cargo_id == cargo_id).all()
-    return [
-        {
-            "id": f.id,
-            "nome": f.nome,
-            "cpf": f.cpf,
-            "email": f.email,
-            "data_contratacao": f.data_contratacao,
-            "salario": f.salario,
-            "ativo": f.ativo
-        }
-        for f in funcionarios
-    ] 
\ No newline at end of file
+    # A partir de funcionario, pelo índice de cargo_id: num LEFT JOIN a partir
+    # de cargo o SQLite materializa pessoa x funcionario inteira
+    statement = (
+        select(*colunas(FuncionarioDoCargo, Funcionario, fields, cargo_nome=Cargo.nome))
+        .select_from(Funcionario)
+        .join(Cargo, Cargo.id == Funcionario.cargo_id)
+        .where(Funcionario.cargo_id == cargo_id)
+    )
+    return await paginar(db, statement, Funcionario.id, page)
@@ -1,9 +1,13 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from typing import List
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.empresa import Empresa
-from database import get_db
+from app.cache import cache
+from app.etag import condicional, condicional_linha, versoes_da_requisicao
+from app.serializacao import Campos, RespostaJSON, campos, colunas, paginar, projetar
+from app.pagination import Page, PageParams, page_params
+from database import get_db, get_read_db
 
 router = APIRouter(prefix="/empresas", tags=['Empresa'])
 
@@ -26,33 +30,42 @@ class CompanyUpdate(BaseModel):
     razao_social: str | None = None
     email_contato: str | None = None
 
-@router.get("/", response_model=List[CompanyResponse])
-def listar_empresas(db: Session = Depends(get_db)):
-    empresas = db.query(Empresa).all()
-    return empresas
+@router.get("/", response_model=Page[CompanyResponse], dependencies=[condicional("empresa")])
+async def listar_empresas(
+    fields: Campos = campos(CompanyResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await paginar(db, select(*colunas(CompanyResponse, Empresa, fields)), Empresa.id, page)
 
 @router.post("/", response_model=CompanyResponse, status_code=201)
-def criar_empresa(empresa: CompanyCreate, db: Session = Depends(get_db)):
+async def criar_empresa(empresa: CompanyCreate, db: AsyncSession = Depends(get_db)):
     db_empresa = Empresa(
         cnpj=empresa.cnpj,
         razao_social=empresa.razao_social,
         email_contato=empresa.email_contato
     )
     db.add(db_empresa)
-    db.commit()
-    db.refresh(db_empresa)
+    await db.commit()
+    await db.refresh(db_empresa)
     return db_empresa
 
-@router.get("/{empresa_id}", response_model=CompanyResponse)
-def obter_empresa(empresa_id: int, db: Session = Depends(get_db)):
-    empresa = db.query(Empresa).filter(Empresa.id == empresa_id).first()
+@router.get("/{empresa_id}", response_model=CompanyResponse, dependencies=[condicional_linha(Empresa, "empresa_id")])
+async def obter_empresa(empresa_id: int, fields: Campos = campos(CompanyResponse), db: AsyncSession = Depends(get_db)):
+    async def carregar():
+        empresa = await db.get(Empresa, empresa_id)
+        return CompanyResponse.model_validate(empresa).model_dump(mode="json") if empresa else None
+    
+    empresa = await cache.get_or_load(f"empresa:{empresa_id}", carregar, versao=versoes_da_requisicao.get())
     if empresa is None:
         raise HTTPException(status_code=404, detail="Empresa não encontrada")
+    if fields is not None:
+        return RespostaJSON(projetar(empresa, fields))
     return empresa
 
 @router.put("/{empresa_id}", response_model=CompanyResponse)
-def atualizar_empresa(empresa_id: int, empresa: CompanyUpdate, db: Session = Depends(get_db)):
-    db_empresa = db.query(Empresa).filter(Empresa.id == empresa_id).first()
+async def atualizar_empresa(empresa_id: int, empresa: CompanyUpdate, db: AsyncSession = Depends(get_db)):
+    db_empresa = await db.get(Empresa, empresa_id)
     if db_empresa is None:
         raise HTTPException(status_code=404, detail="Empresa não encontrada")
     
@@ -60,16 +73,18 @@ def atualizar_empresa(empresa_id: int, empresa: CompanyUpdate, db: Session = Dep
     for key, value in update_data.items():
         setattr(db_empresa, key, value)
     
-    db.commit()
-    db.refresh(db_empresa)
+    await db.commit()
+    await cache.invalidate(f"empresa:{empresa_id}")
+    await db.refresh(db_empresa)
     return db_empresa
 
 @router.delete("/{empresa_id}", status_code=204)
-def deletar_empresa(empresa_id: int, db: Session = Depends(get_db)):
-    empresa = db.query(Empresa).filter(Empresa.id == empresa_id).first()
+async def deletar_empresa(empresa_id: int, db: AsyncSession = Depends(get_db)):
+    empresa = await db.get(Empresa, empresa_id)
     if empresa is None:
         raise HTTPException(status_code=404, detail="Empresa não encontrada")
     
-    db.delete(empresa)
-    db.commit()
+    await db.delete(empresa)
+    await db.commit()
+    await cache.invalidate(f"empresa:{empresa_id}")
     return None
@@ -1,12 +1,24 @@
+from collections import Counter
 from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from datetime import datetime
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.emprestimo import Emprestimo
-from app.models.book import BookCopy
+from app.models.book import Book, BookCopy
+from app.models.estatistica import EstatisticaCliente, EstatisticaLivro
 from app.models.pessoa import Cliente
-from database import get_db
+from app.cache import cache
+from app.bulk import LIMITE_LOTE_BALCAO, BulkError, BulkResult, ModoLote, rejeitar_lote_com_erros
+from app.disponibilidade import ajustar_contadores, ajustar_contadores_em_lote
+from app.estatisticas import ajustar_estatisticas, ajustar_estatisticas_em_lote, deltas_da_devolucao
+from app.multas import STATUS_EM_ABERTO, calcular_multa, processar_atrasos
+from app.etag import condicional
+from app.export import ExportFormat, stream_export
+from app.serializacao import Campos, RespostaJSON, campos, colunas, linhas, paginar
+from app.pagination import Page, PageParams, page_params
+from database import get_db, get_read_db
 
 router = APIRouter(prefix="/emprestimos",tags=['Emprestimo'])
 
@@ -33,92 +45,365 @@ class EmprestimoUpdate(BaseModel):
     valor_multa: Optional[float] = None
     status: Optional[str] = None
 
+# Sessão de balcão: várias cópias de um mesmo cliente, ou várias devoluções, de uma vez
+class EmprestimoLote(BaseModel):
+    cliente_id: int
+    livro_copia_ids: List[int] = Field(..., min_length=1, max_length=LIMITE_LOTE_BALCAO)
+    data_devolucao_prevista: datetime
+    modo: ModoLote = "tudo_ou_nada"
+
+class DevolucaoLote(BaseModel):
+    emprestimo_ids: List[int] = Field(..., min_length=1, max_length=LIMITE_LOTE_BALCAO)
+    modo: ModoLote = "tudo_ou_nada"
+
+class DevolucaoLoteResult(BaseModel):
+    returned: List[EmprestimoResponse]
+    errors: List[BulkError]
+
+class EstatisticaResponse(BaseModel):
+    emprestimos: int = 0
+    em_aberto: int = 0
+    atrasados: int = 0
+    devolvidos: int = 0
+    total_multas: float = 0.0
+    duracao_media_dias: Optional[float] = None
+
+def _estatistica_response(estatistica) -> EstatisticaResponse:
+    if estatistica is None:
+        return EstatisticaResponse()
+    duracao_media = None
+    if estatistica.devolvidos:
+        duracao_media = round(estatistica.duracao_total_segundos / estatistica.devolvidos / 86400, 2)
+    return EstatisticaResponse(
+        emprestimos=estatistica.emprestimos,
+        em_aberto=estatistica.em_aberto,
+        atrasados=estatistica.atrasados,
+        devolvidos=estatistica.devolvidos,
+        total_multas=round(estatistica.total_multas, 2),
+        duracao_media_dias=duracao_media,
+    )
+
 @router.post("/", response_model=EmprestimoResponse, status_code=201)
-def criar_emprestimo(emprestimo: EmprestimoCreate, db: Session = Depends(get_db)):
+async def criar_emprestimo(emprestimo: EmprestimoCreate, db: AsyncSession = Depends(get_db)):
     # Verificar se o cliente existe
-    cliente = db.query(Cliente).filter(Cliente.id == emprestimo.cliente_id).first()
-    if not cliente:
+    cliente_id = await db.scalar(select(Cliente.id).where(Cliente.id == emprestimo.cliente_id))
+    if not cliente_id:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     
-    # Verificar se a cópia do livro existe e está disponível
-    livro_copia = db.query(BookCopy).filter(BookCopy.id == emprestimo.livro_copia_id).first()
-    if not livro_copia:
+    # O livro da cópia é necessário para os contadores de disponibilidade
+    book_id = await db.scalar(select(BookCopy.book_id).where(BookCopy.id == emprestimo.livro_copia_id))
+    if not book_id:
         raise HTTPException(status_code=404, detail="Cópia do livro não encontrada")
-    if not livro_copia.is_available:
+    
+    # Reservar a cópia com um UPDATE condicional: só uma transação consegue
+    # trocar is_available de 1 para 0, mesmo com dois balcões ao mesmo tempo
+    reserva = await db.execute(
+        update(BookCopy)
+        .where(BookCopy.id == emprestimo.livro_copia_id, BookCopy.is_available == True)
+        .values(is_available=False)
+        .execution_options(synchronize_session=False)
+    )
+    if reserva.rowcount != 1:
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Cópia do livro não está disponível")
+    await ajustar_contadores(db, book_id, disponiveis=-1)
+    await ajustar_estatisticas(db, emprestimo.cliente_id, book_id, emprestimos=1, em_aberto=1)
     
-    # Criar o empréstimo
+    # Criar o empréstimo na mesma transação da reserva
     db_emprestimo = Emprestimo(
         cliente_id=emprestimo.cliente_id,
         livro_copia_id=emprestimo.livro_copia_id,
         data_retirada=datetime.now(),
         data_devolucao_prevista=emprestimo.data_devolucao_prevista,
+        valor_multa=0.0,
         status='ativo'
     )
-    
-    # Atualizar disponibilidade do livro
-    livro_copia.is_available = False
-    
     db.add(db_emprestimo)
-    db.commit()
-    db.refresh(db_emprestimo)
+    await db.commit()
+    await cache.invalidate(f"book:{book_id}")
+    # Todos os campos já estão no objeto: não é preciso um refresh
     return db_emprestimo
 
-@router.get("/", response_model=List[EmprestimoResponse])
-def listar_emprestimos(db: Session = Depends(get_db)):
-    emprestimos = db.query(Emprestimo).all()
-    return emprestimos
+@router.post("/batch", response_model=BulkResult[EmprestimoResponse], status_code=201)
+async def criar_emprestimos_lote(lote: EmprestimoLote, db: AsyncSession = Depends(get_db)):
+    cliente_id = await db.scalar(select(Cliente.id).where(Cliente.id == lote.cliente_id))
+    if not cliente_id:
+        raise HTTPException(status_code=404, detail="Cliente não encontrado")
+    
+    # Todas as cópias numa consulta, travadas até o commit (FOR UPDATE; o SQLite ignora)
+    result = await db.execute(
+        select(BookCopy.id, BookCopy.book_id, BookCopy.is_available)
+        .where(BookCopy.id.in_(lote.livro_copia_ids))
+        .with_for_update()
+    )
+    copias = {copia_id: (book_id, disponivel) for copia_id, book_id, disponivel in result}
+    
+    errors = []
+    validas = {}
+    for index, copia_id in enumerate(lote.livro_copia_ids):
+        if copia_id not in copias:
+            errors.append(BulkError(index=index, detail="Cópia do livro não encontrada"))
+        elif copia_id in validas:
+            errors.append(BulkError(index=index, detail="Cópia repetida no lote"))
+        elif not copias[copia_id][1]:
+            errors.append(BulkError(index=index, detail="Cópia do livro não está disponível"))
+        else:
+            validas[copia_id] = copias[copia_id][0]
+    rejeitar_lote_com_erros(lote.modo, errors)
+    if not validas:
+        return {"created": [], "errors": errors}
+    
+    # Reserva de todas as cópias num UPDATE condicional; se outra transação
+    # levou alguma entre a leitura e aqui, nada do lote é gravado
+    reserva = await db.execute(
+        update(BookCopy)
+        .where(BookCopy.id.in_(validas), BookCopy.is_available == True)
+        .values(is_available=False)
+        .execution_options(synchronize_session=False)
+    )
+    if reserva.rowcount != len(validas):
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Cópias emprestadas por outra operação durante o lote; tente novamente")
+    
+    por_livro = Counter(validas.values())
+    await ajustar_contadores_em_lote(db, {book_id: (0, -n) for book_id, n in por_livro.items()})
+    await ajustar_estatisticas_em_lote(db, [
+        (lote.cliente_id, book_id, {"emprestimos": 1, "em_aberto": 1}) for book_id in validas.values()
+    ])
+    
+    # Um INSERT com executemany (o MySQL não tem RETURNING); os ids gerados
+    # vêm da releitura pelas cópias, que acabaram de ser reservadas e seguem
+    # travadas nesta transação. Só ids acima do maior antes do INSERT: uma
+    # cópia marcada disponível pelo PUT /books/copies/{id} pode ter ainda um
+    # empréstimo ativo mais antigo. Sem filtrar por data_retirada: o DATETIME
+    # do MySQL arredonda os microssegundos e a igualdade não casaria
+    ultimo_id = await db.scalar(select(func.coalesce(func.max(Emprestimo.id), 0)))
+    data_retirada = datetime.now()
+    await db.execute(insert(Emprestimo), [
+        {
+            "cliente_id": lote.cliente_id,
+            "livro_copia_id": copia_id,
+            "data_retirada": data_retirada,
+            "data_devolucao_prevista": lote.data_devolucao_prevista,
+            "valor_multa": 0.0,
+            "status": 'ativo',
+        }
+        for copia_id in validas
+    ])
+    emprestimos = (await db.scalars(
+        select(Emprestimo)
+        .where(
+            Emprestimo.id > ultimo_id,
+            Emprestimo.livro_copia_id.in_(validas),
+            Emprestimo.cliente_id == lote.cliente_id,
+        )
+        .order_by(Emprestimo.id)
+    )).all()
+    await db.commit()
+    await cache.invalidate(*(f"book:{book_id}" for book_id in por_livro))
+    return {"created": emprestimos, "errors": errors}
+
+@router.put("/batch/devolver", response_model=DevolucaoLoteResult)
+async def devolver_lote(lote: DevolucaoLote, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        select(
+            *colunas(EmprestimoResponse, Emprestimo),
+            BookCopy.book_id,
+            BookCopy.is_available.label("copia_disponivel"),
+        )
+        .join(BookCopy, BookCopy.id == Emprestimo.livro_copia_id)
+        .where(Emprestimo.id.in_(lote.emprestimo_ids))
+        .with_for_update()
+    )
+    encontrados = {row.id: row for row in result}
+    
+    errors = []
+    validos = {}
+    for index, emprestimo_id in enumerate(lote.emprestimo_ids):
+        row = encontrados.get(emprestimo_id)
+        if row is None:
+            errors.append(BulkError(index=index, detail="Empréstimo não encontrado"))
+        elif emprestimo_id in validos:
+            errors.append(BulkError(index=index, detail="Empréstimo repetido no lote"))
+        elif row.status not in STATUS_EM_ABERTO:
+            errors.append(BulkError(index=index, detail="Este empréstimo já foi devolvido"))
+        else:
+            validos[emprestimo_id] = row
+    rejeitar_lote_com_erros(lote.modo, errors)
+    if not validos:
+        return {"returned": [], "errors": errors}
+    
+    # Multas calculadas juntas, com a mesma regra da devolução individual,
+    # e gravadas num único UPDATE (CASE pelo id só para quem tem multa)
+    data_atual = datetime.now()
+    multas = {
+        emprestimo_id: calcular_multa(row.data_devolucao_prevista, data_atual)
+        for emprestimo_id, row in validos.items()
+    }
+    com_multa = {emprestimo_id: multa for emprestimo_id, multa in multas.items() if multa}
+    devolucao = await db.execute(
+        update(Emprestimo)
+        .where(Emprestimo.id.in_(validos), Emprestimo.status.in_(STATUS_EM_ABERTO))
+        .values(
+            data_devolucao_real=data_atual,
+            valor_multa=case(com_multa, value=Emprestimo.id, else_=0.0) if com_multa else 0.0,
+            status='devolvido',
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if devolucao.rowcount != len(validos):
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Empréstimos devolvidos por outra operação durante o lote; tente novamente")
+    
+    copias = {row.livro_copia_id: row.book_id for row in validos.values() if not row.copia_disponivel}
+    if copias:
+        await db.execute(
+            update(BookCopy)
+            .where(BookCopy.id.in_(copias))
+            .values(is_available=True)
+            .execution_options(synchronize_session=False)
+        )
+        await ajustar_contadores_em_lote(db, {book_id: (0, n) for book_id, n in Counter(copias.values()).items()})
+    
+    devolvidos = []
+    eventos = []
+    for emprestimo_id, row in validos.items():
+        emprestimo = {
+            **{campo: getattr(row, campo) for campo in EmprestimoResponse.model_fields},
+            "data_devolucao_real": data_atual,
+            "valor_multa": multas[emprestimo_id],
+            "status": 'devolvido',
+        }
+        devolvidos.append(emprestimo)
+        eventos.append((row.cliente_id, row.book_id, deltas_da_devolucao(
+            row.data_retirada, data_atual, multas[emprestimo_id], row.status == 'atrasado'
+        )))
+    await ajustar_estatisticas_em_lote(db, eventos)
+    
+    await db.commit()
+    await cache.invalidate(*{f"book:{row.book_id}" for row in validos.values()})
+    return {"returned": devolvidos, "errors": errors}
+
+@router.get("/", response_model=Page[EmprestimoResponse], dependencies=[condicional("emprestimo")])
+async def listar_emprestimos(
+    fields: Campos = campos(EmprestimoResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await paginar(db, select(*colunas(EmprestimoResponse, Emprestimo, fields)), Emprestimo.id, page)
+
+@router.get("/export")
+async def export_emprestimos(format: ExportFormat = "ndjson"):
+    return stream_export(select(Emprestimo.__table__).order_by(Emprestimo.id), format, "emprestimos")
+
+# Estatísticas mantidas a cada checkout/devolução: uma leitura pela chave primária
+@router.get("/stats/cliente/{cliente_id}", response_model=EstatisticaResponse, dependencies=[condicional("estatistica_cliente")])
+async def estatisticas_cliente(cliente_id: int, db: AsyncSession = Depends(get_read_db)):
+    estatistica = await db.get(EstatisticaCliente, cliente_id)
+    if estatistica is None and not await db.scalar(select(Cliente.id).where(Cliente.id == cliente_id)):
+        raise HTTPException(status_code=404, detail="Cliente não encontrado")
+    return _estatistica_response(estatistica)
 
-@router.get("/{emprestimo_id}", response_model=EmprestimoResponse)
-def obter_emprestimo(emprestimo_id: int, db: Session = Depends(get_db)):
-    emprestimo = db.query(Emprestimo).filter(Emprestimo.id == emprestimo_id).first()
-    if not emprestimo:
+@router.get("/stats/book/{book_id}", response_model=EstatisticaResponse, dependencies=[condicional("estatistica_livro")])
+async def estatisticas_livro(book_id: int, db: AsyncSession = Depends(get_read_db)):
+    estatistica = await db.get(EstatisticaLivro, book_id)
+    if estatistica is None and not await db.scalar(select(Book.id).where(Book.id == book_id)):
+        raise HTTPException(status_code=404, detail="Livro não encontrado")
+    return _estatistica_response(estatistica)
+
+@router.get("/{emprestimo_id}", response_model=EmprestimoResponse, dependencies=[condicional("emprestimo")])
+async def obter_emprestimo(
+    emprestimo_id: int, fields: Campos = campos(EmprestimoResponse), db: AsyncSession = Depends(get_read_db)
+):
+    rows = await linhas(db, select(*colunas(EmprestimoResponse, Emprestimo, fields)).where(Emprestimo.id == emprestimo_id))
+    if not rows:
         raise HTTPException(status_code=404, detail="Empréstimo não encontrado")
-    return emprestimo
+    return RespostaJSON(rows[0])
 
 @router.put("/{emprestimo_id}/devolver", response_model=EmprestimoResponse)
-def devolver_livro(emprestimo_id: int, db: Session = Depends(get_db)):
-    emprestimo = db.query(Emprestimo).filter(Emprestimo.id == emprestimo_id).first()
-    if not emprestimo:
+async def devolver_livro(emprestimo_id: int, db: AsyncSession = Depends(get_db)):
+    # Travado até o commit, como na devolução em lote: a varredura de atrasos
+    # não troca o status entre esta leitura e as estatísticas
+    row = (await db.execute(
+        select(*colunas(EmprestimoResponse, Emprestimo), BookCopy.book_id)
+        .join(BookCopy, BookCopy.id == Emprestimo.livro_copia_id)
+        .where(Emprestimo.id == emprestimo_id)
+        .with_for_update()
+    )).first()
+    if row is None:
         raise HTTPException(status_code=404, detail="Empréstimo não encontrado")
     
-    if emprestimo.status != 'ativo':
+    if row.status not in STATUS_EM_ABERTO:
         raise HTTPException(status_code=400, detail="Este empréstimo já foi devolvido")
     
     # Calcular multa se houver atraso
     data_atual = datetime.now()
-    valor_multa = 0.0
-    if data_atual > emprestimo.data_devolucao_prevista:
-        dias_atraso = (data_atual - emprestimo.data_devolucao_prevista).days
-        valor_multa = dias_atraso * 2.0  # R$ 2,00 por dia de atraso
+    valor_multa = calcular_multa(row.data_devolucao_prevista, data_atual)
     
-    # Atualizar empréstimo
-    emprestimo.data_devolucao_real = data_atual
-    emprestimo.valor_multa = valor_multa
-    emprestimo.status = 'devolvido'
+    # UPDATE condicional: de duas devoluções ao mesmo tempo, só uma encontra o empréstimo em aberto
+    devolucao = await db.execute(
+        update(Emprestimo)
+        .where(Emprestimo.id == emprestimo_id, Emprestimo.status.in_(STATUS_EM_ABERTO))
+        .values(data_devolucao_real=data_atual, valor_multa=valor_multa, status='devolvido')
+        .execution_options(synchronize_session=False)
+    )
+    if devolucao.rowcount != 1:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Empréstimo devolvido por outra operação; tente novamente")
     
     # Atualizar disponibilidade do livro
-    livro_copia = db.query(BookCopy).filter(BookCopy.id == emprestimo.livro_copia_id).first()
-    livro_copia.is_available = True
+    liberada = await db.execute(
+        update(BookCopy)
+        .where(BookCopy.id == row.livro_copia_id, BookCopy.is_available == False)
+        .values(is_available=True)
+        .execution_options(synchronize_session=False)
+    )
+    if liberada.rowcount:
+        await ajustar_contadores(db, row.book_id, disponiveis=1)
+    await ajustar_estatisticas(
+        db, row.cliente_id, row.book_id,
+        **deltas_da_devolucao(row.data_retirada, data_atual, valor_multa, row.status == 'atrasado')
+    )
     
-    db.commit()
-    db.refresh(emprestimo)
-    return emprestimo
+    await db.commit()
+    await cache.invalidate(f"book:{row.book_id}")
+    return {
+        **{campo: getattr(row, campo) for campo in EmprestimoResponse.model_fields},
+        "data_devolucao_real": data_atual,
+        "valor_multa": valor_multa,
+        "status": 'devolvido',
+    }
+
+@router.post("/atrasos")
+async def processar_emprestimos_atrasados(db: AsyncSession = Depends(get_db)):
+    # Também disponível pela linha de comando: python -m app.jobs atrasos
+    atualizados = await processar_atrasos(db)
+    return {"emprestimos_atualizados": atualizados}
 
-@router.get("/cliente/{cliente_id}", response_model=List[EmprestimoResponse])
-def listar_emprestimos_cliente(cliente_id: int, db: Session = Depends(get_db)):
-    cliente = db.query(Cliente).filter(Cliente.id == cliente_id).first()
+@router.get("/cliente/{cliente_id}", response_model=Page[EmprestimoResponse], dependencies=[condicional("cliente", "emprestimo")])
+async def listar_emprestimos_cliente(
+    cliente_id: int,
+    fields: Campos = campos(EmprestimoResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    cliente = await db.scalar(select(Cliente.id).where(Cliente.id == cliente_id))
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     
-    emprestimos = db.query(Emprestimo).filter(Emprestimo.cliente_id == cliente_id).all()
-    return emprestimos
+    statement = select(*colunas(EmprestimoResponse, Emprestimo, fields)).where(Emprestimo.cliente_id == cliente_id)
+    return await paginar(db, statement, Emprestimo.id, page)
 
-@router.get("/livro/{livro_copia_id}", response_model=List[EmprestimoResponse])
-def listar_emprestimos_livro(livro_copia_id: int, db: Session = Depends(get_db)):
-    livro_copia = db.query(BookCopy).filter(BookCopy.id == livro_copia_id).first()
+@router.get("/livro/{livro_copia_id}", response_model=Page[EmprestimoResponse], dependencies=[condicional("book_copy", "emprestimo")])
+async def listar_emprestimos_livro(
+    livro_copia_id: int,
+    fields: Campos = campos(EmprestimoResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    livro_copia = await db.scalar(select(BookCopy.id).where(BookCopy.id == livro_copia_id))
     if not livro_copia:
         raise HTTPException(status_code=404, detail="Cópia do livro não encontrada")
     
-    emprestimos = db.query(Emprestimo).filter(Emprestimo.livro_copia_id == livro_copia_id).all()
-    return emprestimos 
\ No newline at end of file
+    statement = select(*colunas(EmprestimoResponse, Emprestimo, fields)).where(Emprestimo.livro_copia_id == livro_copia_id)
+    return await paginar(db, statement, Emprestimo.id, page) 
\ No newline at end of file
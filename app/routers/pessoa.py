@@ -1,11 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Body, Query
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Literal, Optional, Union
 from datetime import date
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.orm import with_polymorphic
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.pessoa import Pessoa, Cliente, Funcionario
 from app.models.cargo import Cargo
-from database import get_db
+from app.bulk import LIMITE_LOTE, BulkError, BulkResult
+from app.cache import cache
+from app.etag import condicional, condicional_linha, versoes_da_requisicao
+from app.serializacao import Campos, RespostaJSON, campos, colunas, linhas, paginar, projetar
+from app.pagination import Page, PageParams, page_params, paginate
+from database import get_db, get_read_db
 
 router = APIRouter(prefix="/pessoas",tags=['Pessoa'])
 
@@ -83,72 +90,176 @@ class FuncionarioUpdate(BaseModel):
     salario: Optional[float] = None
     ativo: Optional[bool] = None
 
-# Endpoints para Pessoas (geral)
-@router.get("/", response_model=List[PessoaResponse])
-def listar_pessoas(db: Session = Depends(get_db)):
-    pessoas = db.query(Pessoa).all()
-    return pessoas
-
-@router.get("/{pessoa_id}", response_model=PessoaResponse)
-def obter_pessoa(pessoa_id: int, db: Session = Depends(get_db)):
-    pessoa = db.query(Pessoa).filter(Pessoa.id == pessoa_id).first()
-    if not pessoa:
-        raise HTTPException(status_code=404, detail="Pessoa não encontrada")
-    return pessoa
+# Listagem polimórfica: cada item traz os campos do seu tipo, identificado por "tipo"
+class PessoaDetalhe(PessoaResponse):
+    tipo: Literal['pessoa']
 
-@router.put("/{pessoa_id}", response_model=PessoaResponse)
-def atualizar_pessoa(pessoa_id: int, pessoa: PessoaUpdate, db: Session = Depends(get_db)):
-    db_pessoa = db.query(Pessoa).filter(Pessoa.id == pessoa_id).first()
-    if not db_pessoa:
-        raise HTTPException(status_code=404, detail="Pessoa não encontrada")
-    
-    update_data = pessoa.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_pessoa, key, value)
-    
-    db.commit()
-    db.refresh(db_pessoa)
-    return db_pessoa
+class ClienteDetalhe(ClienteResponse):
+    tipo: Literal['cliente']
 
-@router.delete("/{pessoa_id}")
-def deletar_pessoa(pessoa_id: int, db: Session = Depends(get_db)):
-    pessoa = db.query(Pessoa).filter(Pessoa.id == pessoa_id).first()
-    if not pessoa:
-        raise HTTPException(status_code=404, detail="Pessoa não encontrada")
+class FuncionarioDetalhe(FuncionarioResponse):
+    tipo: Literal['funcionario']
+
+PessoaPolimorfica = Annotated[
+    Union[PessoaDetalhe, ClienteDetalhe, FuncionarioDetalhe], Field(discriminator='tipo')
+]
+
+# Nome próprio para o schema no OpenAPI (o de Page[...] com a união fica ilegível)
+class PagePessoaPolimorfica(Page[PessoaPolimorfica]):
+    pass
+
+TipoPessoa = Literal['pessoa', 'cliente', 'funcionario']
+
+_CAMPOS_POR_TIPO = {
+    'pessoa': list(PessoaDetalhe.model_fields),
+    'cliente': list(ClienteDetalhe.model_fields),
+    'funcionario': list(FuncionarioDetalhe.model_fields),
+}
+
+def _query_funcionarios(campos: Campos = None):
+    # Só as colunas da resposta, com o nome do cargo no mesmo SELECT; o JOIN
+    # com cargo só entra se cargo_nome foi pedido
+    statement = select(*colunas(FuncionarioResponse, Funcionario, campos, cargo_nome=Cargo.nome)).select_from(Funcionario)
+    if campos is None or 'cargo_nome' in campos:
+        statement = statement.outerjoin(Cargo, Funcionario.cargo_id == Cargo.id)
+    return statement
+
+def _funcionario_response(funcionario: Funcionario, cargo_nome: Optional[str]) -> FuncionarioResponse:
+    response_data = FuncionarioResponse.model_validate(funcionario)
+    response_data.cargo_nome = cargo_nome
+    return response_data
+
+def _query_pessoas_polimorfica(campos: Campos = None):
+    # Um único SELECT com LEFT OUTER JOIN em cliente e funcionario (e cargo)
+    pessoa = with_polymorphic(Pessoa, [Cliente, Funcionario])
+    cliente, funcionario = pessoa.Cliente, pessoa.Funcionario
+    subtipos = {
+        'data_cadastro': cliente.data_cadastro,
+        'status': cliente.status,
+        'cargo_id': funcionario.cargo_id,
+        'data_contratacao': funcionario.data_contratacao,
+        'salario': funcionario.salario,
+        'ativo': funcionario.ativo,
+        'cargo_nome': Cargo.nome,
+    }
+    statement = select(
+        *colunas(PessoaResponse, pessoa, campos),
+        *(coluna.label(nome) for nome, coluna in subtipos.items() if campos is None or nome in campos),
+    )
+    if campos is None or 'cargo_nome' in campos:
+        statement = statement.outerjoin(Cargo, funcionario.cargo_id == Cargo.id)
+    return statement, pessoa
+
+def _item_polimorfico(row, campos: Campos = None) -> dict:
+    # As colunas dos outros subtipos vêm nulas no LEFT JOIN e ficam de fora
+    return {
+        campo: getattr(row, campo) for campo in _CAMPOS_POR_TIPO[row.tipo]
+        if campos is None or campo in campos
+    }
+
+# Endpoints para Pessoas (geral)
+@router.get(
+    "/",
+    response_model=Union[Page[PessoaResponse], PagePessoaPolimorfica],
+    dependencies=[condicional("pessoa", "cliente", "funcionario", "cargo")],
+)
+async def listar_pessoas(
+    tipo: Optional[TipoPessoa] = None,
+    include_subtype: bool = Query(False, description="Inclui os campos de Cliente/Funcionário em cada item"),
+    fields: Campos = campos(PessoaResponse, ClienteResponse, FuncionarioResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if not include_subtype:
+        if fields is not None and not set(fields) <= set(PessoaResponse.model_fields):
+            raise HTTPException(status_code=400, detail="Campos de Cliente/Funcionário em fields exigem include_subtype=true")
+        statement = select(*colunas(PessoaResponse, Pessoa, fields))
+        if tipo:
+            statement = statement.where(Pessoa.tipo == tipo)
+        return await paginar(db, statement, Pessoa.id, page)
     
-    db.delete(pessoa)
-    db.commit()
-    return {"message": "Pessoa deletada com sucesso"}
+    # "tipo" identifica o schema de cada item: vem sempre, como o id
+    if fields is not None and 'tipo' not in fields:
+        fields = (*fields, 'tipo')
+    statement, pessoa = _query_pessoas_polimorfica(fields)
+    if tipo:
+        statement = statement.where(pessoa.tipo == tipo)
+    pagina = await paginate(db, statement, pessoa.id, page)
+    pagina["items"] = [_item_polimorfico(row, fields) for row in pagina["items"]]
+    return RespostaJSON(pagina)
 
 # Endpoints para Clientes
 @router.post("/clientes", response_model=ClienteResponse, status_code=201)
-def criar_cliente(cliente: ClienteCreate, db: Session = Depends(get_db)):
+async def criar_cliente(cliente: ClienteCreate, db: AsyncSession = Depends(get_db)):
     # Verificar se já existe uma pessoa com o mesmo CPF
-    pessoa_existente = db.query(Pessoa).filter(Pessoa.cpf == cliente.cpf).first()
+    pessoa_existente = await db.scalar(select(Pessoa).where(Pessoa.cpf == cliente.cpf))
     if pessoa_existente:
         raise HTTPException(status_code=400, detail="Já existe uma pessoa com este CPF")
     
     db_cliente = Cliente(**cliente.model_dump())
     db.add(db_cliente)
-    db.commit()
-    db.refresh(db_cliente)
+    await db.commit()
+    await db.refresh(db_cliente)
     return db_cliente
 
-@router.get("/clientes", response_model=List[ClienteResponse])
-def listar_clientes(db: Session = Depends(get_db)):
-    clientes = db.query(Cliente).all()
-    return clientes
-
-@router.get("/clientes/{cliente_id}", response_model=ClienteResponse)
-def obter_cliente(cliente_id: int, db: Session = Depends(get_db)):
-    cliente = db.query(Cliente).filter(Cliente.id == cliente_id).first()
-    if not cliente:
+@router.post("/clientes/bulk", response_model=BulkResult[ClienteResponse], status_code=201)
+async def criar_clientes_bulk(
+    clientes: List[ClienteCreate] = Body(..., max_length=LIMITE_LOTE),
+    db: AsyncSession = Depends(get_db),
+):
+    # CPFs já cadastrados (em qualquer tipo de pessoa), uma consulta para o lote
+    cpfs = {cliente.cpf for cliente in clientes}
+    existentes = set((await db.scalars(select(Pessoa.cpf).where(Pessoa.cpf.in_(cpfs)))).all())
+    
+    errors = []
+    validos = {}
+    for index, cliente in enumerate(clientes):
+        if cliente.cpf in existentes:
+            errors.append(BulkError(index=index, detail="Já existe uma pessoa com este CPF"))
+        elif cliente.cpf in validos:
+            errors.append(BulkError(index=index, detail="CPF repetido no lote"))
+        else:
+            validos[cliente.cpf] = cliente
+    
+    created = []
+    if validos:
+        # Herança joined: primeiro as linhas de pessoa, depois as de cliente
+        # com os ids gerados, cada uma com um executemany
+        campos_pessoa = set(PessoaBase.model_fields)
+        await db.execute(
+            insert(Pessoa.__table__),
+            [{**cliente.model_dump(include=campos_pessoa), "tipo": "cliente"} for cliente in validos.values()]
+        )
+        ids = dict((await db.execute(select(Pessoa.cpf, Pessoa.id).where(Pessoa.cpf.in_(validos)))).all())
+        await db.execute(
+            insert(Cliente.__table__),
+            [
+                {"id": ids[cpf], "data_cadastro": cliente.data_cadastro, "status": cliente.status}
+                for cpf, cliente in validos.items()
+            ]
+        )
+        created = (await db.scalars(select(Cliente).where(Cliente.id.in_(ids.values())).order_by(Cliente.id))).all()
+        await db.commit()
+    return {"created": created, "errors": errors}
+
+@router.get("/clientes", response_model=Page[ClienteResponse], dependencies=[condicional("pessoa", "cliente")])
+async def listar_clientes(
+    fields: Campos = campos(ClienteResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await paginar(db, select(*colunas(ClienteResponse, Cliente, fields)), Cliente.id, page)
+
+@router.get("/clientes/{cliente_id}", response_model=ClienteResponse, dependencies=[condicional("pessoa", "cliente")])
+async def obter_cliente(cliente_id: int, fields: Campos = campos(ClienteResponse), db: AsyncSession = Depends(get_read_db)):
+    rows = await linhas(db, select(*colunas(ClienteResponse, Cliente, fields)).where(Cliente.id == cliente_id))
+    if not rows:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
-    return cliente
+    return RespostaJSON(rows[0])
 
 @router.put("/clientes/{cliente_id}", response_model=ClienteResponse)
-def atualizar_cliente(cliente_id: int, cliente: ClienteUpdate, db: Session = Depends(get_db)):
-    db_cliente = db.query(Cliente).filter(Cliente.id == cliente_id).first()
+async def atualizar_cliente(cliente_id: int, cliente: ClienteUpdate, db: AsyncSession = Depends(get_db)):
+    db_cliente = await db.get(Cliente, cliente_id)
     if not db_cliente:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     
@@ -156,79 +267,86 @@ def atualizar_cliente(cliente_id: int, cliente: ClienteUpdate, db: Session = Dep
     for key, value in update_data.items():
         setattr(db_cliente, key, value)
     
-    db.commit()
-    db.refresh(db_cliente)
+    await db.commit()
+    await cache.invalidate(f"pessoa:cpf:{db_cliente.cpf}")
+    await db.refresh(db_cliente)
     return db_cliente
 
 @router.delete("/clientes/{cliente_id}")
-def deletar_cliente(cliente_id: int, db: Session = Depends(get_db)):
-    cliente = db.query(Cliente).filter(Cliente.id == cliente_id).first()
+async def deletar_cliente(cliente_id: int, db: AsyncSession = Depends(get_db)):
+    cliente = await db.get(Cliente, cliente_id)
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     
-    db.delete(cliente)
-    db.commit()
+    await db.delete(cliente)
+    await db.commit()
+    await cache.invalidate(f"pessoa:cpf:{cliente.cpf}")
     return {"message": "Cliente deletado com sucesso"}
 
-@router.get("/clientes/status/{status}", response_model=List[ClienteResponse])
-def listar_clientes_por_status(status: str, db: Session = Depends(get_db)):
-    clientes = db.query(Cliente).filter(Cliente.status == status).all()
-    return clientes
+@router.get("/clientes/status/{status}", response_model=Page[ClienteResponse], dependencies=[condicional("pessoa", "cliente")])
+async def listar_clientes_por_status(
+    status: str,
+    fields: Campos = campos(ClienteResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await paginar(db, select(*colunas(ClienteResponse, Cliente, fields)).where(Cliente.status == status), Cliente.id, page)
 
 # Endpoints para Funcionários
 @router.post("/funcionarios", response_model=FuncionarioResponse, status_code=201)
-def criar_funcionario(funcionario: FuncionarioCreate, db: Session = Depends(get_db)):
+async def criar_funcionario(funcionario: FuncionarioCreate, db: AsyncSession = Depends(get_db)):
     # Verificar se já existe uma pessoa com o mesmo CPF
-    pessoa_existente = db.query(Pessoa).filter(Pessoa.cpf == funcionario.cpf).first()
+    pessoa_existente = await db.scalar(select(Pessoa).where(Pessoa.cpf == funcionario.cpf))
     if pessoa_existente:
         raise HTTPException(status_code=400, detail="Já existe uma pessoa com este CPF")
     
     # Verificar se o cargo existe
-    cargo = db.query(Cargo).filter(Cargo.id == funcionario.cargo_id).first()
+    cargo = await db.get(Cargo, funcionario.cargo_id)
     if not cargo:
         raise HTTPException(status_code=404, detail="Cargo não encontrado")
     
     db_funcionario = Funcionario(**funcionario.model_dump())
     db.add(db_funcionario)
-    db.commit()
-    db.refresh(db_funcionario)
+    await db.commit()
+    await db.refresh(db_funcionario)
     
     # Adicionar nome do cargo na resposta
-    response_data = FuncionarioResponse.model_validate(db_funcionario)
-    response_data.cargo_nome = cargo.nome
-    return response_data
-
-@router.get("/funcionarios", response_model=List[FuncionarioResponse])
-def listar_funcionarios(db: Session = Depends(get_db)):
-    funcionarios = db.query(Funcionario).all()
-    result = []
-    for func in funcionarios:
-        response_data = FuncionarioResponse.model_validate(func)
-        if func.cargo:
-            response_data.cargo_nome = func.cargo.nome
-        result.append(response_data)
-    return result
-
-@router.get("/funcionarios/{funcionario_id}", response_model=FuncionarioResponse)
-def obter_funcionario(funcionario_id: int, db: Session = Depends(get_db)):
-    funcionario = db.query(Funcionario).filter(Funcionario.id == funcionario_id).first()
-    if not funcionario:
+    return _funcionario_response(db_funcionario, cargo.nome)
+
+@router.get("/funcionarios", response_model=Page[FuncionarioResponse], dependencies=[condicional("pessoa", "funcionario", "cargo")])
+async def listar_funcionarios(
+    fields: Campos = campos(FuncionarioResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await paginar(db, _query_funcionarios(fields), Funcionario.id, page)
+
+@router.get("/funcionarios/ativos", response_model=Page[FuncionarioResponse], dependencies=[condicional("pessoa", "funcionario", "cargo")])
+async def listar_funcionarios_ativos(
+    fields: Campos = campos(FuncionarioResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await paginar(db, _query_funcionarios(fields).where(Funcionario.ativo == True), Funcionario.id, page)
+
+@router.get("/funcionarios/{funcionario_id}", response_model=FuncionarioResponse, dependencies=[condicional("pessoa", "funcionario", "cargo")])
+async def obter_funcionario(
+    funcionario_id: int, fields: Campos = campos(FuncionarioResponse), db: AsyncSession = Depends(get_read_db)
+):
+    rows = await linhas(db, _query_funcionarios(fields).where(Funcionario.id == funcionario_id))
+    if not rows:
         raise HTTPException(status_code=404, detail="Funcionário não encontrado")
-    
-    response_data = FuncionarioResponse.model_validate(funcionario)
-    if funcionario.cargo:
-        response_data.cargo_nome = funcionario.cargo.nome
-    return response_data
+    return RespostaJSON(rows[0])
 
 @router.put("/funcionarios/{funcionario_id}", response_model=FuncionarioResponse)
-def atualizar_funcionario(funcionario_id: int, funcionario: FuncionarioUpdate, db: Session = Depends(get_db)):
-    db_funcionario = db.query(Funcionario).filter(Funcionario.id == funcionario_id).first()
+async def atualizar_funcionario(funcionario_id: int, funcionario: FuncionarioUpdate, db: AsyncSession = Depends(get_db)):
+    db_funcionario = await db.get(Funcionario, funcionario_id)
     if not db_funcionario:
         raise HTTPException(status_code=404, detail="Funcionário não encontrado")
     
     # Se estiver atualizando o cargo, verificar se existe
     if funcionario.cargo_id:
-        cargo = db.query(Cargo).filter(Cargo.id == funcionario.cargo_id).first()
+        cargo = await db.get(Cargo, funcionario.cargo_id)
         if not cargo:
             raise HTTPException(status_code=404, detail="Cargo não encontrado")
     
@@ -236,53 +354,82 @@ def atualizar_funcionario(funcionario_id: int, funcionario: FuncionarioUpdate, d
     for key, value in update_data.items():
         setattr(db_funcionario, key, value)
     
-    db.commit()
-    db.refresh(db_funcionario)
+    await db.commit()
+    await cache.invalidate(f"pessoa:cpf:{db_funcionario.cpf}")
+    await db.refresh(db_funcionario)
     
-    response_data = FuncionarioResponse.model_validate(db_funcionario)
-    if db_funcionario.cargo:
-        response_data.cargo_nome = db_funcionario.cargo.nome
-    return response_data
+    cargo_nome = await db.scalar(select(Cargo.nome).where(Cargo.id == db_funcionario.cargo_id))
+    return _funcionario_response(db_funcionario, cargo_nome)
 
 @router.delete("/funcionarios/{funcionario_id}")
-def deletar_funcionario(funcionario_id: int, db: Session = Depends(get_db)):
-    funcionario = db.query(Funcionario).filter(Funcionario.id == funcionario_id).first()
+async def deletar_funcionario(funcionario_id: int, db: AsyncSession = Depends(get_db)):
+    funcionario = await db.get(Funcionario, funcionario_id)
     if not funcionario:
         raise HTTPException(status_code=404, detail="Funcionário não encontrado")
     
-    db.delete(funcionario)
-    db.commit()
+    await db.delete(funcionario)
+    await db.commit()
+    await cache.invalidate(f"pessoa:cpf:{funcionario.cpf}")
     return {"message": "Funcionário deletado com sucesso"}
 
-@router.get("/funcionarios/cargo/{cargo_id}", response_model=List[FuncionarioResponse])
-def listar_funcionarios_por_cargo(cargo_id: int, db: Session = Depends(get_db)):
-    cargo = db.query(Cargo).filter(Cargo.id == cargo_id).first()
+@router.get("/funcionarios/cargo/{cargo_id}", response_model=Page[FuncionarioResponse], dependencies=[condicional("pessoa", "funcionario", "cargo")])
+async def listar_funcionarios_por_cargo(
+    cargo_id: int,
+    fields: Campos = campos(FuncionarioResponse),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    cargo = await db.scalar(select(Cargo.id).where(Cargo.id == cargo_id))
     if not cargo:
         raise HTTPException(status_code=404, detail="Cargo não encontrado")
     
-    funcionarios = db.query(Funcionario).filter(Funcionario.cargo_id == cargo_id).all()
-    result = []
-    for func in funcionarios:
-        response_data = FuncionarioResponse.model_validate(func)
-        response_data.cargo_nome = cargo.nome
-        result.append(response_data)
-    return result
-
-@router.get("/funcionarios/ativos", response_model=List[FuncionarioResponse])
-def listar_funcionarios_ativos(db: Session = Depends(get_db)):
-    funcionarios = db.query(Funcionario).filter(Funcionario.ativo == True).all()
-    result = []
-    for func in funcionarios:
-        response_data = FuncionarioResponse.model_validate(func)
-        if func.cargo:
-            response_data.cargo_nome = func.cargo.nome
-        result.append(response_data)
-    return result
+    return await paginar(db, _query_funcionarios(fields).where(Funcionario.cargo_id == cargo_id), Funcionario.id, page)
+
+# Rotas genéricas por id ficam depois das rotas /clientes e /funcionarios,
+# senão "/{pessoa_id}" captura esses caminhos
+@router.get("/{pessoa_id}", response_model=PessoaResponse, dependencies=[condicional("pessoa")])
+async def obter_pessoa(pessoa_id: int, fields: Campos = campos(PessoaResponse), db: AsyncSession = Depends(get_read_db)):
+    rows = await linhas(db, select(*colunas(PessoaResponse, Pessoa, fields)).where(Pessoa.id == pessoa_id))
+    if not rows:
+        raise HTTPException(status_code=404, detail="Pessoa não encontrada")
+    return RespostaJSON(rows[0])
+
+@router.put("/{pessoa_id}", response_model=PessoaResponse)
+async def atualizar_pessoa(pessoa_id: int, pessoa: PessoaUpdate, db: AsyncSession = Depends(get_db)):
+    db_pessoa = await db.get(Pessoa, pessoa_id)
+    if not db_pessoa:
+        raise HTTPException(status_code=404, detail="Pessoa não encontrada")
+    
+    update_data = pessoa.model_dump(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(db_pessoa, key, value)
+    
+    await db.commit()
+    await cache.invalidate(f"pessoa:cpf:{db_pessoa.cpf}")
+    await db.refresh(db_pessoa)
+    return db_pessoa
+
+@router.delete("/{pessoa_id}")
+async def deletar_pessoa(pessoa_id: int, db: AsyncSession = Depends(get_db)):
+    pessoa = await db.get(Pessoa, pessoa_id)
+    if not pessoa:
+        raise HTTPException(status_code=404, detail="Pessoa não encontrada")
+    
+    await db.delete(pessoa)
+    await db.commit()
+    await cache.invalidate(f"pessoa:cpf:{pessoa.cpf}")
+    return {"message": "Pessoa deletada com sucesso"}
 
 # Endpoint para buscar pessoa por CPF
-@router.get("/cpf/{cpf}", response_model=PessoaResponse)
-def buscar_pessoa_por_cpf(cpf: str, db: Session = Depends(get_db)):
-    pessoa = db.query(Pessoa).filter(Pessoa.cpf == cpf).first()
+@router.get("/cpf/{cpf}", response_model=PessoaResponse, dependencies=[condicional_linha(Pessoa, "cpf", coluna="cpf")])
+async def buscar_pessoa_por_cpf(cpf: str, fields: Campos = campos(PessoaResponse), db: AsyncSession = Depends(get_db)):
+    async def carregar():
+        pessoa = await db.scalar(select(Pessoa).where(Pessoa.cpf == cpf))
+        return PessoaResponse.model_validate(pessoa).model_dump(mode="json") if pessoa else None
+    
+    pessoa = await cache.get_or_load(f"pessoa:cpf:{cpf}", carregar, versao=versoes_da_requisicao.get())
     if not pessoa:
         raise HTTPException(status_code=404, detail="Pessoa não encontrada")
-    return pessoa 
\ No newline at end of file
+    if fields is not None:
+        return RespostaJSON(projetar(pessoa, fields))
+    return pessoa
\ No newline at end of file
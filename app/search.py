@@ -0,0 +1,79 @@
+import re
+import unicodedata
+from typing import List
+
+from sqlalchemy import and_, or_, select, text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.book import Book
+
+# Tamanho mínimo de termo indexado pelo FULLTEXT do InnoDB (innodb_ft_min_token_size)
+MYSQL_MIN_TOKEN = 3
+
+
+def normalizar(texto: str) -> str:
+    """Remove acentos e coloca em minúsculas: "Coração" -> "coracao"."""
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def tokenizar(texto: str) -> List[str]:
+    return re.findall(r"\w+", normalizar(texto))
+
+
+def _filtros_ilike(tokens: List[str]):
+    # Cada termo precisa aparecer em alguma coluna
+    return [
+        or_(Book.title.ilike(f"%{t}%"), Book.author.ilike(f"%{t}%"), Book.publisher.ilike(f"%{t}%"))
+        for t in tokens
+    ]
+
+
+async def _buscar_mysql(db: AsyncSession, tokens: List[str], limit: int) -> List[Book]:
+    # Termos curtos não estão no índice FULLTEXT: viram filtro ILIKE sobre as
+    # linhas que casam com os demais, ou a busca inteira vai para o ILIKE
+    longos = [t for t in tokens if len(t) >= MYSQL_MIN_TOKEN]
+    curtos = [t for t in tokens if len(t) < MYSQL_MIN_TOKEN]
+    if not longos:
+        return await _buscar_generico(db, tokens, limit)
+    # Modo booleano: todo termo é obrigatório e vale como prefixo ("+machad*")
+    relevancia = match(
+        Book.title, Book.author, Book.publisher, against=" ".join(f"+{t}*" for t in longos)
+    ).in_boolean_mode()
+    result = await db.execute(
+        select(Book).where(relevancia, *_filtros_ilike(curtos)).order_by(relevancia.desc()).limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def _buscar_sqlite(db: AsyncSession, tokens: List[str], limit: int) -> List[Book]:
+    consulta = " ".join(f'"{t}"*' for t in tokens)
+    # bm25 com pesos por coluna: título > autor > editora
+    statement = text(
+        "SELECT book.* FROM book_fts JOIN book ON book.id = book_fts.rowid "
+        "WHERE book_fts MATCH :consulta "
+        "ORDER BY bm25(book_fts, 10.0, 5.0, 1.0) LIMIT :limit"
+    )
+    result = await db.execute(select(Book).from_statement(statement), {"consulta": consulta, "limit": limit})
+    return result.scalars().all()
+
+
+async def _buscar_generico(db: AsyncSession, tokens: List[str], limit: int) -> List[Book]:
+    # Sem índice textual no banco
+    result = await db.execute(select(Book).where(and_(*_filtros_ilike(tokens))).order_by(Book.title).limit(limit))
+    return result.scalars().all()
+
+
+async def buscar_livros(db: AsyncSession, q: str, limit: int) -> List[Book]:
+    """Busca por título, autor e editora, ordenada por relevância."""
+    tokens = tokenizar(q)
+    if not tokens:
+        return []
+
+    dialeto = db.bind.dialect.name
+    if dialeto == "mysql":
+        return await _buscar_mysql(db, tokens, limit)
+    if dialeto == "sqlite":
+        return await _buscar_sqlite(db, tokens, limit)
+    return await _buscar_generico(db, tokens, limit)
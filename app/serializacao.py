@@ -0,0 +1,114 @@
+"""Caminho rápido de serialização para as listagens.
+
+As rotas selecionam só as colunas do schema de resposta (linhas Core, sem
+identity map nem objetos ORM) e devolvem o JSON já pronto numa RespostaJSON.
+O response_model continua no decorator para o OpenAPI; como a rota devolve
+um Response, o FastAPI não revalida linha por linha. Quem pedir MessagePack
+no Accept recebe MessagePack (ver app/codificacao.py).
+
+Com ?fields=id,title a projeção chega ao SQL: colunas() só seleciona os
+campos pedidos, e as colunas não pedidas nem são lidas do banco.
+"""
+from typing import Any, List, Optional, Tuple, Type
+
+from fastapi import Depends, HTTPException, Query, Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.codificacao import MSGPACK, empacotar, formato_da_requisicao
+from app.etag import etag_da_requisicao
+from app.pagination import PageParams, paginate
+
+try:
+    import orjson
+except ImportError:  # pydantic_core.to_json também serializa sem validar, só é mais lento
+    orjson = None
+
+
+# Campos pedidos em ?fields=, ou None para todos os do schema
+Campos = Optional[Tuple[str, ...]]
+
+
+def colunas(schema: Type[BaseModel], entidade, campos: Campos = None, **extras) -> list:
+    """Colunas de `entidade` rotuladas com os campos de `schema` (só os de `campos`, se dados).
+
+    `extras` dá a expressão de campos que não são atributos da entidade,
+    ex.: cargo_nome=Cargo.nome.
+    """
+    return [
+        (extras[nome] if nome in extras else getattr(entidade, nome)).label(nome)
+        for nome in schema.model_fields
+        if campos is None or nome in campos
+    ]
+
+
+def campos(*schemas: Type[BaseModel]):
+    """Dependência do parâmetro ?fields=, validado contra os campos dos `schemas`.
+
+    Devolve os campos pedidos na ordem do schema, sempre com o id (o cursor
+    da paginação e o cliente precisam dele), ou None sem o parâmetro.
+    Campos desconhecidos dão 400.
+    """
+    validos = list(dict.fromkeys(nome for schema in schemas for nome in schema.model_fields))
+    descricao = f"Campos da resposta, separados por vírgula: {', '.join(validos)}. O id sempre vem."
+
+    def dependencia(fields: Optional[str] = Query(None, description=descricao)) -> Campos:
+        if fields is None:
+            return None
+        pedidos = {nome.strip() for nome in fields.split(",") if nome.strip()}
+        invalidos = pedidos.difference(validos)
+        if invalidos:
+            raise HTTPException(status_code=400, detail=f"Campos inválidos em fields: {', '.join(sorted(invalidos))}")
+        if "id" in validos:
+            pedidos.add("id")
+        return tuple(nome for nome in validos if nome in pedidos)
+
+    return Depends(dependencia)
+
+
+def projetar(dados: dict, campos: Campos) -> dict:
+    """Só os `campos` de um item já carregado (ex.: vindo do cache)."""
+    return dados if campos is None else {nome: dados[nome] for nome in campos}
+
+
+def dumps(conteudo: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(conteudo)
+    return to_json(conteudo)
+
+
+class RespostaJSON(Response):
+    media_type = "application/json"
+
+    def __init__(self, content: Any, **kwargs):
+        self.formato = formato_da_requisicao.get()
+        if self.formato == MSGPACK:
+            self.media_type = MSGPACK
+        super().__init__(content, **kwargs)
+        self.headers.add_vary_header("Accept")
+        # Headers da dependência de ETag não chegam a um Response devolvido pela rota
+        etag = etag_da_requisicao.get()
+        if etag:
+            self.headers["ETag"] = etag
+
+    def render(self, content: Any) -> bytes:
+        if self.formato == MSGPACK:
+            return empacotar(content)
+        return dumps(content)
+
+
+async def linhas(db: AsyncSession, statement) -> List[dict]:
+    result = await db.execute(statement)
+    return [dict(row) for row in result.mappings()]
+
+
+async def listar(db: AsyncSession, statement) -> RespostaJSON:
+    return RespostaJSON(await linhas(db, statement))
+
+
+async def paginar(db: AsyncSession, statement, column, params: PageParams) -> RespostaJSON:
+    pagina = await paginate(db, statement, column, params)
+    pagina["items"] = [row._asdict() for row in pagina["items"]]
+    return RespostaJSON(pagina)
+
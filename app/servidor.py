@@ -0,0 +1,79 @@
+"""Servidor de produção: uvicorn com um ou mais workers.
+
+    python -m app.servidor
+    python -m app.servidor --workers 4 --port 8000
+
+Os padrões vêm de settings (SERVER_*). O schema é preparado uma vez aqui,
+antes dos workers subirem; cada worker é um processo novo (spawn) que
+importa main:app e abre seus próprios pools. No SIGTERM o uvicorn para de
+aceitar conexões, espera as requisições em andamento por até
+SERVER_GRACEFUL_TIMEOUT segundos e roda o shutdown do lifespan (dispose dos
+pools) em cada worker.
+
+Cada worker tem até DB_POOL_SIZE + DB_MAX_OVERFLOW conexões por engine:
+o total precisa caber no max_connections do banco. O cache por processo
+(CACHE_BACKEND=memory) serve a vários workers: cada entrada guarda as
+versões das tabelas e só é usada enquanto elas forem as do banco.
+
+O padrão é um worker. Mais workers só valem a pena se
+benchmarks.capacidade mostrar ganho na máquina de produção.
+"""
+import argparse
+import os
+
+import uvicorn
+
+import settings
+
+
+def _preparar_esquema_uma_vez() -> None:
+    # Com N workers, cada lifespan validaria o schema (e com DB_RESET_ON_STARTUP
+    # apagaria o banco debaixo dos outros). Feito aqui, os workers pulam a etapa:
+    # os spawnados pelo ambiente, o único em processo pelo próprio settings
+    from app.esquema import preparar_esquema
+    from database import async_engine, engine
+
+    preparar_esquema()
+    engine.dispose()
+    async_engine.sync_engine.dispose()
+    os.environ["DB_SCHEMA_CHECK"] = "0"
+    os.environ["DB_RESET_ON_STARTUP"] = "0"
+    settings.DB_SCHEMA_CHECK = False
+    settings.DB_RESET_ON_STARTUP = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS)
+    parser.add_argument("--keep-alive", type=int, default=settings.SERVER_KEEP_ALIVE, help="segundos")
+    parser.add_argument("--backlog", type=int, default=settings.SERVER_BACKLOG)
+    parser.add_argument("--graceful-timeout", type=int, default=settings.SERVER_GRACEFUL_TIMEOUT, help="segundos")
+    args = parser.parse_args()
+
+    _preparar_esquema_uma_vez()
+    conexoes = args.workers * (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+    print(f"{args.workers} workers em {args.host}:{args.port}; até {conexoes} conexões ao banco primário "
+          f"({args.workers} x (DB_POOL_SIZE {settings.DB_POOL_SIZE} + DB_MAX_OVERFLOW {settings.DB_MAX_OVERFLOW}))",
+          flush=True)
+
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        limit_concurrency=settings.SERVER_LIMIT_CONCURRENCY,
+        limit_max_requests=settings.SERVER_MAX_REQUESTS,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+        access_log=settings.SERVER_ACCESS_LOG,
+        server_header=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
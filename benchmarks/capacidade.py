@@ -0,0 +1,174 @@
+"""Capacidade do servidor real (app.servidor) por número de workers.
+
+Sobe `python -m app.servidor` com cada valor de --workers, gera carga de
+leitura por HTTP de verdade (sockets, keep-alive) a partir de processos
+geradores separados e mede vazão e latência. No fim de cada rodada manda
+SIGTERM e mede quanto o servidor leva para drenar e sair (código 0 com
+vários workers; com um só, o uvicorn termina re-levantando o SIGTERM: -15).
+
+    python -m benchmarks.capacidade --workers 1 2 4 --duracao 20
+    python -m benchmarks.capacidade --workers 1 4 --geradores 4 --salvar capacidade.json
+
+Os geradores disputam CPU com os workers: numa máquina com N núcleos,
+workers + geradores acima de N mede a máquina saturada, não o servidor.
+Ganho com mais workers só se mede numa máquina com núcleos para eles; o
+repositório não registra números de escala.
+Sem DATABASE_URL, usa um arquivo SQLite descartável (escritas serializadas
+pelo arquivo; a mistura é só de leituras para não medir o lock do SQLite).
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_capacidade.db")
+
+import httpx  # noqa: E402
+
+from benchmarks.carga import PALAVRAS, percentil, preparar_banco  # noqa: E402
+
+# (peso, função que monta a URL a partir do rng e dos tamanhos do banco)
+ROTAS = [
+    (3, lambda rng, a: "/books/?limit=50"),
+    (3, lambda rng, a: f"/books/{rng.randint(1, a.livros)}"),
+    (2, lambda rng, a: f"/books/{rng.randint(1, a.livros)}/availability"),
+    (2, lambda rng, a: f"/books/search?q={rng.choice(PALAVRAS)}"),
+    (1, lambda rng, a: "/pessoas/funcionarios/ativos"),
+    (1, lambda rng, a: f"/pessoas/cpf/{rng.randint(1, a.clientes + a.funcionarios):011d}"),
+]
+
+
+def _esperar_servidor(url: str, processo: subprocess.Popen, limite: float = 60.0) -> None:
+    fim = time.monotonic() + limite
+    while time.monotonic() < fim:
+        if processo.poll() is not None:
+            raise RuntimeError(f"servidor saiu com código {processo.returncode} antes de ficar pronto")
+        try:
+            if httpx.get(url + "/", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"servidor não respondeu em {limite:.0f} s")
+
+
+async def _gerar(url: str, args, semente: int) -> tuple:
+    rng = random.Random(semente)
+    pesos = [peso for peso, _ in ROTAS]
+    latencias, erros = [], 0
+    limites = httpx.Limits(max_connections=args.concorrencia, max_keepalive_connections=args.concorrencia)
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=30.0) as client:
+        fim = time.perf_counter() + args.duracao
+
+        async def usuario():
+            nonlocal erros
+            while time.perf_counter() < fim:
+                rota = rng.choices(ROTAS, pesos)[0][1](rng, args)
+                inicio = time.perf_counter()
+                try:
+                    response = await client.get(rota)
+                    if response.status_code >= 400:
+                        erros += 1
+                except httpx.HTTPError:
+                    erros += 1
+                latencias.append(time.perf_counter() - inicio)
+
+        await asyncio.gather(*(usuario() for _ in range(args.concorrencia)))
+    return latencias, erros
+
+
+def _gerador(url: str, args, semente: int, fila) -> None:
+    fila.put(asyncio.run(_gerar(url, args, semente)))
+
+
+def medir(workers: int, args) -> dict:
+    url = f"http://127.0.0.1:{args.porta}"
+    env = {**os.environ, "DB_SCHEMA_CHECK": "0", "DB_RESET_ON_STARTUP": "0", "SERVER_ACCESS_LOG": "0"}
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "app.servidor", "--host", "127.0.0.1", "--port", str(args.porta),
+         "--workers", str(workers)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _esperar_servidor(url, processo)
+        # Com vários workers, o primeiro a responder não garante que os outros já subiram
+        time.sleep(1.0 + 0.5 * workers)
+
+        fila = multiprocessing.Queue()
+        geradores = [multiprocessing.Process(target=_gerador, args=(url, args, args.semente * 100 + n, fila))
+                     for n in range(args.geradores)]
+        inicio = time.perf_counter()
+        for gerador in geradores:
+            gerador.start()
+        resultados = [fila.get() for _ in geradores]
+        duracao = time.perf_counter() - inicio
+        for gerador in geradores:
+            gerador.join()
+    finally:
+        inicio_saida = time.perf_counter()
+        processo.send_signal(signal.SIGTERM)
+        try:
+            codigo = processo.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            processo.kill()
+            codigo = processo.wait()
+        saida = time.perf_counter() - inicio_saida
+
+    latencias = [l for lats, _ in resultados for l in lats]
+    return {
+        "workers": workers,
+        "requisicoes": len(latencias),
+        "erros": sum(e for _, e in resultados),
+        "req_por_s": round(len(latencias) / duracao, 1),
+        "p50_ms": round(percentil(latencias, 50) * 1000, 3),
+        "p95_ms": round(percentil(latencias, 95) * 1000, 3),
+        "p99_ms": round(percentil(latencias, 99) * 1000, 3),
+        "sigterm_codigo": codigo,
+        "sigterm_s": round(saida, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--duracao", type=float, default=15.0, help="segundos de carga por rodada")
+    parser.add_argument("--geradores", type=int, default=2, help="processos gerando carga")
+    parser.add_argument("--concorrencia", type=int, default=32, help="conexões por gerador")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--livros", type=int, default=2000)
+    parser.add_argument("--clientes", type=int, default=500)
+    parser.add_argument("--funcionarios", type=int, default=100)
+    parser.add_argument("--cargos", type=int, default=10)
+    parser.add_argument("--empresas", type=int, default=50)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--salvar", help="grava o resultado em JSON")
+    args = parser.parse_args()
+
+    nucleos = os.cpu_count() or 1
+    if max(args.workers) + args.geradores > nucleos:
+        print(f"Aviso: {nucleos} núcleo(s) para até {max(args.workers)} workers + {args.geradores} geradores; "
+              "os números medem a máquina saturada", file=sys.stderr)
+
+    preparar_banco(args)
+    rodadas = [medir(workers, args) for workers in args.workers]
+
+    base = rodadas[0]["req_por_s"] or 1.0
+    print(f"{'workers':>7} {'req/s':>8} {'x':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'erros':>6} {'SIGTERM':>12}")
+    for r in rodadas:
+        print(f"{r['workers']:>7} {r['req_por_s']:>8.1f} {r['req_por_s'] / base:>5.2f} {r['p50_ms']:>8.2f} "
+              f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['erros']:>6} "
+              f"{'código ' + str(r['sigterm_codigo']):>8} {r['sigterm_s']:.1f}s")
+
+    if args.salvar:
+        with open(args.salvar, "w") as f:
+            json.dump({"nucleos": nucleos, "config": vars(args), "rodadas": rodadas}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
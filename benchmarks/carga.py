@@ -0,0 +1,361 @@
+"""Carga HTTP em processo sobre main.app: latência, vazão e SQL por rota.
+
+Popula o banco e então dispara requisições concorrentes pelo httpx
+(ASGITransport, sem servidor nem rede), misturando cinco cenários:
+
+    catalogo  listagem, detalhe, disponibilidade e cópias de livros
+    busca     busca textual e consulta por ISBN
+    balcao    empréstimo seguido de devolução da mesma cópia
+    lote      sessão de balcão: 10 a 30 cópias emprestadas e devolvidas em lote
+    equipe    funcionários ativos, por cargo, pessoa por CPF, empresa
+
+Para cada rota: p50/p95/p99, vazão e comandos SQL por requisição.
+
+    python -m benchmarks.carga --requisicoes 5000 --concorrencia 32 --salvar baseline.json
+    python -m benchmarks.carga --comparar baseline.json --tolerancia 0.25
+
+Com --comparar, termina com código 1 se alguma rota piorar além da
+tolerância (p95 ou SQL por requisição) ou se a vazão total cair.
+
+Sem DATABASE_URL, usa um arquivo SQLite descartável. O schema do banco
+usado é apagado e recriado; fora do SQLite isso exige --reset, para um
+DATABASE_URL exportado no shell não apagar um banco de verdade:
+
+    DATABASE_URL=mysql+pymysql://bench@localhost/bench python -m benchmarks.carga --reset
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_carga.db")
+
+import httpx  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+
+from main import app  # noqa: E402
+from app.cache import cache  # noqa: E402
+from app.models.book import Book, BookCopy  # noqa: E402
+from app.models.cargo import Cargo  # noqa: E402
+from app.models.empresa import Empresa  # noqa: E402
+from app.models.pessoa import Cliente, Funcionario, Pessoa  # noqa: E402
+from database import Base, async_engine, engine  # noqa: E402
+
+PALAVRAS = ["sombra", "vento", "cidade", "jardim", "rio", "estrela", "montanha", "silêncio",
+            "memória", "viagem", "noite", "mar", "fogo", "ilha", "caminho", "segredo"]
+AUTORES = ["Machado", "Clarice", "Drummond", "Cecília", "Graciliano", "Rachel", "Jorge", "Lygia"]
+COPIAS_POR_LIVRO = 3
+# Amostras mínimas de uma rota para comparar latências com a baseline
+MIN_AMOSTRAS = 50
+
+# Comandos SQL da requisição em andamento; uma lista para poder ser
+# incrementada de qualquer contexto copiado a partir da tarefa
+_sql: ContextVar[Optional[list]] = ContextVar("_sql", default=None)
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _contar_sql(conn, cursor, statement, parameters, context, executemany):
+    contador = _sql.get()
+    if contador is not None:
+        contador[0] += 1
+
+
+@dataclass
+class Dados:
+    livros: int
+    clientes: int
+    funcionarios: int
+    cargos: int
+    empresas: int
+    copias: asyncio.Queue = field(default_factory=asyncio.Queue)
+
+
+@dataclass
+class Medida:
+    latencias: list = field(default_factory=list)
+    sql: int = 0
+    erros: int = 0
+
+
+def preparar_banco(args) -> Dados:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(args.semente)
+    hoje = date.today()
+    with engine.begin() as conn:
+        conn.execute(insert(Book), [
+            {"title": f"{rng.choice(PALAVRAS).capitalize()} e {rng.choice(PALAVRAS)} {n}",
+             "author": rng.choice(AUTORES), "isbn": f"{n:013d}", "publisher": "Bench",
+             "total_copies": COPIAS_POR_LIVRO, "available_copies": COPIAS_POR_LIVRO}
+            for n in range(1, args.livros + 1)
+        ])
+        conn.execute(insert(BookCopy), [
+            {"book_id": livro, "copy_number": n, "is_available": True, "condition": "bom",
+             "location": f"E{livro % 20}"}
+            for livro in range(1, args.livros + 1) for n in range(1, COPIAS_POR_LIVRO + 1)
+        ])
+        conn.execute(insert(Cargo), [
+            {"nome": f"Cargo {n}", "salario_base": 3000.0 + n * 500, "nivel_hierarquico": n}
+            for n in range(1, args.cargos + 1)
+        ])
+        conn.execute(insert(Empresa), [
+            {"cnpj": f"{n:014d}", "razao_social": f"Empresa {n}", "email_contato": f"contato{n}@bench"} for n in range(1, args.empresas + 1)
+        ])
+        # Herança joined: ids de pessoa 1..clientes são clientes, o resto funcionários
+        pessoas = args.clientes + args.funcionarios
+        conn.execute(insert(Pessoa.__table__), [
+            {"id": n, "nome": f"Pessoa {n}", "cpf": f"{n:011d}", "data_nascimento": date(1990, 1, 1),
+             "tipo": "cliente" if n <= args.clientes else "funcionario"}
+            for n in range(1, pessoas + 1)
+        ])
+        conn.execute(insert(Cliente.__table__), [
+            {"id": n, "data_cadastro": hoje, "status": "ativo"} for n in range(1, args.clientes + 1)
+        ])
+        conn.execute(insert(Funcionario.__table__), [
+            {"id": n, "cargo_id": rng.randint(1, args.cargos), "data_contratacao": hoje,
+             "salario": 4000.0, "ativo": rng.random() < 0.9}
+            for n in range(args.clientes + 1, pessoas + 1)
+        ])
+    dados = Dados(args.livros, args.clientes, args.funcionarios, args.cargos, args.empresas)
+    for copia in range(1, args.livros * COPIAS_POR_LIVRO + 1):
+        dados.copias.put_nowait(copia)
+    return dados
+
+
+async def requisitar(client, medidas, rota: str, metodo: str, url: str, **kwargs):
+    contador = [0]
+    token = _sql.set(contador)
+    inicio = time.perf_counter()
+    try:
+        response = await client.request(metodo, url, **kwargs)
+    finally:
+        _sql.reset(token)
+    medida = medidas[rota]
+    medida.latencias.append(time.perf_counter() - inicio)
+    medida.sql += contador[0]
+    if response.status_code >= 400:
+        medida.erros += 1
+    return response
+
+
+async def catalogo(client, medidas, dados: Dados, rng: random.Random):
+    livro = rng.randint(1, dados.livros)
+    escolha = rng.random()
+    if escolha < 0.3:
+        await requisitar(client, medidas, "GET /books/", "GET", "/books/", params={"limit": 50})
+    elif escolha < 0.6:
+        await requisitar(client, medidas, "GET /books/{book_id}", "GET", f"/books/{livro}")
+    elif escolha < 0.8:
+        await requisitar(client, medidas, "GET /books/{book_id}/availability", "GET", f"/books/{livro}/availability")
+    else:
+        await requisitar(client, medidas, "GET /books/{book_id}/copies", "GET", f"/books/{livro}/copies")
+
+
+async def busca(client, medidas, dados: Dados, rng: random.Random):
+    if rng.random() < 0.6:
+        q = " ".join(rng.sample(PALAVRAS, rng.randint(1, 2)))
+        await requisitar(client, medidas, "GET /books/search", "GET", "/books/search", params={"q": q})
+    else:
+        isbn = f"{rng.randint(1, dados.livros):013d}"
+        await requisitar(client, medidas, "GET /books/isbn/{isbn}", "GET", f"/books/isbn/{isbn}")
+
+
+async def balcao(client, medidas, dados: Dados, rng: random.Random):
+    copia = await dados.copias.get()
+    try:
+        response = await requisitar(client, medidas, "POST /emprestimos/", "POST", "/emprestimos/", json={
+            "cliente_id": rng.randint(1, dados.clientes),
+            "livro_copia_id": copia,
+            "data_devolucao_prevista": (datetime.now() + timedelta(days=14)).isoformat(),
+        })
+        if response.status_code == 201:
+            emprestimo_id = response.json()["id"]
+            await requisitar(client, medidas, "PUT /emprestimos/{emprestimo_id}/devolver", "PUT",
+                             f"/emprestimos/{emprestimo_id}/devolver")
+    finally:
+        dados.copias.put_nowait(copia)
+
+
+async def lote(client, medidas, dados: Dados, rng: random.Random):
+    copias = [await dados.copias.get() for _ in range(rng.randint(10, 30))]
+    try:
+        response = await requisitar(client, medidas, "POST /emprestimos/batch", "POST", "/emprestimos/batch", json={
+            "cliente_id": rng.randint(1, dados.clientes),
+            "livro_copia_ids": copias,
+            "data_devolucao_prevista": (datetime.now() + timedelta(days=14)).isoformat(),
+        })
+        if response.status_code == 201:
+            ids = [emprestimo["id"] for emprestimo in response.json()["created"]]
+            await requisitar(client, medidas, "PUT /emprestimos/batch/devolver", "PUT",
+                             "/emprestimos/batch/devolver", json={"emprestimo_ids": ids})
+    finally:
+        for copia in copias:
+            dados.copias.put_nowait(copia)
+
+
+async def equipe(client, medidas, dados: Dados, rng: random.Random):
+    escolha = rng.random()
+    if escolha < 0.25:
+        await requisitar(client, medidas, "GET /pessoas/funcionarios/ativos", "GET", "/pessoas/funcionarios/ativos")
+    elif escolha < 0.5:
+        funcionario = dados.clientes + rng.randint(1, dados.funcionarios)
+        await requisitar(client, medidas, "GET /pessoas/funcionarios/{funcionario_id}", "GET",
+                         f"/pessoas/funcionarios/{funcionario}")
+    elif escolha < 0.65:
+        await requisitar(client, medidas, "GET /cargos/{cargo_id}/funcionarios", "GET",
+                         f"/cargos/{rng.randint(1, dados.cargos)}/funcionarios")
+    elif escolha < 0.8:
+        cpf = f"{rng.randint(1, dados.clientes + dados.funcionarios):011d}"
+        await requisitar(client, medidas, "GET /pessoas/cpf/{cpf}", "GET", f"/pessoas/cpf/{cpf}")
+    elif escolha < 0.9:
+        await requisitar(client, medidas, "GET /pessoas/?include_subtype=true", "GET", "/pessoas/",
+                         params={"include_subtype": "true", "tipo": rng.choice(["cliente", "funcionario"])})
+    else:
+        await requisitar(client, medidas, "GET /empresas/{empresa_id}", "GET",
+                         f"/empresas/{rng.randint(1, dados.empresas)}")
+
+
+CENARIOS = {
+    "catalogo": (catalogo, 4), "busca": (busca, 2), "balcao": (balcao, 2), "lote": (lote, 1), "equipe": (equipe, 2),
+}
+
+
+async def rodar(client, dados: Dados, args, requisicoes: int) -> tuple:
+    medidas = defaultdict(Medida)
+    nomes = args.cenarios
+    pesos = [CENARIOS[nome][1] for nome in nomes]
+    restantes = iter(range(requisicoes))
+
+    async def trabalhador(n: int):
+        rng = random.Random(args.semente * 1000 + n)
+        for _ in restantes:
+            cenario = CENARIOS[rng.choices(nomes, pesos)[0]][0]
+            await cenario(client, medidas, dados, rng)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador(n) for n in range(args.concorrencia)))
+    return medidas, time.perf_counter() - inicio
+
+
+def percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+def resumir(medidas, duracao: float, args) -> dict:
+    rotas = {}
+    for rota, medida in sorted(medidas.items()):
+        n = len(medida.latencias)
+        rotas[rota] = {
+            "n": n,
+            "erros": medida.erros,
+            "p50_ms": round(percentil(medida.latencias, 50) * 1000, 3),
+            "p95_ms": round(percentil(medida.latencias, 95) * 1000, 3),
+            "p99_ms": round(percentil(medida.latencias, 99) * 1000, 3),
+            "req_por_s": round(n / duracao, 1),
+            "sql_por_req": round(medida.sql / n, 3),
+        }
+    total = sum(r["n"] for r in rotas.values())
+    return {
+        "config": {k: v for k, v in vars(args).items() if k not in ("salvar", "comparar", "tolerancia")},
+        "banco": engine.dialect.name,
+        "duracao_s": round(duracao, 3),
+        "requisicoes": total,
+        "req_por_s": round(total / duracao, 1),
+        "cache": cache.stats(),
+        "rotas": rotas,
+    }
+
+
+def imprimir(resultado: dict):
+    print(f"{'rota':<44} {'n':>6} {'erros':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'sql/req':>7}")
+    for rota, r in resultado["rotas"].items():
+        print(f"{rota:<44} {r['n']:>6} {r['erros']:>5} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['p99_ms']:>8.2f} {r['req_por_s']:>8.1f} {r['sql_por_req']:>7.2f}")
+    print(f"\n{resultado['requisicoes']} requisições em {resultado['duracao_s']:.2f} s "
+          f"({resultado['req_por_s']:.1f} req/s, banco {resultado['banco']})")
+
+
+def comparar(atual: dict, base: dict, tolerancia: float) -> list:
+    regressoes = []
+    if atual["req_por_s"] < base["req_por_s"] * (1 - tolerancia):
+        regressoes.append(f"vazão total: {base['req_por_s']} -> {atual['req_por_s']} req/s")
+    for rota, anterior in base["rotas"].items():
+        r = atual["rotas"].get(rota)
+        if r is None:
+            continue
+        # p95 de poucas amostras é só ruído
+        if min(r["n"], anterior["n"]) >= MIN_AMOSTRAS and r["p95_ms"] > anterior["p95_ms"] * (1 + tolerancia):
+            regressoes.append(f"{rota}: p95 {anterior['p95_ms']} -> {r['p95_ms']} ms")
+        # Comandos SQL quase não variam: a tolerância só absorve acertos de cache
+        if r["sql_por_req"] > anterior["sql_por_req"] * (1 + tolerancia) + 0.05:
+            regressoes.append(f"{rota}: sql/req {anterior['sql_por_req']} -> {r['sql_por_req']}")
+        if r["erros"] > anterior["erros"]:
+            regressoes.append(f"{rota}: erros {anterior['erros']} -> {r['erros']}")
+    return regressoes
+
+
+async def executar(args) -> dict:
+    dados = preparar_banco(args)
+    # Exceções da aplicação viram 500 e entram na contagem de erros da rota
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            if args.aquecimento:
+                await rodar(client, dados, args, args.aquecimento)
+            medidas, duracao = await rodar(client, dados, args, args.requisicoes)
+    finally:
+        await async_engine.dispose()
+    return resumir(medidas, duracao, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=3000, help="cenários executados (balcao faz duas requisições)")
+    parser.add_argument("--concorrencia", type=int, default=16)
+    parser.add_argument("--aquecimento", type=int, default=200, help="requisições descartadas antes da medição")
+    parser.add_argument("--cenarios", nargs="+", choices=sorted(CENARIOS), default=list(CENARIOS))
+    parser.add_argument("--livros", type=int, default=2000)
+    parser.add_argument("--clientes", type=int, default=500)
+    parser.add_argument("--funcionarios", type=int, default=100)
+    parser.add_argument("--cargos", type=int, default=10)
+    parser.add_argument("--empresas", type=int, default=50)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--salvar", help="grava o resultado em JSON (baseline)")
+    parser.add_argument("--comparar", help="baseline JSON para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    parser.add_argument("--reset", action="store_true",
+                        help="permite apagar e recriar o schema de um banco que não é SQLite")
+    args = parser.parse_args()
+    bancos = {url.render_as_string(hide_password=True) for url in (engine.url, async_engine.url)
+              if url.get_backend_name() != "sqlite"}
+    if bancos and not args.reset:
+        parser.error(f"o schema de {', '.join(sorted(bancos))} seria apagado e recriado; use --reset para confirmar")
+
+    resultado = asyncio.run(executar(args))
+    imprimir(resultado)
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        if (base["config"], base["banco"]) != (resultado["config"], resultado["banco"]):
+            print("Aviso: a baseline foi gerada com outra configuração ou outro banco")
+        regressoes = comparar(resultado, base, args.tolerancia)
+        for regressao in regressoes:
+            print(f"REGRESSÃO {regressao}")
+        sys.exit(1 if regressoes else 0)
+
+
+if __name__ == "__main__":
+    main()
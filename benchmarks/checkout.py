@@ -0,0 +1,130 @@
+"""Checkout: fluxo antigo (ler, verificar, escrever) x UPDATE condicional.
+
+Mede empréstimos por segundo dos dois fluxos e repete o teste de corrida:
+vários balcões tentando emprestar a mesma cópia ao mesmo tempo. Só um pode
+conseguir.
+
+    python -m benchmarks.checkout --emprestimos 2000 --concorrencia 20
+
+Sem DATABASE_URL, usa um arquivo SQLite descartável. O schema do banco
+usado é apagado e recriado.
+"""
+import argparse
+import asyncio
+import os
+import time
+from datetime import date, datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_checkout.db")
+
+from fastapi import HTTPException  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.models.book import Book, BookCopy  # noqa: E402
+from app.models.cargo import Cargo  # noqa: E402,F401 (FK de funcionario)
+from app.models.emprestimo import Emprestimo  # noqa: E402
+from app.models.pessoa import Cliente  # noqa: E402
+from app.routers.emprestimo import EmprestimoCreate, criar_emprestimo  # noqa: E402
+from database import AsyncSessionLocal, Base, async_engine, engine  # noqa: E402
+
+
+async def checkout_antigo(emprestimo: EmprestimoCreate, db):
+    """Fluxo anterior de criar_emprestimo, mantido aqui só para comparação."""
+    cliente = await db.get(Cliente, emprestimo.cliente_id)
+    if not cliente:
+        raise HTTPException(status_code=404, detail="Cliente não encontrado")
+    livro_copia = await db.get(BookCopy, emprestimo.livro_copia_id)
+    if not livro_copia:
+        raise HTTPException(status_code=404, detail="Cópia do livro não encontrada")
+    if not livro_copia.is_available:
+        raise HTTPException(status_code=400, detail="Cópia do livro não está disponível")
+    db_emprestimo = Emprestimo(
+        cliente_id=emprestimo.cliente_id,
+        livro_copia_id=emprestimo.livro_copia_id,
+        data_retirada=datetime.now(),
+        data_devolucao_prevista=emprestimo.data_devolucao_prevista,
+        status='ativo'
+    )
+    livro_copia.is_available = False
+    db.add(db_emprestimo)
+    await db.commit()
+    await db.refresh(db_emprestimo)
+    return db_emprestimo
+
+
+def preparar_banco(copias: int):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Book), [{"title": "Benchmark", "author": "Bench", "isbn": "0"}])
+        conn.execute(
+            insert(BookCopy),
+            [{"book_id": 1, "copy_number": n, "is_available": True} for n in range(1, copias + 1)]
+        )
+
+
+async def criar_cliente() -> int:
+    async with AsyncSessionLocal() as db:
+        cliente = Cliente(nome="Bench", cpf="00000000000", data_nascimento=date(2000, 1, 1),
+                          data_cadastro=date.today())
+        db.add(cliente)
+        await db.commit()
+        return cliente.id
+
+
+async def tentar(fluxo, cliente_id: int, copia_id: int) -> bool:
+    pedido = EmprestimoCreate(
+        cliente_id=cliente_id,
+        livro_copia_id=copia_id,
+        data_devolucao_prevista=datetime.now() + timedelta(days=14),
+    )
+    async with AsyncSessionLocal() as db:
+        try:
+            await fluxo(pedido, db)
+            return True
+        except HTTPException:
+            return False
+
+
+async def vazao(fluxo, cliente_id: int, copias: range, concorrencia: int) -> float:
+    limite = asyncio.Semaphore(concorrencia)
+
+    async def um(copia_id):
+        async with limite:
+            return await tentar(fluxo, cliente_id, copia_id)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(um(c) for c in copias))
+    return len(copias) / (time.perf_counter() - inicio)
+
+
+async def corrida(fluxo, cliente_id: int, copia_id: int, concorrencia: int) -> int:
+    resultados = await asyncio.gather(*(tentar(fluxo, cliente_id, copia_id) for _ in range(concorrencia)))
+    return sum(resultados)
+
+
+async def executar(args):
+    n = args.emprestimos
+    # cópias 1..n para o fluxo antigo, n+1..2n para o novo, e uma por fluxo para a corrida
+    preparar_banco(2 * n + 2)
+    cliente_id = await criar_cliente()
+
+    fluxos = [("antigo", checkout_antigo, range(1, n + 1), 2 * n + 1),
+              ("update condicional", criar_emprestimo, range(n + 1, 2 * n + 1), 2 * n + 2)]
+    print(f"{'fluxo':<20} {'emprestimos/s':>14} {'sucessos na corrida':>20}")
+    for nome, fluxo, copias, copia_disputada in fluxos:
+        por_segundo = await vazao(fluxo, cliente_id, copias, args.concorrencia)
+        sucessos = await corrida(fluxo, cliente_id, copia_disputada, args.concorrencia)
+        print(f"{nome:<20} {por_segundo:>14.1f} {sucessos:>20}")
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emprestimos", type=int, default=1000)
+    parser.add_argument("--concorrencia", type=int, default=20)
+    asyncio.run(executar(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Bytes no fio e custo de CPU de cada representação das listagens.
+
+Para /books/, /emprestimos/ e /pessoas/?include_subtype=true, com páginas de
+vários tamanhos, mede cada combinação de formato (Accept) e compressão
+(Accept-Encoding):
+
+    bytes    Content-Length da resposta real, pelo httpx (ASGITransport)
+    cod. ms  CPU do servidor: serializar (orjson/msgpack) + comprimir
+    dec. ms  CPU do cliente: descomprimir + decodificar (json/msgpack)
+
+    python -m benchmarks.codificacao --limites 50 500 --repeticoes 50
+
+Os tempos de CPU repetem as funções usadas pela API (app.serializacao.dumps,
+app.codificacao.empacotar/comprimir) sobre o conteúdo da página, com os
+níveis de COMPRESSAO_GZIP_NIVEL e COMPRESSAO_BROTLI_QUALIDADE.
+
+Sem DATABASE_URL, usa um arquivo SQLite descartável. O schema do banco
+usado é apagado e recriado.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_codificacao.db")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from benchmarks.carga import COPIAS_POR_LIVRO, preparar_banco  # noqa: E402
+from main import app  # noqa: E402
+from app.codificacao import MSGPACK, brotli, comprimir, empacotar, msgpack  # noqa: E402
+from app.models.emprestimo import Emprestimo  # noqa: E402
+from app.serializacao import dumps  # noqa: E402
+from database import async_engine, engine  # noqa: E402
+
+ROTAS = {
+    "/books/": {},
+    "/emprestimos/": {},
+    "/pessoas/": {"include_subtype": "true"},
+}
+FORMATOS = ["json"] + (["msgpack"] if msgpack is not None else [])
+CODIFICACOES = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+
+
+def semear_emprestimos(args) -> None:
+    agora = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(insert(Emprestimo), [
+            {"cliente_id": n % args.clientes + 1, "livro_copia_id": n % (args.livros * COPIAS_POR_LIVRO) + 1,
+             "data_retirada": agora - timedelta(days=n % 30), "data_devolucao_prevista": agora + timedelta(days=14),
+             "data_devolucao_real": None if n % 3 else agora, "valor_multa": 0.0 if n % 7 else 4.0,
+             "status": "ativo" if n % 3 else "devolvido"}
+            for n in range(args.emprestimos)
+        ])
+
+
+def cronometrar(funcao, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def _codificar(conteudo, formato: str, codificacao: str) -> bytes:
+    corpo = empacotar(conteudo) if formato == "msgpack" else dumps(conteudo)
+    return corpo if codificacao == "identity" else comprimir(corpo, codificacao)
+
+
+def _decodificar(corpo: bytes, formato: str, codificacao: str):
+    if codificacao == "gzip":
+        corpo = gzip.decompress(corpo)
+    elif codificacao == "br":
+        corpo = brotli.decompress(corpo)
+    return msgpack.unpackb(corpo) if formato == "msgpack" else json.loads(corpo)
+
+
+async def medir(client, rota: str, limite: int, repeticoes: int) -> list:
+    params = {**ROTAS[rota], "limit": limite}
+    conteudo = (await client.get(rota, params=params, headers={"Accept-Encoding": "identity"})).json()
+    linhas = []
+    for formato in FORMATOS:
+        for codificacao in CODIFICACOES:
+            headers = {"Accept": MSGPACK if formato == "msgpack" else "application/json",
+                       "Accept-Encoding": codificacao}
+            response = await client.get(rota, params=params, headers=headers)
+            assert response.headers.get("content-encoding", "identity") == codificacao or \
+                int(response.headers["content-length"]) < 1024, response.headers
+            corpo = _codificar(conteudo, formato, codificacao)
+            linhas.append({
+                "rota": rota, "itens": len(conteudo["items"]), "formato": formato, "codificacao": codificacao,
+                "bytes": int(response.headers["content-length"]),
+                "codificar_ms": round(cronometrar(lambda: _codificar(conteudo, formato, codificacao), repeticoes), 3),
+                "decodificar_ms": round(cronometrar(lambda: _decodificar(corpo, formato, codificacao), repeticoes), 3),
+            })
+    return linhas
+
+
+async def executar(args) -> list:
+    preparar_banco(args)
+    semear_emprestimos(args)
+    transport = httpx.ASGITransport(app=app)
+    linhas = []
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for rota in ROTAS:
+                for limite in args.limites:
+                    linhas.extend(await medir(client, rota, limite, args.repeticoes))
+    finally:
+        await async_engine.dispose()
+    return linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limites", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--repeticoes", type=int, default=30)
+    parser.add_argument("--livros", type=int, default=1000)
+    parser.add_argument("--clientes", type=int, default=500)
+    parser.add_argument("--funcionarios", type=int, default=100)
+    parser.add_argument("--cargos", type=int, default=10)
+    parser.add_argument("--empresas", type=int, default=10)
+    parser.add_argument("--emprestimos", type=int, default=1000)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    linhas = asyncio.run(executar(args))
+    print(f"{'rota':<14} {'itens':>5} {'formato':<8} {'compressão':<10} {'bytes':>8} {'%':>6} {'cod. ms':>8} {'dec. ms':>8}")
+    base = None
+    for linha in linhas:
+        if linha["formato"] == "json" and linha["codificacao"] == "identity":
+            base = linha["bytes"]
+        print(f"{linha['rota']:<14} {linha['itens']:>5} {linha['formato']:<8} {linha['codificacao']:<10} "
+              f"{linha['bytes']:>8} {linha['bytes'] / base * 100:>5.0f}% {linha['codificar_ms']:>8.3f} "
+              f"{linha['decodificar_ms']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Planos de execução das consultas filtradas das rotas.
+
+Chama cada rota de ROTAS contra um banco com um exemplo de cada entidade,
+captura o SQL que ela emite (o mesmo listener before_cursor_execute da
+instrumentação) e roda EXPLAIN QUERY PLAN (SQLite) em cada comando, com os
+parâmetros reais. Termina com código 1 se algum comando varrer uma tabela
+inteira em vez de usar um índice, ou ordenar as linhas encontradas para o
+ORDER BY da paginação em vez de lê-las na ordem de um índice. Listagens completas (paginação sem filtro,
+export) ficam de fora: essas varrem a tabela pela chave primária de propósito.
+
+    python -m benchmarks.explain
+    python -m benchmarks.explain --rota "busca por" --sql
+
+Como o SQL vem das próprias rotas, uma mudança num router (um filtro novo,
+outra forma de paginar) aparece aqui sem editar este arquivo; só uma rota
+nova precisa entrar em ROTAS. tests/test_explain.py roda a mesma verificação.
+
+Sem DATABASE_URL, usa um arquivo SQLite descartável. O schema do banco
+usado é apagado e recriado.
+"""
+import argparse
+import os
+import re
+import sys
+from contextlib import contextmanager
+from typing import List, Tuple
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_explain.db")
+os.environ.setdefault("DB_RESET_ON_STARTUP", "1")
+# Sem cache, toda rota vai ao banco
+os.environ.setdefault("CACHE_BACKEND", "off")
+
+from sqlalchemy import event  # noqa: E402
+
+from database import async_engine, async_read_engine, engine  # noqa: E402
+
+# (nome, método, caminho, corpo); o caminho é formatado com os ids de semear()
+ROTAS = [
+    ("books: isbn", "GET", "/books/isbn/{isbn}", None),
+    ("books: cópias do livro", "GET", "/books/{book_id}/copies", None),
+    ("books: cópia nova", "POST", "/books/copies/", {"book_id": "{book_id}", "copy_number": 3, "location": "E3"}),
+    ("books: cópias em lote", "POST", "/books/copies/bulk", [{"book_id": "{book_id}", "copy_number": 4, "location": "E4"}]),
+    ("books: busca por disponibilidade", "GET", "/books/copies/search?is_available=true", None),
+    ("books: busca por condição", "GET", "/books/copies/search?condition=novo", None),
+    ("books: busca por localização", "GET", "/books/copies/search?location_prefix=E1", None),
+    ("books: busca por livro", "GET", "/books/copies/search?book_id={book_id}", None),
+    ("cargos: cargo novo", "POST", "/cargos/", {"nome": "Outro", "salario_base": 1000, "nivel_hierarquico": 2}),
+    ("cargos: funcionários do cargo", "GET", "/cargos/{cargo_id}/funcionarios", None),
+    ("emprestimos: checkout", "POST", "/emprestimos/",
+        {"cliente_id": "{cliente_id}", "livro_copia_id": "{copia_livre_id}", "data_devolucao_prevista": "2030-01-01T00:00:00"}),
+    ("emprestimos: por cliente", "GET", "/emprestimos/cliente/{cliente_id}", None),
+    ("emprestimos: por cópia", "GET", "/emprestimos/livro/{copia_emprestada_id}", None),
+    ("emprestimos: varredura de atrasos", "POST", "/emprestimos/atrasos", None),
+    ("emprestimos: devolução", "PUT", "/emprestimos/{emprestimo_id}/devolver", None),
+    ("pessoas: por cpf", "GET", "/pessoas/cpf/{cpf}", None),
+    ("pessoas: clientes por status", "GET", "/pessoas/clientes/status/ativo", None),
+    ("pessoas: funcionários ativos", "GET", "/pessoas/funcionarios/ativos", None),
+    ("pessoas: funcionários do cargo", "GET", "/pessoas/funcionarios/cargo/{cargo_id}", None),
+]
+
+# "SCAN t USING INDEX" também é varredura completa; só a lista de constantes do IN é aceita
+VARREDURA = re.compile(r"^SCAN (?!(\d+ )?CONSTANT ROWS?$)")
+
+# Ordenação a cada página, em vez da ordem de um índice (filtro, id)
+ORDENACAO = "USE TEMP B-TREE FOR ORDER BY"
+
+# Rotas em que a ordenação é aceita. Prefixo de localização é uma faixa: a
+# ordem por id só viria com um cursor (location, id); a ordenação fica
+# limitada às cópias de uma estante
+ORDENACAO_ACEITA = {"books: busca por localização"}
+
+
+def semear(client) -> dict:
+    """Um exemplo de cada entidade, com um empréstimo vencido para a varredura de atrasos."""
+    isbn, cpf = "9780000000001", "00000000001"
+    book_id = client.post("/books/", json={"title": "Livro", "author": "Autor", "isbn": isbn}).json()["id"]
+    copias = [
+        client.post("/books/copies/", json={"book_id": book_id, "copy_number": n, "location": f"E{n}"}).json()["id"]
+        for n in (1, 2)
+    ]
+    cargo_id = client.post("/cargos/", json={"nome": "Cargo", "salario_base": 1000, "nivel_hierarquico": 1}).json()["id"]
+    cliente_id = client.post("/pessoas/clientes", json={
+        "nome": "Cliente", "cpf": cpf, "data_nascimento": "1990-01-01", "data_cadastro": "2024-01-01",
+    }).json()["id"]
+    client.post("/pessoas/funcionarios", json={
+        "nome": "Funcionário", "cpf": "00000000002", "data_nascimento": "1990-01-01", "cargo_id": cargo_id,
+        "data_contratacao": "2024-01-01", "salario": 2000,
+    })
+    emprestimo_id = client.post("/emprestimos/", json={
+        "cliente_id": cliente_id, "livro_copia_id": copias[0], "data_devolucao_prevista": "2000-01-01T00:00:00",
+    }).json()["id"]
+    return {
+        "isbn": isbn, "cpf": cpf, "book_id": book_id, "cargo_id": cargo_id, "cliente_id": cliente_id,
+        "copia_emprestada_id": copias[0], "copia_livre_id": copias[1], "emprestimo_id": emprestimo_id,
+    }
+
+
+def _formatar(corpo, ids: dict):
+    if isinstance(corpo, list):
+        return [_formatar(item, ids) for item in corpo]
+    if isinstance(corpo, dict):
+        return {chave: _formatar(valor, ids) for chave, valor in corpo.items()}
+    if isinstance(corpo, str) and corpo.startswith("{") and corpo.endswith("}"):
+        return ids[corpo[1:-1]]
+    return corpo
+
+
+@contextmanager
+def capturar():
+    """Lista (comando, parâmetros) de tudo que as engines da API executarem no bloco."""
+    comandos = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        comandos.append((statement, parameters[0] if executemany else parameters))
+
+    engines = [async_engine.sync_engine] + ([async_read_engine.sync_engine] if async_read_engine else [])
+    for alvo in engines:
+        event.listen(alvo, "before_cursor_execute", registrar)
+    try:
+        yield comandos
+    finally:
+        for alvo in engines:
+            event.remove(alvo, "before_cursor_execute", registrar)
+
+
+def plano(conn, statement: str, parameters) -> List[str]:
+    return [linha[-1] for linha in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+
+def explicar(client, ids: dict) -> List[Tuple[str, str, List[str]]]:
+    """(rota, comando, plano) para cada SELECT/UPDATE/DELETE emitido pelas rotas de ROTAS."""
+    resultados = []
+    for nome, metodo, caminho, corpo in ROTAS:
+        with capturar() as comandos:
+            resposta = client.request(metodo, caminho.format(**ids), json=_formatar(corpo, ids))
+        if resposta.status_code >= 400:
+            raise RuntimeError(f"{nome}: {metodo} {caminho} respondeu {resposta.status_code}: {resposta.text}")
+        with engine.connect() as conn:
+            for statement, parameters in comandos:
+                if statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE"):
+                    resultados.append((nome, statement, plano(conn, statement, parameters)))
+    return resultados
+
+
+def varre(passos: List[str]) -> bool:
+    return any(VARREDURA.match(passo) for passo in passos)
+
+
+def ordena(nome: str, passos: List[str]) -> bool:
+    return nome not in ORDENACAO_ACEITA and ORDENACAO in passos
+
+
+def problema(nome: str, passos: List[str]) -> str:
+    """"SCAN", "SORT" ou "" para o plano de um comando da rota `nome`."""
+    if varre(passos):
+        return "SCAN"
+    if ordena(nome, passos):
+        return "SORT"
+    return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rota", action="append", default=[], metavar="TRECHO",
+                        help="mostra e verifica só as rotas cujo nome contém TRECHO (pode repetir)")
+    parser.add_argument("--sql", action="store_true", help="imprime o SQL de todo comando, não só dos com problema")
+    args = parser.parse_args()
+
+    # Só depois dos argumentos: o lifespan da app apaga e recria o banco
+    from fastapi.testclient import TestClient
+
+    from main import app
+
+    if engine.dialect.name != "sqlite":
+        sys.exit("benchmarks.explain só entende o EXPLAIN QUERY PLAN do SQLite")
+
+    falhas = 0
+    with TestClient(app) as client:
+        # Todas as rotas rodam mesmo com --rota: semear() e as escritas de
+        # umas preparam o estado das outras (checkout antes da devolução)
+        for nome, statement, passos in explicar(client, semear(client)):
+            if args.rota and not any(trecho in nome for trecho in args.rota):
+                continue
+            status = problema(nome, passos) or "ok"
+            falhas += status != "ok"
+            print(f"{status:<5} {nome:<34} {' | '.join(passos)}")
+            if status != "ok" or args.sql:
+                print(f"      {' '.join(statement.split())}")
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
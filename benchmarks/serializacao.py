@@ -0,0 +1,124 @@
+"""Serialização de listas: objetos ORM + response_model x linhas Core + JSON direto.
+
+Monta duas rotas equivalentes para cópias de livros e para funcionários
+(com o nome do cargo) e mede o tempo por requisição de cada uma, pelo
+httpx (ASGITransport), para listas de vários tamanhos:
+
+    antigo  select(Entidade) -> objetos ORM -> validação do response_model
+            (funcionários: model_validate por linha e de novo pelo FastAPI)
+    rapido  select(colunas do schema) -> dicts -> RespostaJSON (orjson)
+
+    python -m benchmarks.serializacao --linhas 100 1000 5000 --repeticoes 20
+
+Sem DATABASE_URL, usa um arquivo SQLite descartável. O schema do banco
+usado é apagado e recriado.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from datetime import date
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench_serializacao.db")
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from app.models.book import Book, BookCopy  # noqa: E402
+from app.models.cargo import Cargo  # noqa: E402
+from app.models.pessoa import Funcionario, Pessoa  # noqa: E402
+from app.routers.book import BookCopyResponse  # noqa: E402
+from app.routers.pessoa import FuncionarioResponse, _funcionario_response, _query_funcionarios  # noqa: E402
+from app.serializacao import colunas, listar, orjson  # noqa: E402
+from database import Base, async_engine, engine, get_db  # noqa: E402
+
+app = FastAPI()
+
+
+@app.get("/antigo/copias", response_model=List[BookCopyResponse])
+async def copias_antigo(limite: int, db: AsyncSession = Depends(get_db)):
+    return (await db.scalars(select(BookCopy).order_by(BookCopy.id).limit(limite))).all()
+
+
+@app.get("/rapido/copias", response_model=List[BookCopyResponse])
+async def copias_rapido(limite: int, db: AsyncSession = Depends(get_db)):
+    return await listar(db, select(*colunas(BookCopyResponse, BookCopy)).order_by(BookCopy.id).limit(limite))
+
+
+@app.get("/antigo/funcionarios", response_model=List[FuncionarioResponse])
+async def funcionarios_antigo(limite: int, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        select(Funcionario, Cargo.nome).outerjoin(Cargo, Funcionario.cargo_id == Cargo.id)
+        .order_by(Funcionario.id).limit(limite)
+    )
+    return [_funcionario_response(func, cargo_nome) for func, cargo_nome in result]
+
+
+@app.get("/rapido/funcionarios", response_model=List[FuncionarioResponse])
+async def funcionarios_rapido(limite: int, db: AsyncSession = Depends(get_db)):
+    return await listar(db, _query_funcionarios().order_by(Funcionario.id).limit(limite))
+
+
+def preparar_banco(linhas: int):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    hoje = date.today()
+    with engine.begin() as conn:
+        conn.execute(insert(Book), [{"title": "Bench", "author": "Bench", "isbn": "0"}])
+        conn.execute(insert(BookCopy), [
+            {"book_id": 1, "copy_number": n, "is_available": n % 3 != 0, "condition": "bom", "location": f"E{n % 20}"}
+            for n in range(1, linhas + 1)
+        ])
+        conn.execute(insert(Cargo), [{"nome": "Bibliotecário", "salario_base": 3500.0, "nivel_hierarquico": 1}])
+        conn.execute(insert(Pessoa.__table__), [
+            {"id": n, "nome": f"Funcionário {n}", "cpf": f"{n:011d}", "data_nascimento": date(1990, 1, 1),
+             "email": f"f{n}@biblioteca", "tipo": "funcionario"}
+            for n in range(1, linhas + 1)
+        ])
+        conn.execute(insert(Funcionario.__table__), [
+            {"id": n, "cargo_id": 1, "data_contratacao": hoje, "salario": 4000.0, "ativo": True}
+            for n in range(1, linhas + 1)
+        ])
+
+
+async def medir(client, url: str, limite: int, repeticoes: int) -> float:
+    # Primeira chamada fora da medição (compilação do SQL, caches do pydantic)
+    await client.get(url, params={"limite": limite})
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        response = await client.get(url, params={"limite": limite})
+        tempos.append(time.perf_counter() - inicio)
+        assert response.status_code == 200 and len(response.json()) == limite
+    return statistics.median(tempos)
+
+
+async def executar(args):
+    preparar_banco(max(args.linhas))
+    print(f"serializador JSON do caminho rápido: {'orjson' if orjson else 'pydantic_core.to_json'}")
+    print(f"{'rota':<14} {'linhas':>7} {'antigo ms':>10} {'rapido ms':>10} {'ganho':>7}")
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for rota in ("copias", "funcionarios"):
+                for linhas in args.linhas:
+                    antigo = await medir(client, f"/antigo/{rota}", linhas, args.repeticoes)
+                    rapido = await medir(client, f"/rapido/{rota}", linhas, args.repeticoes)
+                    print(f"{rota:<14} {linhas:>7} {antigo * 1000:>10.2f} {rapido * 1000:>10.2f} {antigo / rapido:>6.1f}x")
+    finally:
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeticoes", type=int, default=10)
+    asyncio.run(executar(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,69 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
-from fastapi import FastAPI
-from database import engine, Base
+from fastapi import FastAPI, Request, Response
+from database import engine, async_engine, async_read_engine, pool_status, replica_status, iniciar_contagem, encerrar_contagem
+from app.cache import cache
+from app.codificacao import Compressao
+from app.esquema import preparar_esquema
+from app.etag import NaoModificado
 from app.routers import book as b, empresa as e, cargo as c, emprestimo as em, pessoa as p
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Nada de DDL no import: o schema vem das migrações (alembic upgrade head)
+    preparar_esquema()
+    yield
+    await async_engine.dispose()
+    if async_read_engine is not None:
+        await async_read_engine.dispose()
+    engine.dispose()
 
 
-Base.metadata.drop_all(bind=engine)
-Base.metadata.create_all(bind=engine)
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(Compressao)
 
+@app.middleware("http")
+async def contar_consultas(request: Request, call_next):
+    # X-DB-Time em ms. Exports em streaming consultam o banco depois de
+    # enviados os cabeçalhos, então só a parte inicial entra na contagem
+    stats, token = iniciar_contagem(request.scope)
+    try:
+        response = await call_next(request)
+    finally:
+        encerrar_contagem(token)
+    response.headers["X-DB-Queries"] = str(stats.queries)
+    response.headers["X-DB-Time"] = f"{stats.tempo * 1000:.3f}"
+    return response
 
-app = FastAPI()
+@app.exception_handler(NaoModificado)
+async def nao_modificado(request: Request, exc: NaoModificado):
+    return Response(status_code=304, headers={"ETag": exc.etag, "Vary": "Accept, Accept-Encoding"})
 
 @app.get("/")
 def check_api():
     return {"Response":"Api Online!"}
 
+@app.get("/status/pool")
+def status_pool():
+    # Ocupação e tempo de espera dos pools, para dimensionar DB_POOL_SIZE
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine),
+        "replica": replica_status(),
+    }
+
+@app.get("/status/cache")
+def status_cache():
+    return cache.stats()
+
 app.include_router(em.router)
 app.include_router(b.router)
 app.include_router(p.router)
 app.include_router(c.router)
 app.include_router(e.router)
 
+# Servidor de desenvolvimento (um processo, reload); em produção: python -m app.servidor
 if __name__ == "__main__":
     uvicorn.run("main:app", host="127.0.0.1", port=5000, reload=True)
\ No newline at end of file
@@ -0,0 +1,108 @@
+import os
+from dotenv import load_dotenv
+from sqlalchemy.engine import URL
+
+load_dotenv()
+
+
+def _bool(name: str, default: bool) -> bool:
+    valor = os.getenv(name)
+    if valor is None:
+        return default
+    return valor.strip().lower() in ("1", "true", "yes", "sim", "on")
+
+
+def _int(name: str, default: int) -> int:
+    valor = os.getenv(name)
+    return int(valor) if valor else default
+
+
+def _float(name: str, default: float) -> float:
+    valor = os.getenv(name)
+    return float(valor) if valor else default
+
+
+# Conexão com o banco
+DB_USER = os.getenv('DB_USER', 'root')
+DB_PASSWORD = os.getenv('DB_PASSWORD', 'root')
+DB_HOST = os.getenv('DB_HOST', 'localhost')
+DB_PORT = _int('DB_PORT', 3306)
+DB_NAME = os.getenv('DB_NAME', 'meu_projeto')
+
+# DATABASE_URL completa tem prioridade sobre as variáveis DB_* acima
+DATABASE_URL = os.getenv('DATABASE_URL') or URL.create(
+    "mysql+pymysql",
+    username=DB_USER,
+    password=DB_PASSWORD,
+    host=DB_HOST,
+    port=DB_PORT,
+    database=DB_NAME,
+).render_as_string(hide_password=False)
+# Se não for informada, é derivada de DATABASE_URL trocando o driver
+ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL')
+# Réplica de leitura (opcional, URL síncrona como DATABASE_URL): GETs que
+# toleram atraso de replicação leem dela. Teste local com uma cópia do SQLite:
+# sqlite:///file:replica.db?mode=ro&uri=true
+READ_REPLICA_URL = os.getenv('READ_REPLICA_URL') or None
+# Depois de uma falha de conexão na réplica, leituras vão ao primário por esse tempo
+DB_REPLICA_RETRY_SECONDS = _float('DB_REPLICA_RETRY_SECONDS', 30.0)
+
+# Pool de conexões (por engine e por processo)
+DB_POOL_SIZE = _int('DB_POOL_SIZE', 20)
+DB_MAX_OVERFLOW = _int('DB_MAX_OVERFLOW', 10)
+DB_POOL_TIMEOUT = _float('DB_POOL_TIMEOUT', 10.0)
+# Abaixo do wait_timeout do MySQL (8h por padrão) para não reutilizar conexões mortas
+DB_POOL_RECYCLE = _int('DB_POOL_RECYCLE', 1800)
+DB_POOL_PRE_PING = _bool('DB_POOL_PRE_PING', True)
+# Ex.: "READ COMMITTED"; vazio mantém o padrão do banco (REPEATABLE READ no MySQL)
+DB_ISOLATION_LEVEL = os.getenv('DB_ISOLATION_LEVEL') or None
+# Checkouts do pool mais lentos que isso são registrados no log
+DB_POOL_SLOW_CHECKOUT_MS = _float('DB_POOL_SLOW_CHECKOUT_MS', 100.0)
+DB_ECHO = _bool('DB_ECHO', False)
+# Subida da API: valida o schema contra o head do Alembic (resultado em cache por revisão)
+DB_SCHEMA_CHECK = _bool('DB_SCHEMA_CHECK', True)
+SCHEMA_CHECK_CACHE = os.getenv('SCHEMA_CHECK_CACHE', '.schema_check')
+# Só para desenvolvimento: apaga e recria todas as tabelas ao subir
+DB_RESET_ON_STARTUP = _bool('DB_RESET_ON_STARTUP', False)
+# Comandos SQL mais lentos que isso são registrados no log, com a rota
+DB_SLOW_QUERY_MS = _float('DB_SLOW_QUERY_MS', 200.0)
+# Aviso de N+1: o mesmo comando repetido mais que isso numa requisição
+DB_N_PLUS_ONE_THRESHOLD = _int('DB_N_PLUS_ONE_THRESHOLD', 10)
+
+# Empréstimos
+MULTA_POR_DIA = _float('MULTA_POR_DIA', 2.0)  # R$ por dia de atraso
+
+# Cache das consultas pontuais (livro, pessoa por CPF, cargo, empresa)
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')  # memory, redis, local-redis ou off
+CACHE_TTL = _float('CACHE_TTL', 60.0)  # segundos
+CACHE_MAX_ITEMS = _int('CACHE_MAX_ITEMS', 10000)
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+
+# Servidor de produção (python -m app.servidor)
+SERVER_HOST = os.getenv('SERVER_HOST', '0.0.0.0')
+SERVER_PORT = _int('SERVER_PORT', 5000)
+# Cada worker é um processo com event loop e pools próprios. Um por padrão:
+# aumente só com ganho medido por benchmarks.capacidade nesta máquina
+SERVER_WORKERS = _int('SERVER_WORKERS', 1)
+# Acima do idle timeout do balanceador (60 s no ALB/nginx), para que seja ele
+# a fechar as conexões ociosas e não o servidor no meio de um reuso (502)
+SERVER_KEEP_ALIVE = _int('SERVER_KEEP_ALIVE', 75)
+# Fila de conexões ainda não aceitas; o kernel limita a net.core.somaxconn
+SERVER_BACKLOG = _int('SERVER_BACKLOG', 2048)
+# SIGTERM: para de aceitar conexões e espera as requisições em andamento por
+# até esse tempo, abaixo dos 30 s do Kubernetes/systemd antes do SIGKILL
+SERVER_GRACEFUL_TIMEOUT = _int('SERVER_GRACEFUL_TIMEOUT', 25)
+# Requisições simultâneas por worker antes de responder 503 (vazio: sem limite)
+SERVER_LIMIT_CONCURRENCY = _int('SERVER_LIMIT_CONCURRENCY', 0) or None
+# Recicla o worker depois de tantas requisições (vazio: nunca)
+SERVER_MAX_REQUESTS = _int('SERVER_MAX_REQUESTS', 0) or None
+# IPs dos proxies cujos X-Forwarded-* são aceitos
+SERVER_FORWARDED_ALLOW_IPS = os.getenv('SERVER_FORWARDED_ALLOW_IPS', '127.0.0.1')
+SERVER_ACCESS_LOG = _bool('SERVER_ACCESS_LOG', False)
+
+# Respostas: gzip/brotli conforme Accept-Encoding acima desse tamanho (bytes);
+# abaixo disso o custo de CPU não compensa os bytes economizados
+COMPRESSAO_MIN_BYTES = _int('COMPRESSAO_MIN_BYTES', 1024)
+COMPRESSAO_GZIP_NIVEL = _int('COMPRESSAO_GZIP_NIVEL', 6)
+# Qualidade 4 fica perto do gzip 6 em CPU e comprime mais; 11 é só para conteúdo estático
+COMPRESSAO_BROTLI_QUALIDADE = _int('COMPRESSAO_BROTLI_QUALIDADE', 4)
@@ -0,0 +1,42 @@
+"""Ambiente dos testes: um SQLite descartável, recriado a cada teste.
+
+As variáveis precisam estar definidas antes do primeiro import de settings
+(database.py cria as engines no import).
+"""
+import os
+import tempfile
+
+_dir = tempfile.mkdtemp(prefix="biblioteca-testes-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_dir}/testes.db"
+os.environ["DB_RESET_ON_STARTUP"] = "1"
+os.environ["SCHEMA_CHECK_CACHE"] = f"{_dir}/.schema_check"
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ.pop("READ_REPLICA_URL", None)
+os.environ.pop("ASYNC_DATABASE_URL", None)
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from main import app  # noqa: E402
+from app.cache import LRUCache, cache  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    # O lifespan apaga e recria o banco (DB_RESET_ON_STARTUP); o cache começa vazio
+    cache.backend = LRUCache()
+    with TestClient(app) as client:
+        yield client
+
+
+def criar_livro(client, n: int = 1, copias: int = 1) -> int:
+    book_id = client.post("/books/", json={"title": f"Livro {n}", "author": "Autor", "isbn": f"{n:013d}"}).json()["id"]
+    for copia in range(1, copias + 1):
+        client.post("/books/copies/", json={"book_id": book_id, "copy_number": copia, "location": f"E{copia}"})
+    return book_id
+
+
+def criar_cliente(client, n: int = 1) -> int:
+    return client.post("/pessoas/clientes", json={
+        "nome": f"Cliente {n}", "cpf": f"{n:011d}", "data_nascimento": "1990-01-01", "data_cadastro": "2024-01-01",
+    }).json()["id"]
@@ -0,0 +1,88 @@
+"""/books/search: FTS5 no SQLite (testado pela API) e MATCH no MySQL (pelo SQL gerado)."""
+import asyncio
+
+import pytest
+from sqlalchemy.dialects import mysql
+
+from app.search import _buscar_mysql
+
+
+def _cadastrar(client, *livros):
+    for n, (title, author, publisher) in enumerate(livros, start=1):
+        r = client.post("/books/", json={"title": title, "author": author, "publisher": publisher, "isbn": f"{n:013d}"})
+        assert r.status_code in (200, 201), r.text
+
+
+def _titulos(client, q):
+    r = client.get("/books/search", params={"q": q})
+    assert r.status_code == 200, r.text
+    return [livro["title"] for livro in r.json()]
+
+
+@pytest.fixture
+def acervo(client):
+    _cadastrar(
+        client,
+        ("Dom Casmurro", "Machado de Assis", "Garnier"),
+        ("Iracema", "José de Alencar", "Editora Ática"),
+        ("Coração de Pedra", "Ana Souza", "Machado Livros"),
+        ("O Guarani", "José de Alencar", "Garnier"),
+    )
+    return client
+
+
+def test_busca_por_prefixo_com_todos_os_termos(acervo):
+    assert _titulos(acervo, "casmur") == ["Dom Casmurro"]
+    assert sorted(_titulos(acervo, "jos alenc")) == ["Iracema", "O Guarani"]
+    assert _titulos(acervo, "alencar garnier") == ["O Guarani"]
+    assert _titulos(acervo, "tolstoi") == []
+
+
+@pytest.mark.parametrize("q", ["coracao", "Coração", "CORACAO pedra"])
+def test_busca_ignora_acentos_da_consulta_e_do_acervo(acervo, q):
+    assert _titulos(acervo, q) == ["Coração de Pedra"]
+
+
+def test_busca_ignora_acentos_do_acervo_no_autor_e_editora(acervo):
+    assert sorted(_titulos(acervo, "jose")) == ["Iracema", "O Guarani"]
+    assert _titulos(acervo, "atica") == ["Iracema"]
+
+
+def test_titulo_e_autor_pesam_mais_que_a_editora(acervo):
+    # "Machado" é autor de um e editora de outro
+    assert _titulos(acervo, "machado") == ["Dom Casmurro", "Coração de Pedra"]
+
+
+class _Gravador:
+    """Sessão que só guarda os comandos, para compilá-los no dialeto do MySQL."""
+
+    def __init__(self):
+        self.comandos = []
+
+    async def execute(self, statement, *args, **kwargs):
+        compilado = statement.compile(dialect=mysql.dialect())
+        self.comandos.append((str(compilado), set(compilado.params.values())))
+        return self
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+
+def test_mysql_termos_curtos_viram_filtro():
+    db = _Gravador()
+    asyncio.run(_buscar_mysql(db, ["o", "guarani"], 20))
+    sql, valores = db.comandos[0]
+    assert "MATCH" in sql and "+guarani*" in valores
+    assert "%o%" in valores and not any("+o*" in str(valor) for valor in valores)
+
+
+def test_mysql_so_termos_curtos_usa_ilike():
+    # Antes a busca devolvia [] sem consultar o banco
+    db = _Gravador()
+    asyncio.run(_buscar_mysql(db, ["ti", "o"], 20))
+    [(sql, valores)] = db.comandos
+    assert "MATCH" not in sql and "LIKE" in sql
+    assert {"%ti%", "%o%"} <= valores
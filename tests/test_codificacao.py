@@ -0,0 +1,97 @@
+"""Negociação de formato e compressão (app.codificacao) e o middleware Compressao."""
+import gzip
+
+import brotli
+import msgpack
+import pytest
+
+from app.codificacao import JSON, MSGPACK, negociar_codificacao, negociar_formato
+from tests.conftest import criar_livro
+
+LISTA = "/books/?limit=100"
+
+
+@pytest.mark.parametrize("cabecalho, esperado", [
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, deflate, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("*", "br"),
+    ("*;q=0.5, gzip", "gzip"),
+])
+def test_negociar_codificacao(cabecalho, esperado):
+    assert negociar_codificacao(cabecalho) == esperado
+
+
+@pytest.mark.parametrize("cabecalho, esperado", [
+    ("", JSON),
+    ("*/*", JSON),
+    ("application/msgpack", MSGPACK),
+    ("application/x-msgpack", MSGPACK),
+    ("application/json, application/msgpack;q=0.5", JSON),
+    ("application/json;q=0.5, application/msgpack", MSGPACK),
+])
+def test_negociar_formato(cabecalho, esperado):
+    assert negociar_formato(cabecalho) == esperado
+
+
+@pytest.fixture
+def acervo(client):
+    # Lista bem acima de COMPRESSAO_MIN_BYTES
+    for n in range(1, 21):
+        criar_livro(client, n, copias=0)
+    return client
+
+
+def _bruto(client, url, **headers):
+    # Sem a descompressão automática do httpx, para ver os bytes enviados
+    with client.stream("GET", url, headers=headers) as r:
+        return r, b"".join(r.iter_raw())
+
+
+@pytest.mark.parametrize("codificacao, descomprimir", [("br", brotli.decompress), ("gzip", gzip.decompress)])
+def test_lista_grande_comprimida(acervo, codificacao, descomprimir):
+    identidade = acervo.get(LISTA, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identidade.headers
+
+    r, corpo = _bruto(acervo, LISTA, **{"Accept-Encoding": codificacao})
+    assert r.headers["content-encoding"] == codificacao
+    assert int(r.headers["content-length"]) == len(corpo) < len(identidade.content)
+    assert descomprimir(corpo) == identidade.content
+    assert {"Accept", "Accept-Encoding"} <= {v.strip() for v in r.headers["vary"].split(",")}
+    # Cada representação tem o seu ETag
+    assert r.headers["etag"] != identidade.headers["etag"]
+
+
+def test_resposta_pequena_nao_e_comprimida(client):
+    r, corpo = _bruto(client, "/books/", **{"Accept-Encoding": "gzip"})
+    assert len(corpo) < 1024
+    assert "content-encoding" not in r.headers
+    # Mesmo sem comprimir, a resposta depende de Accept-Encoding
+    assert "Accept-Encoding" in r.headers["vary"]
+
+
+def test_msgpack_comprimido(acervo):
+    json = acervo.get(LISTA).json()
+    r, corpo = _bruto(acervo, LISTA, Accept=MSGPACK, **{"Accept-Encoding": "gzip"})
+    assert r.headers["content-type"] == MSGPACK
+    assert r.headers["content-encoding"] == "gzip"
+    assert msgpack.unpackb(gzip.decompress(corpo)) == json
+
+
+def test_export_em_streaming_passa_sem_comprimir(acervo):
+    r, corpo = _bruto(acervo, "/books/export", **{"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert "content-encoding" not in r.headers
+    assert corpo.count(b"\n") == 20
+
+
+def test_304_mantem_vary(acervo):
+    etag = acervo.get(LISTA, headers={"Accept-Encoding": "br"}).headers["etag"]
+    r = acervo.get(LISTA, headers={"Accept-Encoding": "br", "If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["vary"] == "Accept, Accept-Encoding"
+    # O mesmo ETag não vale para outra codificação
+    assert acervo.get(LISTA, headers={"Accept-Encoding": "gzip", "If-None-Match": etag}).status_code == 200
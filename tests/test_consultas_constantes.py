@@ -0,0 +1,41 @@
+"""O número de comandos SQL das rotas de funcionários não cresce com os dados.
+
+Conta pelo cabeçalho X-DB-Queries (a instrumentação de iniciar_contagem):
+a mesma rota com 3 e com 30 funcionários precisa emitir os mesmos comandos.
+"""
+import pytest
+
+ROTAS = [
+    "/pessoas/funcionarios",
+    "/pessoas/funcionarios/ativos",
+    "/pessoas/funcionarios/{funcionario_id}",
+    "/cargos/{cargo_id}/funcionarios",
+]
+
+
+def _criar_funcionarios(client, cargo_id: int, inicio: int, fim: int) -> None:
+    for n in range(inicio, fim):
+        r = client.post("/pessoas/funcionarios", json={
+            "nome": f"Funcionário {n}", "cpf": f"{n:011d}", "data_nascimento": "1990-01-01",
+            "cargo_id": cargo_id, "data_contratacao": "2024-01-01", "salario": 2000, "ativo": n % 2 == 0,
+        })
+        assert r.status_code == 201, r.text
+
+
+def _consultas(client, rota: str) -> int:
+    r = client.get(rota, params={"limit": 100})
+    assert r.status_code == 200, r.text
+    return int(r.headers["X-DB-Queries"])
+
+
+@pytest.mark.parametrize("rota", ROTAS)
+def test_consultas_nao_crescem_com_funcionarios(client, rota):
+    cargo_id = client.post("/cargos/", json={"nome": "Cargo", "salario_base": 1000, "nivel_hierarquico": 1}).json()["id"]
+    _criar_funcionarios(client, cargo_id, 1, 4)
+    rota = rota.format(cargo_id=cargo_id, funcionario_id=1)
+
+    com_3 = _consultas(client, rota)
+    _criar_funcionarios(client, cargo_id, 4, 31)
+    com_30 = _consultas(client, rota)
+
+    assert com_3 == com_30
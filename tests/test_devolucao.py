@@ -0,0 +1,177 @@
+"""Devolução individual e varredura de atrasos mantêm as estatísticas exatas."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.dialects import mysql
+
+from app import jobs
+from app.models.book import Book, BookCopy
+from app.models.estatistica import EstatisticaCliente, EstatisticaLivro
+from app.models.emprestimo import Emprestimo
+from app.estatisticas import CAMPOS, registrar_atrasos
+from database import SessionLocal
+from tests.conftest import criar_cliente, criar_livro
+
+PEDIDOS = 6
+
+
+def _emprestar(client, cliente_id: int, copia_id: int, prevista: str = "2030-01-01T00:00:00") -> int:
+    r = client.post("/emprestimos/", json={
+        "cliente_id": cliente_id, "livro_copia_id": copia_id, "data_devolucao_prevista": prevista,
+    })
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+def test_devolucoes_concorrentes_do_mesmo_emprestimo(client):
+    book_id = criar_livro(client, copias=1)
+    cliente_id = criar_cliente(client)
+    emprestimo_id = _emprestar(client, cliente_id, copia_id=1)
+
+    with ThreadPoolExecutor(max_workers=PEDIDOS) as pool:
+        respostas = list(pool.map(lambda _: client.put(f"/emprestimos/{emprestimo_id}/devolver"), range(PEDIDOS)))
+
+    status = sorted(r.status_code for r in respostas)
+    assert status.count(200) == 1, [r.text for r in respostas]
+    # Quem leu o empréstimo ainda em aberto perde no UPDATE condicional (409); quem leu depois, 400
+    assert set(status) <= {200, 400, 409}
+
+    with SessionLocal() as db:
+        livro = db.get(Book, book_id)
+        assert livro.available_copies == 1
+        assert db.scalar(select(BookCopy.is_available).where(BookCopy.id == 1)) is True
+        estatistica = db.get(EstatisticaCliente, cliente_id)
+        assert (estatistica.devolvidos, estatistica.em_aberto) == (1, 0)
+
+
+def test_devolucao_responde_o_emprestimo_devolvido(client):
+    criar_livro(client, copias=1)
+    emprestimo_id = _emprestar(client, criar_cliente(client), copia_id=1, prevista="2000-01-01T00:00:00")
+
+    r = client.put(f"/emprestimos/{emprestimo_id}/devolver")
+
+    assert r.status_code == 200, r.text
+    assert r.json()["status"] == "devolvido"
+    assert r.json()["valor_multa"] > 0
+    assert client.get(f"/emprestimos/{emprestimo_id}").json() == r.json()
+    assert client.put(f"/emprestimos/{emprestimo_id}/devolver").status_code == 400
+
+
+def test_varredura_conta_os_empréstimos_que_marca(client):
+    criar_livro(client, copias=3)
+    cliente_id = criar_cliente(client)
+    vencidos = [_emprestar(client, cliente_id, copia_id, prevista="2000-01-01T00:00:00") for copia_id in (1, 2)]
+    _emprestar(client, cliente_id, copia_id=3)
+
+    assert client.post("/emprestimos/atrasos").json() == {"emprestimos_atualizados": 2}
+    # Os já atrasados só têm a multa atualizada: não contam de novo
+    assert client.post("/emprestimos/atrasos").json() == {"emprestimos_atualizados": 2}
+    client.put(f"/emprestimos/{vencidos[0]}/devolver")
+
+    with SessionLocal() as db:
+        atrasados = db.scalar(select(func.count()).select_from(Emprestimo).where(Emprestimo.status == 'atrasado'))
+        estatistica = db.get(EstatisticaCliente, cliente_id)
+    assert estatistica.atrasados == atrasados == 1
+    assert (estatistica.em_aberto, estatistica.devolvidos) == (2, 1)
+
+
+class _Gravador:
+    """Sessão que só guarda os comandos, para compilá-los noutro dialeto."""
+
+    def __init__(self):
+        self.comandos = []
+
+    async def execute(self, statement, *args, **kwargs):
+        self.comandos.append(statement)
+        return []
+
+
+def test_contagem_de_atrasos_trava_as_linhas():
+    # O SQLite ignora FOR UPDATE; no MySQL a contagem precisa travar o que o UPDATE vai marcar
+    db = _Gravador()
+    asyncio.run(registrar_atrasos(db, datetime(2030, 1, 1)))
+    assert "FOR UPDATE" in str(db.comandos[0].compile(dialect=mysql.dialect()))
+
+
+def _contadores(client, book_id: int):
+    disponibilidade = client.get(f"/books/{book_id}/availability").json()
+    with SessionLocal() as db:
+        reais = (
+            db.scalar(select(func.count()).select_from(BookCopy).where(BookCopy.book_id == book_id)),
+            db.scalar(select(func.count()).select_from(BookCopy).where(
+                BookCopy.book_id == book_id, BookCopy.is_available == True
+            )),
+        )
+    assert (disponibilidade["total_copies"], disponibilidade["available_copies"]) == reais
+    return reais
+
+
+def test_contadores_seguem_as_rotas_de_copias(client):
+    book_id = criar_livro(client, copias=0)
+    assert _contadores(client, book_id) == (0, 0)
+
+    copias = [
+        client.post("/books/copies/", json={"book_id": book_id, "copy_number": n}).json()["id"] for n in (1, 2, 3)
+    ]
+    assert _contadores(client, book_id) == (3, 3)
+
+    assert client.put(f"/books/copies/{copias[0]}", json={"is_available": False}).status_code == 200
+    assert _contadores(client, book_id) == (3, 2)
+    # Sem mudança de estado, sem ajuste
+    client.put(f"/books/copies/{copias[0]}", json={"is_available": False})
+    client.put(f"/books/copies/{copias[1]}", json={"condition": "bom"})
+    assert _contadores(client, book_id) == (3, 2)
+
+    # Cópia indisponível não pode ser apagada: nada muda
+    assert client.delete(f"/books/copies/{copias[0]}").status_code == 400
+    assert _contadores(client, book_id) == (3, 2)
+    assert client.delete(f"/books/copies/{copias[1]}").status_code == 200
+    assert _contadores(client, book_id) == (2, 1)
+
+    client.put(f"/books/copies/{copias[0]}", json={"is_available": True})
+    assert _contadores(client, book_id) == (2, 2)
+
+
+def _estatisticas():
+    with SessionLocal() as db:
+        return {
+            (modelo.__tablename__, linha.cliente_id if modelo is EstatisticaCliente else linha.book_id):
+                {campo: getattr(linha, campo) for campo in CAMPOS}
+            for modelo in (EstatisticaCliente, EstatisticaLivro)
+            for linha in db.scalars(select(modelo))
+        }
+
+
+def test_recalculo_confere_com_os_contadores_incrementais(client):
+    for n in (1, 2, 3):
+        criar_livro(client, n, copias=2)
+    ana, bia = criar_cliente(client, 1), criar_cliente(client, 2)
+
+    # Checkout individual e em lote, vencidos e no prazo
+    vencido_ana = _emprestar(client, ana, copia_id=1, prevista="2000-01-01T00:00:00")
+    _emprestar(client, ana, copia_id=3)
+    lote = client.post("/emprestimos/batch", json={
+        "cliente_id": bia, "livro_copia_ids": [2, 4, 5], "data_devolucao_prevista": "2000-01-01T00:00:00",
+    }).json()["created"]
+    client.post("/emprestimos/atrasos")
+    # Devolução individual e em lote de atrasados; um atrasado e um ativo seguem em aberto
+    assert client.put(f"/emprestimos/{vencido_ana}/devolver").status_code == 200
+    devolvidos = [e["id"] for e in lote if e["livro_copia_id"] in (2, 4)]
+    assert len(client.put("/emprestimos/batch/devolver", json={"emprestimo_ids": devolvidos}).json()["returned"]) == 2
+
+    incrementais = _estatisticas()
+    asyncio.run(jobs._executar("estatisticas"))
+    recalculadas = _estatisticas()
+
+    assert incrementais.keys() == recalculadas.keys()
+    for chave, valores in recalculadas.items():
+        # As datas do SQLite (julianday) têm precisão de milissegundos: a
+        # duração recalculada pode diferir em até 1 ms por empréstimo devolvido
+        tolerancia = {campo: pytest.approx(valor, abs=1e-6) for campo, valor in valores.items()}
+        tolerancia["duracao_total_segundos"] = pytest.approx(valores["duracao_total_segundos"], abs=0.005)
+        assert incrementais[chave] == tolerancia, chave
+    assert incrementais[("estatistica_cliente", bia)]["atrasados"] == 1
+    assert incrementais[("estatistica_cliente", ana)]["total_multas"] > 0
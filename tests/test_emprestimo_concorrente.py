@@ -0,0 +1,42 @@
+"""Vários balcões pedindo a mesma cópia ao mesmo tempo: só um empréstimo sai.
+
+As requisições são disparadas de várias threads pelo mesmo TestClient, e
+rodam intercaladas no event loop da aplicação.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, select
+
+from app.models.book import Book, BookCopy
+from app.models.emprestimo import Emprestimo
+from database import SessionLocal
+from tests.conftest import criar_cliente, criar_livro
+
+PEDIDOS = 8
+
+
+def test_uma_copia_um_emprestimo(client):
+    book_id = criar_livro(client, copias=2)
+    clientes = [criar_cliente(client, n) for n in range(1, PEDIDOS + 1)]
+    copia_id = client.get(f"/books/{book_id}/copies").json()["items"][0]["id"]
+
+    def pedir(cliente_id):
+        return client.post("/emprestimos/", json={
+            "cliente_id": cliente_id, "livro_copia_id": copia_id, "data_devolucao_prevista": "2030-01-01T00:00:00",
+        })
+
+    with ThreadPoolExecutor(max_workers=PEDIDOS) as pool:
+        respostas = list(pool.map(pedir, clientes))
+
+    status = sorted(r.status_code for r in respostas)
+    assert status == [201] + [400] * (PEDIDOS - 1), [r.text for r in respostas]
+
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(Emprestimo).where(Emprestimo.livro_copia_id == copia_id)) == 1
+        assert db.scalar(select(BookCopy.is_available).where(BookCopy.id == copia_id)) is False
+        livro = db.get(Book, book_id)
+        disponiveis = db.scalar(
+            select(func.count()).select_from(BookCopy).where(BookCopy.book_id == book_id, BookCopy.is_available == True)
+        )
+        assert livro.available_copies == disponiveis == 1
+        assert livro.total_copies == 2
@@ -0,0 +1,82 @@
+import re
+
+from sqlalchemy import event, func, select
+
+from app.models.book import Book, BookCopy
+from app.models.emprestimo import Emprestimo
+from app.models.estatistica import EstatisticaCliente
+from database import SessionLocal, async_engine
+from tests.conftest import criar_cliente, criar_livro
+
+
+def test_lote_devolve_todos_os_emprestimos_criados(client):
+    # Simula o DATETIME(0) do MySQL: o valor gravado perde os microssegundos
+    # (o dialeto do SQLite já passa as datas como texto)
+    def truncar(valor):
+        if isinstance(valor, str) and re.fullmatch(r"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\.\d{6}", valor):
+            return valor[:19] + ".000000"
+        return valor
+
+    def arredondar(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO emprestimo") and executemany:
+            parameters = [tuple(truncar(valor) for valor in linha) for linha in parameters]
+        return statement, parameters
+
+    criar_livro(client, copias=3)
+    cliente_id = criar_cliente(client)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", arredondar, retval=True)
+    try:
+        r = client.post("/emprestimos/batch", json={
+            "cliente_id": cliente_id, "livro_copia_ids": [1, 2, 3],
+            "data_devolucao_prevista": "2030-01-01T00:00:00",
+        })
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", arredondar)
+    assert r.status_code == 201, r.text
+    assert sorted(e["livro_copia_id"] for e in r.json()["created"]) == [1, 2, 3]
+
+
+def test_copia_levada_durante_o_lote_desfaz_tudo(client):
+    # Outra transação leva a cópia 2 entre a leitura e a reserva: o UPDATE
+    # condicional deixa de achá-la
+    def levar_copia(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE book_copy SET is_available"):
+            statement += " AND book_copy.id <> 2"
+        return statement, parameters
+
+    book_id = criar_livro(client, copias=3)
+    cliente_id = criar_cliente(client)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", levar_copia, retval=True)
+    try:
+        r = client.post("/emprestimos/batch", json={
+            "cliente_id": cliente_id, "livro_copia_ids": [1, 2, 3],
+            "data_devolucao_prevista": "2030-01-01T00:00:00",
+        })
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", levar_copia)
+    assert r.status_code == 409, r.text
+
+    # Nada do lote ficou gravado: nem reservas, nem contadores, nem empréstimos
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(Emprestimo)) == 0
+        assert db.scalars(select(BookCopy.is_available)).all() == [True] * 3
+        assert db.get(Book, book_id).available_copies == 3
+        assert db.get(EstatisticaCliente, cliente_id) is None
+
+
+def test_lote_nao_devolve_emprestimo_antigo_da_copia(client):
+    criar_livro(client, copias=2)
+    cliente_id = criar_cliente(client)
+    antigo = client.post("/emprestimos/", json={
+        "cliente_id": cliente_id, "livro_copia_id": 1, "data_devolucao_prevista": "2030-01-01T00:00:00",
+    }).json()["id"]
+    # Cópia liberada à mão com o empréstimo ainda ativo
+    assert client.put("/books/copies/1", json={"is_available": True}).status_code == 200
+
+    r = client.post("/emprestimos/batch", json={
+        "cliente_id": cliente_id, "livro_copia_ids": [1, 2], "data_devolucao_prevista": "2030-01-01T00:00:00",
+    })
+    assert r.status_code == 201, r.text
+    criados = r.json()["created"]
+    assert sorted(e["livro_copia_id"] for e in criados) == [1, 2]
+    assert antigo not in {e["id"] for e in criados}
@@ -0,0 +1,162 @@
+import asyncio
+
+from app.cache import LRUCache, LocalRedisClient, ReadThroughCache, RedisCache, SemCache
+from app.models.book import Book
+from app.models.cargo import Cargo
+from database import SessionLocal
+from tests.conftest import criar_cliente, criar_livro
+
+
+def alterar_titulo_em_outra_sessao(book_id: int, titulo: str) -> None:
+    # Como outro worker: commit direto no banco, sem invalidar o cache deste processo
+    with SessionLocal() as db:
+        db.get(Book, book_id).title = titulo
+        db.commit()
+
+
+def test_cache_nao_serve_corpo_mais_velho_que_o_etag(client):
+    book_id = criar_livro(client)
+    primeira = client.get(f"/books/{book_id}")
+    assert primeira.json()["title"] == "Livro 1"
+
+    alterar_titulo_em_outra_sessao(book_id, "Novo título")
+
+    segunda = client.get(f"/books/{book_id}")
+    assert segunda.headers["ETag"] != primeira.headers["ETag"]
+    assert segunda.json()["title"] == "Novo título"
+    # O ETag novo identifica o corpo novo: revalidar com ele dá 304
+    assert client.get(f"/books/{book_id}", headers={"If-None-Match": segunda.headers["ETag"]}).status_code == 304
+
+
+def test_rotas_com_cache_seguem_a_versao(client):
+    book_id = criar_livro(client)
+    isbn = client.get(f"/books/{book_id}").json()["isbn"]
+    client.get(f"/books/isbn/{isbn}")
+    client.get(f"/books/{book_id}/availability")
+
+    alterar_titulo_em_outra_sessao(book_id, "Outro")
+
+    assert client.get(f"/books/isbn/{isbn}").json()["title"] == "Outro"
+    cargo_id = client.post("/cargos/", json={"nome": "C", "salario_base": 1, "nivel_hierarquico": 1}).json()["id"]
+    assert client.get(f"/cargos/{cargo_id}").json()["nome"] == "C"
+    assert client.get(f"/cargos/{cargo_id}").json()["nome"] == "C"
+
+
+def _emprestar(client, cliente_id: int, copia_id: int) -> None:
+    r = client.post("/emprestimos/", json={
+        "cliente_id": cliente_id, "livro_copia_id": copia_id, "data_devolucao_prevista": "2030-01-01T00:00:00",
+    })
+    assert r.status_code == 201, r.text
+
+
+def test_emprestimo_so_invalida_o_proprio_livro(client):
+    emprestado, outro = criar_livro(client, 1), criar_livro(client, 2)
+    cliente_id = criar_cliente(client)
+    etags = {book_id: client.get(f"/books/{book_id}").headers["ETag"] for book_id in (emprestado, outro)}
+    antes = client.get("/status/cache").json()
+
+    _emprestar(client, cliente_id, copia_id=1)
+
+    # O outro livro continua com o mesmo ETag e sai do cache
+    assert client.get(f"/books/{outro}", headers={"If-None-Match": etags[outro]}).status_code == 304
+    assert client.get(f"/books/{outro}").headers["ETag"] == etags[outro]
+    depois = client.get("/status/cache").json()
+    assert depois["hits"] == antes["hits"] + 1
+    assert depois["desatualizados"] == antes["desatualizados"]
+
+    # O emprestado mudou pelo UPDATE em massa dos contadores
+    r = client.get(f"/books/{emprestado}")
+    assert r.headers["ETag"] != etags[emprestado]
+    assert r.json()["available_copies"] == 0
+
+
+def test_linha_apagada_nao_volta_do_cache(client):
+    cargo_id = client.post("/cargos/", json={"nome": "C", "salario_base": 1, "nivel_hierarquico": 1}).json()["id"]
+    assert client.get(f"/cargos/{cargo_id}").status_code == 200
+    # Como outro worker: o DELETE não invalida o cache deste processo
+    with SessionLocal() as db:
+        db.delete(db.get(Cargo, cargo_id))
+        db.commit()
+
+    r = client.get(f"/cargos/{cargo_id}")
+    assert r.status_code == 404
+    assert "ETag" not in r.headers
+
+
+def test_status_do_cache(client):
+    book_id = criar_livro(client)
+    client.get(f"/books/{book_id}")
+    client.get(f"/books/{book_id}")
+    client.get("/books/999")
+
+    stats = client.get("/status/cache").json()
+    assert stats["backend"] == "LRUCache"
+    assert (stats["hits"], stats["misses"], stats["items"]) == (1, 2, 1)
+    assert stats["hit_ratio"] == round(1 / 3, 4)
+    assert {"evictions", "max_items", "desatualizados", "ttl"} <= stats.keys()
+
+
+def test_lru_descarta_o_menos_usado_e_os_expirados():
+    async def cenario():
+        lru = LRUCache(max_items=2)
+        await lru.set("a", 1, ttl=60)
+        await lru.set("b", 2, ttl=60)
+        await lru.get("a")
+        await lru.set("c", 3, ttl=60)
+        assert (await lru.get("b"), await lru.get("a"), await lru.get("c")) == (None, 1, 3)
+        await lru.set("d", 4, ttl=-1)
+        assert await lru.get("d") is None
+        assert lru.evictions == 3
+        await lru.delete("a")
+        assert await lru.get("a") is None
+
+    asyncio.run(cenario())
+
+
+def test_redis_guarda_json_com_prefixo():
+    async def cenario():
+        cliente = LocalRedisClient()
+        redis = RedisCache(cliente, prefix="t:")
+        await redis.set("livro", {"id": 1, "titulo": "Ação"}, ttl=0.2)
+        assert await redis.get("livro") == {"id": 1, "titulo": "Ação"}
+        assert await cliente.get("livro") is None and await cliente.get("t:livro") is not None
+        await redis.delete("livro")
+        assert await redis.get("livro") is None
+        assert (redis.hits, redis.misses) == (1, 1)
+
+    asyncio.run(cenario())
+
+
+def test_cache_desligado_sempre_carrega():
+    cargas = []
+
+    async def carregar():
+        cargas.append(1)
+        return {"id": 1}
+
+    async def cenario():
+        fachada = ReadThroughCache(SemCache(), ttl=60)
+        for _ in range(3):
+            assert await fachada.get_or_load("k", carregar, versao="v") == {"id": 1}
+
+    asyncio.run(cenario())
+    assert len(cargas) == 3
+
+
+def test_versao_diferente_recarrega_e_ausente_nao_e_guardado():
+    valores = iter([{"n": 1}, {"n": 2}, None])
+
+    async def carregar():
+        return next(valores)
+
+    async def cenario():
+        fachada = ReadThroughCache(LRUCache(), ttl=60)
+        assert await fachada.get_or_load("k", carregar, versao="v1") == {"n": 1}
+        assert await fachada.get_or_load("k", carregar, versao="v1") == {"n": 1}
+        assert await fachada.get_or_load("k", carregar, versao="v2") == {"n": 2}
+        assert fachada.desatualizados == 1
+        await fachada.invalidate("k")
+        assert await fachada.get_or_load("k", carregar, versao="v2") is None
+        assert await fachada.backend.get("k") is None
+
+    asyncio.run(cenario())
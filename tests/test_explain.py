@@ -0,0 +1,44 @@
+"""As consultas filtradas das rotas usam índices (EXPLAIN QUERY PLAN do SQLite).
+
+Usa o SQL capturado pelo benchmarks.explain enquanto chama as rotas, então
+um router que mude a consulta é verificado sem editar lista nenhuma.
+"""
+from benchmarks.explain import ORDENACAO, ROTAS, explicar, problema, semear
+
+
+def test_rotas_filtradas_usam_indices(client):
+    resultados = explicar(client, semear(client))
+
+    # Toda rota de ROTAS emitiu ao menos um comando verificável
+    assert {nome for nome, _, _ in resultados} == {nome for nome, _, _, _ in ROTAS}
+    problemas = [(nome, statement, passos) for nome, statement, passos in resultados if problema(nome, passos)]
+    assert not problemas
+
+
+def test_paginas_da_busca_de_copias_na_ordem_do_indice(client):
+    # /copies/search?is_available=true substitui /copies/available no quiosque
+    resultados = explicar(client, semear(client))
+    for rota in ("books: busca por disponibilidade", "books: busca por livro", "books: cópias do livro"):
+        planos = [plano for nome, statement, plano in resultados if nome == rota and "book_copy" in statement]
+        assert planos, rota
+        for plano in planos:
+            assert ORDENACAO not in plano, (rota, plano)
+
+
+def test_busca_por_localizacao_usa_a_faixa(client):
+    resultados = explicar(client, semear(client))
+    passos = [
+        passo for nome, statement, plano in resultados if nome == "books: busca por localização"
+        for passo in plano if "book_copy" in passo
+    ]
+    assert any("ix_book_copy_location (location>? AND location<?)" in passo for passo in passos), passos
+
+
+def test_varredura_de_atrasos_usa_status_e_prevista(client):
+    resultados = explicar(client, semear(client))
+    comandos = [(statement, plano) for nome, statement, plano in resultados if nome == "emprestimos: varredura de atrasos"]
+    # A contagem para as estatísticas e o UPDATE da varredura
+    assert len([statement for statement, _ in comandos if "emprestimo" in statement]) >= 2
+    for statement, plano in comandos:
+        if "FROM emprestimo" in statement or statement.startswith("UPDATE emprestimo"):
+            assert any("ix_emprestimo_status_prevista" in passo for passo in plano), (statement, plano)
@@ -0,0 +1,22 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from database import encerrar_contagem, engine, iniciar_contagem
+
+
+def test_comando_com_erro_nao_deixa_o_inicio_na_conexao():
+    stats, token = iniciar_contagem()
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM tabela_que_nao_existe"))
+            assert conn.info["inicio_comando"] == []
+            conn.execute(text("SELECT 1"))
+            assert conn.info["inicio_comando"] == []
+    finally:
+        encerrar_contagem(token)
+
+    # O comando que falhou também foi ao banco: conta em X-DB-Queries/X-DB-Time
+    assert stats.queries == 2
+    assert set(stats.formas) == {"SELECT * FROM tabela_que_nao_existe", "SELECT 1"}
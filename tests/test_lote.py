@@ -0,0 +1,89 @@
+"""Carga em lote de livros e cópias: erros por item e limite de LIMITE_LOTE."""
+import pytest
+from sqlalchemy import func, select
+
+from app.bulk import LIMITE_LOTE
+from app.models.book import Book, BookCopy
+from database import SessionLocal
+from tests.conftest import criar_livro
+
+
+def _livro(isbn: str) -> dict:
+    return {"title": f"Livro {isbn}", "author": "Autor", "isbn": isbn}
+
+
+def _contar(modelo) -> int:
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).select_from(modelo))
+
+
+def test_livros_em_lote_com_erros_por_item(client):
+    existente = client.get(f"/books/{criar_livro(client)}").json()["isbn"]
+
+    r = client.post("/books/bulk", json=[_livro("A"), _livro(existente), _livro("B"), _livro("A")])
+
+    assert r.status_code == 201, r.text
+    assert [livro["isbn"] for livro in r.json()["created"]] == ["A", "B"]
+    assert r.json()["errors"] == [
+        {"index": 1, "detail": "Já existe um livro com este ISBN"},
+        {"index": 3, "detail": "ISBN repetido no lote"},
+    ]
+    assert _contar(Book) == 3
+
+
+def test_livros_em_lote_so_com_erros_nao_grava(client):
+    existente = client.get(f"/books/{criar_livro(client)}").json()["isbn"]
+    r = client.post("/books/bulk", json=[_livro(existente)])
+    assert r.status_code == 201, r.text
+    assert r.json()["created"] == []
+    assert len(r.json()["errors"]) == 1
+    assert _contar(Book) == 1
+
+
+def test_copias_em_lote_com_erros_por_item(client):
+    book_id = criar_livro(client, copias=1)
+
+    r = client.post("/books/copies/bulk", json=[
+        {"book_id": book_id, "copy_number": 2},
+        {"book_id": 999, "copy_number": 1},
+        {"book_id": book_id, "copy_number": 1},
+        {"book_id": book_id, "copy_number": 2},
+    ])
+
+    assert r.status_code == 201, r.text
+    assert [(c["book_id"], c["copy_number"]) for c in r.json()["created"]] == [(book_id, 2)]
+    assert r.json()["errors"] == [
+        {"index": 1, "detail": "Livro não encontrado"},
+        {"index": 2, "detail": "Já existe uma cópia com este número para este livro"},
+        {"index": 3, "detail": "Número de cópia repetido no lote"},
+    ]
+    # Só a cópia criada entra nos contadores
+    assert client.get(f"/books/{book_id}/availability").json() == {
+        "book_id": book_id, "total_copies": 2, "available_copies": 2,
+    }
+
+
+def test_limite_do_lote_de_livros(client):
+    r = client.post("/books/bulk", json=[_livro(str(n)) for n in range(LIMITE_LOTE)])
+    assert r.status_code == 201
+    assert len(r.json()["created"]) == LIMITE_LOTE
+
+    r = client.post("/books/bulk", json=[_livro(f"x{n}") for n in range(LIMITE_LOTE + 1)])
+    assert r.status_code == 422
+    assert _contar(Book) == LIMITE_LOTE
+
+
+def test_limite_do_lote_de_copias(client):
+    book_id = criar_livro(client, copias=0)
+    r = client.post("/books/copies/bulk", json=[
+        {"book_id": book_id, "copy_number": n} for n in range(1, LIMITE_LOTE + 2)
+    ])
+    assert r.status_code == 422
+    assert _contar(BookCopy) == 0
+
+
+@pytest.mark.parametrize("rota", ["/books/bulk", "/books/copies/bulk"])
+def test_lote_vazio(client, rota):
+    r = client.post(rota, json=[])
+    assert r.status_code == 201
+    assert r.json() == {"created": [], "errors": []}
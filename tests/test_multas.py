@@ -0,0 +1,21 @@
+"""Dias de atraso calculados no banco seguem calcular_multa (timedelta.days)."""
+from datetime import datetime
+
+from sqlalchemy import literal, select
+from sqlalchemy.dialects import postgresql
+
+from app.multas import dias_de_atraso
+from database import engine
+
+
+def test_dias_de_atraso_generico_arredonda_para_baixo():
+    sql = str(select(dias_de_atraso(literal(datetime(2024, 1, 1)), literal(datetime(2024, 1, 2, 15))))
+              .compile(dialect=postgresql.dialect()))
+    assert "FLOOR(EXTRACT(EPOCH FROM" in sql
+    assert "CAST" not in sql
+
+
+def test_dias_de_atraso_conta_dias_inteiros():
+    inicio, fim = datetime(2024, 1, 1), datetime(2024, 1, 2, 15)
+    with engine.connect() as conn:
+        assert conn.scalar(select(dias_de_atraso(literal(inicio), literal(fim)))) == (fim - inicio).days == 1
@@ -0,0 +1,102 @@
+import pytest
+
+from tests.conftest import criar_livro
+
+# Rotas paginadas (keyset); a fixture um_de_cada deixa ao menos um item em cada
+ROTAS_PAGINADAS = [
+    "/books/",
+    "/books/copies/",
+    "/books/copies/search",
+    "/cargos/",
+    "/empresas/",
+    "/emprestimos/",
+    "/pessoas/",
+    "/pessoas/?include_subtype=true",
+    "/pessoas/clientes",
+    "/pessoas/funcionarios",
+    # Listagens filtradas; os ids são os criados por um_de_cada
+    "/books/1/copies",
+    "/cargos/1/funcionarios",
+    "/emprestimos/cliente/1",
+    "/emprestimos/livro/1",
+    "/pessoas/clientes/status/ativo",
+    "/pessoas/funcionarios/ativos",
+    "/pessoas/funcionarios/cargo/1",
+    # Rotas obsoletas, paginadas do mesmo jeito
+    "/books/author/Autor",
+    "/books/title/Livro",
+    "/books/copies/available",
+    "/books/copies/unavailable",
+    "/books/copies/condition/bom",
+    "/books/copies/location/E",
+]
+
+
+@pytest.fixture
+def um_de_cada(client):
+    book_id = criar_livro(client, copias=1)
+    # Uma segunda cópia, disponível e com condição, para as listagens por esses filtros
+    client.post("/books/copies/", json={"book_id": book_id, "copy_number": 2, "location": "E2", "condition": "bom"})
+    cargo_id = client.post("/cargos/", json={"nome": "Cargo", "salario_base": 1000, "nivel_hierarquico": 1}).json()["id"]
+    client.post("/empresas/", json={"cnpj": "1", "razao_social": "Empresa", "email_contato": "e@x"})
+    cliente_id = client.post("/pessoas/clientes", json={
+        "nome": "Ana", "cpf": "1", "data_nascimento": "1990-01-01", "data_cadastro": "2024-01-01",
+    }).json()["id"]
+    client.post("/pessoas/funcionarios", json={
+        "nome": "Bia", "cpf": "2", "data_nascimento": "1990-01-01", "cargo_id": cargo_id,
+        "data_contratacao": "2024-01-01", "salario": 2000,
+    })
+    r = client.post("/emprestimos/", json={"cliente_id": cliente_id, "livro_copia_id": 1,
+                                           "data_devolucao_prevista": "2030-01-01T00:00:00"})
+    assert r.status_code == 201, r.text
+    return book_id
+
+
+@pytest.mark.parametrize("rota", ROTAS_PAGINADAS)
+@pytest.mark.parametrize("fields", ["id", ""])
+def test_fields_so_com_id(client, um_de_cada, rota, fields):
+    separador = "&" if "?" in rota else "?"
+    r = client.get(f"{rota}{separador}fields={fields}")
+    assert r.status_code == 200, r.text
+    itens = r.json()["items"]
+    assert itens
+    for item in itens:
+        # O "tipo" da listagem polimórfica sempre vem junto, como o id
+        assert set(item) - {"tipo"} == {"id"}
+
+
+def test_cursor_com_fields_id(client):
+    for n in range(1, 4):
+        criar_livro(client, n)
+    ids, cursor = [], None
+    while True:
+        r = client.get("/books/", params={"fields": "id", "limit": 1, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200, r.text
+        ids += [item["id"] for item in r.json()["items"]]
+        cursor = r.json()["next_cursor"]
+        if cursor is None:
+            break
+    assert ids == [1, 2, 3]
+
+
+def test_cursor_em_listagem_filtrada(client):
+    book_id = criar_livro(client, 1, copias=3)
+    criar_livro(client, 2, copias=2)
+    ids, cursor = [], None
+    while True:
+        r = client.get(f"/books/{book_id}/copies", params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200, r.text
+        ids += [item["id"] for item in r.json()["items"]]
+        cursor = r.json()["next_cursor"]
+        if cursor is None:
+            break
+    assert ids == [1, 2, 3]
+
+
+def test_localizacao_obsoleta_e_prefixo(client):
+    book_id = criar_livro(client, copias=0)
+    for numero, local in enumerate(["E1", "E10", "E1-A", "E2", "XE1"], start=1):
+        client.post("/books/copies/", json={"book_id": book_id, "copy_number": numero, "location": local})
+    r = client.get("/books/copies/location/E1")
+    assert r.status_code == 200, r.text
+    assert sorted(item["location"] for item in r.json()["items"]) == ["E1", "E1-A", "E10"]
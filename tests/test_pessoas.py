@@ -0,0 +1,74 @@
+"""GET /pessoas/: formato de cada tipo (include_subtype) e filtro por ?tipo=."""
+from datetime import date
+
+import pytest
+
+from app.models.pessoa import Pessoa
+from app.routers.pessoa import _CAMPOS_POR_TIPO, PessoaResponse
+from database import SessionLocal
+from tests.conftest import criar_cliente
+
+
+@pytest.fixture
+def pessoas(client):
+    ids = {"cliente": criar_cliente(client)}
+    # Pessoa sem subtipo não tem rota de criação
+    with SessionLocal() as db:
+        pessoa = Pessoa(nome="Pessoa", cpf="99999999999", data_nascimento=date(1990, 1, 1))
+        db.add(pessoa)
+        db.commit()
+        ids["pessoa"] = pessoa.id
+    cargo_id = client.post("/cargos/", json={"nome": "Bibliotecário", "salario_base": 1, "nivel_hierarquico": 1}).json()["id"]
+    ids["funcionario"] = client.post("/pessoas/funcionarios", json={
+        "nome": "Funcionário", "cpf": "55555555555", "data_nascimento": "1990-01-01",
+        "cargo_id": cargo_id, "data_contratacao": "2024-01-01", "salario": 3500.0,
+    }).json()["id"]
+    return ids
+
+
+def _itens(client, **params):
+    r = client.get("/pessoas/", params=params)
+    assert r.status_code == 200, r.text
+    return r.json()["items"]
+
+
+def test_cada_tipo_com_os_seus_campos(client, pessoas):
+    itens = {item["tipo"]: item for item in _itens(client, include_subtype="true")}
+
+    assert set(itens) == {"pessoa", "cliente", "funcionario"}
+    for tipo, item in itens.items():
+        assert set(item) == set(_CAMPOS_POR_TIPO[tipo]), tipo
+        assert item["id"] == pessoas[tipo]
+    assert itens["cliente"]["status"] == "ativo"
+    assert itens["funcionario"]["cargo_nome"] == "Bibliotecário"
+    assert itens["funcionario"]["salario"] == 3500.0
+
+
+def test_sem_subtipo_todos_com_os_campos_de_pessoa(client, pessoas):
+    itens = _itens(client)
+    assert {item["tipo"] for item in itens} == {"pessoa", "cliente", "funcionario"}
+    for item in itens:
+        assert set(item) == set(PessoaResponse.model_fields)
+
+
+@pytest.mark.parametrize("include_subtype", ["true", "false"])
+@pytest.mark.parametrize("tipo", ["pessoa", "cliente", "funcionario"])
+def test_filtro_por_tipo(client, pessoas, tipo, include_subtype):
+    itens = _itens(client, tipo=tipo, include_subtype=include_subtype)
+    assert [(item["id"], item["tipo"]) for item in itens] == [(pessoas[tipo], tipo)]
+
+
+def test_fields_recorta_cada_tipo(client, pessoas):
+    itens = {item["tipo"]: item for item in _itens(client, include_subtype="true", fields="nome,salario,status")}
+    # id e tipo vêm sempre; cada item só com os campos pedidos que o seu tipo tem
+    assert set(itens["pessoa"]) == {"id", "tipo", "nome"}
+    assert set(itens["cliente"]) == {"id", "tipo", "nome", "status"}
+    assert set(itens["funcionario"]) == {"id", "tipo", "nome", "salario"}
+
+
+def test_campos_de_subtipo_exigem_include_subtype(client, pessoas):
+    assert client.get("/pessoas/", params={"fields": "nome,salario"}).status_code == 400
+
+
+def test_tipo_desconhecido(client, pessoas):
+    assert client.get("/pessoas/", params={"tipo": "empresa"}).status_code == 422
@@ -0,0 +1,75 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+
+from app.models import versao
+from app.models.book import Book
+from app.models.versao import TableVersion
+from database import SessionLocal, engine
+from main import app
+from tests.conftest import criar_livro
+
+
+def test_versao_incrementada_no_fim_da_transacao_da_escrita(client):
+    book_id = criar_livro(client)
+    with SessionLocal() as db:
+        antes = db.scalar(select(TableVersion.versao).where(TableVersion.tabela == "book"))
+
+    eventos = []
+
+    def comando(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE"):
+            eventos.append(statement.split()[1])
+
+    def commit(conn):
+        eventos.append("COMMIT")
+
+    event.listen(engine, "before_cursor_execute", comando)
+    event.listen(engine, "commit", commit)
+    try:
+        with SessionLocal() as db:
+            db.get(Book, book_id).title = "Outro"
+            db.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", comando)
+        event.remove(engine, "commit", commit)
+
+    # Uma transação só, com table_version por último: a linha fica travada só até o COMMIT
+    assert eventos == ["book", "table_version", "COMMIT"]
+    with SessionLocal() as db:
+        assert db.scalar(select(TableVersion.versao).where(TableVersion.tabela == "book")) == antes + 1
+
+
+def test_etag_muda_depois_de_escrita_pela_api(client):
+    book_id = criar_livro(client)
+    etag = client.get("/books/").headers["ETag"]
+    client.put(f"/books/{book_id}", json={"title": "Outro"})
+    assert client.get("/books/").headers["ETag"] != etag
+
+
+def test_rollback_nao_incrementa(client):
+    book_id = criar_livro(client)
+    with SessionLocal() as db:
+        antes = db.scalar(select(TableVersion.versao).where(TableVersion.tabela == "book"))
+        db.get(Book, book_id).title = "Outro"
+        db.flush()
+        db.rollback()
+        assert db.scalar(select(TableVersion.versao).where(TableVersion.tabela == "book")) == antes
+
+
+def test_falha_no_incremento_desfaz_a_escrita(client, monkeypatch):
+    book_id = criar_livro(client)
+    etag = client.get(f"/books/{book_id}").headers["ETag"]
+
+    def falhar(conn, tabelas):
+        raise RuntimeError("falha simulada ao incrementar as versões")
+
+    monkeypatch.setattr(versao, "_somar_versoes", falhar)
+    sem_excecoes = TestClient(app, raise_server_exceptions=False)
+    assert sem_excecoes.put(f"/books/{book_id}", json={"title": "Outro"}).status_code == 500
+    monkeypatch.undo()
+
+    # Sem a versão nova, os dados também não mudaram: o 304 do ETag antigo continua certo
+    with SessionLocal() as db:
+        assert db.get(Book, book_id).title == "Livro 1"
+    assert client.get(f"/books/{book_id}", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(f"/books/{book_id}").json()["title"] == "Livro 1"